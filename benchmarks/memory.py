@@ -0,0 +1,85 @@
+import argparse
+import gc
+import tracemalloc
+from structs import TTree, TaskHeap, TaskColumns
+from structs import task_columns
+from utils.memory import get_tree_memory_size
+
+def measure_talents(total_talents: int, task_store_type: type = None) -> dict:
+    """
+    Measures the memory of talents that each hold a single recent task.
+    Talent Nodes are made directly, a tree only has room for a couple at rank 0.
+    @param total_talents: the number of talents to create
+    @param task_store_type: optional task store for every talent
+    @return bytes per talent, traced and counted
+    """
+    tree = TTree(task_store_type)
+    names = [f"Talent{i}" for i in range(total_talents)]
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    talent_nodes = []
+    for name in names:
+        talent_node = tree._create_talent_node(name)
+        talent_node.store_task(talent_node, "Task", 0, 1)
+        talent_nodes.append(talent_node)
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    counted = sum(get_tree_memory_size(talent_node) for talent_node in talent_nodes)
+    return {
+        'traced_bytes_per_talent': (end - start) / total_talents,
+        'counted_bytes_per_talent': counted / total_talents,
+    }
+
+def measure_tasks(total_tasks: int, task_store_type: type = None) -> dict:
+    """
+    Measures the memory of tasks converted out of the recent task map.
+    Tasks alternate between 2 talents so they don't burn out.
+    @param total_tasks: the number of tasks to add
+    @param task_store_type: optional task store for every talent
+    @return bytes per task, traced and counted
+    """
+    tasks = [(f"Task{i}", f"Talent{i % 2}") for i in range(total_tasks)]
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    tree = TTree(task_store_type)
+    for task_name, talent_name in tasks:
+        tree.add_task(task_name, talent_name)
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'traced_bytes_per_task': (end - start) / total_tasks,
+        'counted_bytes_per_task': get_tree_memory_size(tree.head) / total_tasks,
+    }
+
+def run(total_talents: int, total_tasks: int) -> list:
+    """
+    Runs the memory benchmark with Task Nodes and with each task store.
+    @return a row of results for each kind of task storage
+    """
+    task_stores = [('task nodes', None), ('task heap', TaskHeap)]
+    # numpy is optional
+    if task_columns.np is not None:
+        task_stores.append(('columns', TaskColumns))
+
+    results = []
+    for label, task_store_type in task_stores:
+        row = {'storage': label}
+        row.update(measure_talents(total_talents, task_store_type))
+        row.update(measure_tasks(total_tasks, task_store_type))
+        results.append(row)
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Reports the bytes used per talent and per task.")
+    parser.add_argument('--talents', type=int, default=10000)
+    parser.add_argument('--tasks', type=int, default=20000)
+    args = parser.parse_args()
+
+    for row in run(args.talents, args.tasks):
+        print(f"{row['storage']:>10}: "
+              f"{row['traced_bytes_per_talent']:8.1f} B/talent traced, {row['counted_bytes_per_talent']:8.1f} counted | "
+              f"{row['traced_bytes_per_task']:8.1f} B/task traced, {row['counted_bytes_per_task']:8.1f} counted")
@@ -0,0 +1,218 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import time
+import tracemalloc
+from structs import TTree
+from tests.helpers import TestHelpers
+
+def build_adds(rng: random.Random, total_talents: int, tasks_per_talent: int) -> tuple:
+    """
+    Adds every task of every talent, a talent at a time, to a new tree.
+    @param rng: random number generator for the order of the talents
+    @param total_talents: the number of talents
+    @param tasks_per_talent: the number of tasks each talent gets
+    @return the tree and the calls to time
+    """
+    tree = TTree()
+    talents = [f"Talent{talent}" for talent in range(total_talents)]
+    rng.shuffle(talents)
+    calls = [(tree.add_task, (f"Task {task}", talent_name)) for talent_name in talents for task in range(tasks_per_talent)]
+    return tree, calls
+
+def build_accesses(rng: random.Random, total_talents: int, tasks_per_talent: int, skew: float) -> tuple:
+    """
+    Adds every task, then accesses tasks with Zipf-like weights on the talents.
+    Only the accesses are timed.
+    @param rng: random number generator for the accesses
+    @param total_talents: the number of talents
+    @param tasks_per_talent: the number of tasks each talent gets
+    @param skew: how much the first talents are favored, 0 for no favorites
+    @return the tree and the calls to time
+    """
+    tree = TTree()
+    for task in range(tasks_per_talent):
+        tree.add_tasks((f"Task {task}", f"Talent{talent}") for talent in range(total_talents))
+    weights = [1 / (talent + 1) ** skew for talent in range(total_talents)]
+    talents = rng.choices(range(total_talents), weights=weights, k=total_talents * tasks_per_talent)
+    calls = [(tree.access_task, (f"Task {rng.randrange(tasks_per_talent)}", f"Talent{talent}")) for talent in talents]
+    return tree, calls
+
+def build_burnout(rng: random.Random, total_talents: int, run_length: int) -> tuple:
+    """
+    Adds long runs of tasks to the same talent, so talents keep burning out.
+    @param rng: random number generator for the order of the runs
+    @param total_talents: the number of talents
+    @param run_length: the number of tasks in a row for each talent
+    @return the tree and the calls to time
+    """
+    tree = TTree()
+    runs = [f"Talent{talent}" for talent in range(total_talents)] * 4
+    rng.shuffle(runs)
+    calls = [(tree.add_task, (f"Task {task}", talent_name)) for talent_name in runs for task in range(run_length)]
+    return tree, calls
+
+def build_promotions(rng: random.Random, total_trees: int, is_gapped: bool) -> tuple:
+    """
+    Builds balanced trees with the test helpers and times the single add that promotes
+    a talent in each. A robust tree promotes into an existing rank, a gapped one makes a new rank.
+    @param rng: random number generator to seed the helpers' random tasks
+    @param total_trees: the number of trees, one promotion each
+    @param is_gapped: whether to build gapped balanced trees instead of robust ones
+    @return the trees and the calls to time
+    """
+    helpers = TestHelpers()
+    # the helpers make their tasks with the random module
+    random.seed(rng.random())
+    trees = []
+    calls = []
+    for _ in range(total_trees):
+        tree = TTree()
+        if is_gapped:
+            talent_name = helpers.build_gapped_balanced_tree(tree)
+            # its last promotion emptied its recent tasks, fill them up to one short so the next task promotes
+            talent_node = tree._find_talent_node(talent_name, tree.head)
+            while len(talent_node.recent_task_map) < talent_node.max_tasks - 1:
+                helpers.add_single_task(tree, talent_name)
+        else:
+            talent_name = helpers.build_robust_balanced_tree(tree)
+        trees.append(tree)
+        calls.append((tree.add_task, ("Promotion", talent_name)))
+    return trees, calls
+
+def build_deaths(rng: random.Random, total_trees: int, total_talents: int) -> tuple:
+    """
+    Builds trees and times killing each one.
+    @param rng: random number generator for the tasks
+    @param total_trees: the number of trees, one death each
+    @param total_talents: the number of talents in each tree
+    @return the trees and the calls to time
+    """
+    trees = []
+    for _ in range(total_trees):
+        tree = TTree()
+        tree.add_tasks((f"Task {rng.randrange(10)}", f"Talent{rng.randrange(total_talents)}") for _ in range(total_talents * 5))
+        trees.append(tree)
+    return trees, [(tree.die, ()) for tree in trees]
+
+def get_scenarios(scale: float = 1.0) -> list:
+    """
+    Gets every scenario in the sweep.
+    @param scale: multiplies the size of every scenario, below 1 for a quick run
+    @return list of (operation, parameters, builder) where the builder takes a random number generator
+    """
+    def scaled(size: int) -> int:
+        return max(1, int(size * scale))
+
+    scenarios = []
+    for total_talents in (10, 100, 1000):
+        for tasks_per_talent in (5, 20):
+            parameters = {'talents': scaled(total_talents), 'tasks_per_talent': tasks_per_talent}
+            scenarios.append(('add_task', parameters, lambda rng, p=parameters: build_adds(rng, p['talents'], p['tasks_per_talent'])))
+    for skew in (0.0, 1.0, 2.0):
+        parameters = {'talents': scaled(1000), 'tasks_per_talent': 5, 'skew': skew}
+        scenarios.append(('access_task', parameters, lambda rng, p=parameters: build_accesses(rng, p['talents'], p['tasks_per_talent'], p['skew'])))
+    for run_length in (3, 10, 50):
+        parameters = {'talents': scaled(100), 'run_length': run_length}
+        scenarios.append(('burnout', parameters, lambda rng, p=parameters: build_burnout(rng, p['talents'], p['run_length'])))
+    for is_gapped in (False, True):
+        parameters = {'trees': scaled(500), 'fixture': 'gapped' if is_gapped else 'robust'}
+        scenarios.append(('promotion', parameters, lambda rng, p=parameters: build_promotions(rng, p['trees'], p['fixture'] == 'gapped')))
+    for total_talents in (10, 100, 1000):
+        parameters = {'trees': scaled(20), 'talents': scaled(total_talents)}
+        scenarios.append(('die', parameters, lambda rng, p=parameters: build_deaths(rng, p['trees'], p['talents'])))
+    return scenarios
+
+def measure(builder, seed: int = 0) -> dict:
+    """
+    Times every call a scenario makes, one at a time, then runs it again
+    with tracemalloc on for its peak memory, building included.
+    @param builder: function that's given a random number generator and returns what to keep alive and the calls to time
+    @param seed: the seed of the random number generator, so every run makes the same calls
+    @return ops, ops_per_second, p50_us, p99_us and peak_memory_bytes
+    """
+    _, calls = builder(random.Random(seed))
+    latencies = []
+    gc.collect()
+    gc.disable()
+    try:
+        for function, arguments in calls:
+            start = time.perf_counter_ns()
+            function(*arguments)
+            latencies.append(time.perf_counter_ns() - start)
+    finally:
+        gc.enable()
+    del calls
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        _, calls = builder(random.Random(seed))
+        for function, arguments in calls:
+            function(*arguments)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'ops': len(latencies),
+        'ops_per_second': len(latencies) / (sum(latencies) / 1e9) if sum(latencies) else 0.0,
+        'p50_us': _get_percentile(latencies, 50) / 1000,
+        'p99_us': _get_percentile(latencies, 99) / 1000,
+        'peak_memory_bytes': peak - start,
+    }
+
+def run(scale: float = 1.0, only: str = None, seed: int = 0) -> dict:
+    """
+    Runs the sweep.
+    @param scale: multiplies the size of every scenario
+    @param only: optional operation to run, like 'promotion'
+    @param seed: the seed every scenario starts from
+    @return the results, with what they were run on, ready to be written as JSON
+    """
+    results = []
+    for operation, parameters, builder in get_scenarios(scale):
+        if only and operation != only:
+            continue
+        row = {'operation': operation, 'parameters': parameters}
+        row.update(measure(builder, seed))
+        results.append(row)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'scale': scale,
+        'seed': seed,
+        'results': results,
+    }
+
+def _get_percentile(sorted_values: list, percentile: float) -> float:
+    """
+    @return the nearest-rank percentile of values that are already sorted, 0 if there are none
+    """
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, round(percentile / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Reports ops/sec, latency and peak memory as the tree grows.")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiplies the size of every scenario, below 1 for a quick run")
+    parser.add_argument('--only', choices=('add_task', 'access_task', 'burnout', 'promotion', 'die'), help="only run this operation")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', metavar='JSON', help="write the results to this file to compare against other versions")
+    args = parser.parse_args()
+
+    report = run(args.scale, args.only, args.seed)
+    for row in report['results']:
+        parameters = ', '.join(f"{name}={value}" for name, value in row['parameters'].items())
+        print(f"{row['operation']:>11} {parameters:<40} {row['ops_per_second']:>12,.0f} ops/s | "
+              f"p50 {row['p50_us']:9.1f} us, p99 {row['p99_us']:9.1f} us | {row['peak_memory_bytes'] / 1024:10.1f} KiB peak")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"Saved the results to {args.output}")
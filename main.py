@@ -0,0 +1,107 @@
+import argparse
+import json
+import sys
+import time
+from structs import TTree, TaskHeap, TaskColumns
+from utils.ingest import read_events, ingest_events
+from utils.snapshot import save_snapshot, load_snapshot
+from utils.journal import recover, checkpoint
+from utils.lost_talents import LostTalentArchive
+from utils.simulation import simulate_population
+
+TASK_STORES = {
+    'nodes': None,
+    'heap': TaskHeap,
+    'columns': TaskColumns,
+}
+
+def ingest(args) -> TTree:
+    """
+    Replays an event log into a new tree, or one loaded from a snapshot,
+    reporting progress to stderr as it goes.
+    @param args: parsed command line arguments
+    @return the tree the events were replayed into
+    """
+    lost_talents = LostTalentArchive(args.archive) if args.archive else None
+    if args.journal:
+        tree = recover(args.load, args.journal, TASK_STORES[args.task_store], lost_talents=lost_talents)
+    elif args.load:
+        tree = load_snapshot(args.load, lost_talents)
+    else:
+        tree = TTree(task_store_type=TASK_STORES[args.task_store])
+        if lost_talents is not None:
+            tree.lost_talents = lost_talents
+
+    def report(totals: dict) -> None:
+        print(f"\r{totals['events']:,} events, {totals['events_per_second']:,.0f} events/sec", end='', file=sys.stderr)
+
+    totals = ingest_events(tree, read_events(args.path, args.format), args.chunk_size, report)
+    print(file=sys.stderr)
+    print(f"{totals['events']:,} events ({totals['adds']:,} adds, {totals['accesses']:,} accesses, {totals['found']:,} found) "
+          f"in {totals['seconds']:.2f}s, {totals['events_per_second']:,.0f} events/sec")
+    print(f"{tree.total_nodes:,} talents in the tree, {len(tree.lost_talents):,} lost, time is {tree.time:,}")
+    if args.save and tree.journal is not None:
+        checkpoint(tree, args.save)
+        print(f"Saved a snapshot to {args.save} and emptied the journal")
+    elif args.save:
+        save_snapshot(tree, args.save)
+        print(f"Saved a snapshot to {args.save}")
+    if tree.journal is not None:
+        tree.journal.close()
+    if lost_talents is not None:
+        lost_talents.close()
+    return tree
+
+def simulate(args) -> list:
+    """
+    Simulates a population of learners, a tree each, across a pool of processes
+    and prints what they add up to.
+    @param args: parsed command line arguments
+    @return the summary of each learner
+    """
+    start = time.perf_counter()
+    summaries = simulate_population(range(args.first_seed, args.first_seed + args.learners), args.workers,
+                                    max_rank=args.max_rank, task_store_type=TASK_STORES[args.task_store],
+                                    total_tasks=args.tasks, total_talents=args.talents, access_ratio=args.access_ratio, skew=args.skew)
+    seconds = time.perf_counter() - start
+
+    rank_histogram = [sum(bins) for bins in zip(*(summary['rank_histogram'] for summary in summaries))]
+    print(f"{len(summaries):,} learners in {seconds:.2f}s, {len(summaries) / seconds:,.1f} learners/sec")
+    print(f"{sum(summary['burnt_out'] for summary in summaries):,} burnt out, {sum(summary['lost'] for summary in summaries):,} lost")
+    print(f"talents at each rank: {rank_histogram}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(summaries, file)
+        print(f"Saved every summary to {args.output}")
+    return summaries
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Feeds activity into a T Tree.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = commands.add_parser('ingest', help="replay add and access events from a JSONL or CSV log")
+    ingest_parser.add_argument('path', help="path to the log, or - to read from stdin")
+    ingest_parser.add_argument('--format', choices=('jsonl', 'csv'), help="format of the log, guessed from the extension if not given")
+    ingest_parser.add_argument('--chunk-size', type=int, default=10000, help="events to apply at a time")
+    ingest_parser.add_argument('--task-store', choices=tuple(TASK_STORES), default='nodes', help="where each talent keeps its tasks")
+    ingest_parser.add_argument('--load', metavar='SNAPSHOT', help="start from a saved snapshot instead of a new tree")
+    ingest_parser.add_argument('--save', metavar='SNAPSHOT', help="save a snapshot of the tree when done")
+    ingest_parser.add_argument('--archive', metavar='ARCHIVE', help="keep lost talents in this file instead of in memory")
+    ingest_parser.add_argument('--journal', metavar='JOURNAL', help="replay this journal on top of --load first, then journal every event to it")
+    ingest_parser.set_defaults(func=ingest)
+
+    simulate_parser = commands.add_parser('simulate', help="run a tree per simulated learner across a pool of processes")
+    simulate_parser.add_argument('--learners', type=int, default=1000, help="number of learners, a tree each")
+    simulate_parser.add_argument('--first-seed', type=int, default=0, help="seed of the first learner's schedule, the rest count up from it")
+    simulate_parser.add_argument('--tasks', type=int, default=1000, help="events in each learner's schedule")
+    simulate_parser.add_argument('--talents', type=int, default=20, help="talents each learner picks from")
+    simulate_parser.add_argument('--access-ratio', type=float, default=0.3, help="share of events that access a task instead of adding one")
+    simulate_parser.add_argument('--skew', type=float, default=1.0, help="how much the first talents are favored, higher burns them out")
+    simulate_parser.add_argument('--max-rank', type=int, default=15, help="highest rank with its own bin in the histograms")
+    simulate_parser.add_argument('--task-store', choices=tuple(TASK_STORES), default='nodes', help="where each talent keeps its tasks")
+    simulate_parser.add_argument('--workers', type=int, help="number of processes, the number of CPUs if not given")
+    simulate_parser.add_argument('--output', metavar='JSON', help="save every learner's summary to this file")
+    simulate_parser.set_defaults(func=simulate)
+
+    args = parser.parse_args()
+    args.func(args)
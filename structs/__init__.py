@@ -1,5 +1,14 @@
 from .t_tree import TTree
+from .array_t_tree import ArrayTTree
 from .talent_node import TalentNode
 from .task_node import TaskNode
+from .task_heap import TaskHeap
+from .task_columns import TaskColumns
+from .lost_talents import LostTalents
+from .concurrent_t_tree import ConcurrentTTree
+from .async_t_tree import AsyncTTree
+from .sharded_t_tree import ShardedTTree
+from .instruments import Instruments, instrument, uninstrument
+from .events import Events, TalentEvent
 
-__all__ = ['TTree', 'TalentNode', 'TaskNode']
\ No newline at end of file
+__all__ = ['TTree', 'ArrayTTree', 'TalentNode', 'TaskNode', 'TaskHeap', 'TaskColumns', 'LostTalents', 'ConcurrentTTree', 'AsyncTTree', 'ShardedTTree', 'Instruments', 'instrument', 'uninstrument', 'Events', 'TalentEvent']
@@ -0,0 +1,377 @@
+import math
+from structs.talent_node import TalentNode
+from structs.lost_talents import LostTalents, OLDEST
+
+class ArrayTTree:
+    """
+    A T Tree that keeps its Talent Nodes in one array per depth instead of
+    linking them together with bonds. The head sits alone at depth 0 and
+    every depth below it is ordered from the most recently accessed (left)
+    to the least (right). Bonds are computed from positions:
+    the parent of levels[depth][index] is levels[depth - 1][index // 2],
+    so a depth can hold at most twice as many nodes as the depth above it.
+    Moving a node to the left-most position is a single slice shift.
+    @param: task_store_type: Optional class of task store for every Talent Node, like TaskHeap.
+    @param: lost_talent_capacity: Most lost talents to hold on to, None to hold them all.
+    @param: lost_talent_eviction: Which lost talent to let go of past the capacity, OLDEST or LOWEST_RANK.
+    """
+    def __init__(self, task_store_type: type = None, lost_talent_capacity: int = None, lost_talent_eviction: str = OLDEST):
+        # Track total actions or time across the entire T Tree
+        self.time = 0
+        self.total_nodes = 0
+        self.lost_talents = LostTalents(lost_talent_capacity, lost_talent_eviction)
+        # Map of talent names to the Talent Nodes currently in the tree
+        # lost talents are removed from here, so they can't be found
+        self.talent_map = {}
+        self.task_store_type = task_store_type
+        # The head node is an infinite rank Talent Node that is unreachable and unknown
+        self.head = TalentNode(name=None, rank=math.inf)
+        # Talent Nodes at each depth, from left to right
+        self.levels = [[self.head]]
+
+    # Public functions
+    def add_task(self, task_name: str, talent_name: str) -> None:
+        """
+        Adds a task to a talent, creating the talent if it isn't in the tree.
+        The side-effect is shifting this Talent Node to the left-most position
+        at its depth and promoting it if it ranked up.
+        @param: task_name: Name of the task to add.
+        @param: talent_name: Name of the talent to add the task to.
+        """
+        talent_node = self.talent_map.get(talent_name)
+
+        # if the talent node is not found, we need to add it
+        if not talent_node:
+            talent_node = self._create_talent_node(talent_name)
+            self.talent_map[talent_name] = talent_node
+            self.total_nodes += 1
+            depth = None
+        else:
+            depth = self.__get_depth(talent_node.rank)
+
+        # grab the starting rank of the talent node for comparison later
+        starting_rank = talent_node.rank
+        current_time = self._capture_flowing_time()
+        talent_node.store_task(talent_node, task_name, current_time, self.total_nodes)
+
+        # new talents start at the leaf rank, which may not exist yet
+        if depth is None:
+            if self.levels[-1][0].rank != 0:
+                self.levels.append([])
+            depth = len(self.levels) - 1
+
+        self.__move_to_front(talent_node, depth)
+
+        # the talent node's rank may have been updated, in store_task
+        # if so, a promotion is in order
+        if talent_node.rank > starting_rank:
+            self.__promote_talent_node(talent_node, depth)
+
+        return
+
+    def add_tasks(self, tasks) -> None:
+        """
+        Adds a batch of tasks in order, exactly like calling add_task for each one.
+        @param: tasks: Iterable of (task_name, talent_name) pairs.
+        """
+        for task_name, talent_name in tasks:
+            self.add_task(task_name, talent_name)
+
+        return
+
+    def access_task(self, task_name: str, talent_name: str) -> bool:
+        """
+        Accesses a task in the T Tree. The side-effect is shifting
+        this Talent Node to the left-most position at its depth.
+        @param: task_name: Name of the task to access.
+        @param: talent_name: Name of the talent to access.
+        @return: Boolean indicating if the task was found.
+        """
+        talent_node = self.talent_map.get(talent_name)
+        # accessing burns time whether or not the task is found
+        current_time = self._capture_flowing_time()
+        if not talent_node:
+            return False
+
+        task_found = talent_node.recall_task(talent_node.task_head, task_name, current_time)
+
+        if task_found:
+            self.__move_to_front(talent_node, self.__get_depth(talent_node.rank))
+            return True
+
+        return False
+
+    def access_tasks(self, tasks) -> list:
+        """
+        Accesses a batch of tasks in order, exactly like calling access_task for each one.
+        @param: tasks: Iterable of (task_name, talent_name) pairs.
+        @return: List of booleans, True for each task that was found.
+        """
+        return [self.access_task(task_name, talent_name) for task_name, talent_name in tasks]
+
+    def die(self, node: TalentNode = None, show_life: bool = False) -> None:
+        """
+        Destroys T Tree, clearing out all talent nodes and lost talents.
+        Given a talent, only it and its subtree die, and the rest of the tree carries on.
+        All tasks flash before your eyes.
+        @param: node: Node to be sent to oblivion, it has to be in the tree.
+        @param: show_life: Boolean to determine if the node's tasks should be displayed.
+        """
+        if node and node is not self.head and self.talent_map.get(node.name) is not node:
+            raise ValueError(f"'{node.name}' isn't in the tree, it can't die with it.")
+
+        # if it wasn't fed a node, start from the head
+        depth = self.__get_depth(node.rank) if node and node is not self.head else 0
+        index = self.levels[depth].index(node) if depth else 0
+        dying_nodes = self.__collect_subtree(depth, index)
+
+        # children go before their parents, just like the linked tree
+        for talent_node in dying_nodes:
+            if not talent_node.name:
+                continue
+            if talent_node.task_head or talent_node.task_store:
+                if show_life:
+                    print(f"{talent_node.name} is dying. Observe all it knew:")
+                talent_node.review_tasks(talent_node.task_head, show_life)
+                if talent_node.task_store is not None:
+                    talent_node.task_store.review(show_life)
+            else:
+                if show_life:
+                    print(f"{talent_node.name} is dying. It knew nothing.")
+
+        # the rest of the tree lives on without the subtree
+        if depth:
+            self.__cut_subtree(depth, index)
+            for talent_node in dying_nodes:
+                del self.talent_map[talent_node.name]
+            self.total_nodes -= len(dying_nodes)
+            return
+
+        self.lost_talents.review()
+
+        # return to the beginning
+        self.levels = [[self.head]]
+        self.talent_map.clear()
+        self.total_nodes = 0
+        self.time = 0
+
+        return
+
+    # Private functions
+    def __get_depth(self, rank: float) -> int:
+        """
+        Gets the depth holding a given rank. Every depth holds a single rank,
+        and there are only as many depths as there are ranks in the tree.
+        @param: rank: Rank to look for.
+        @return: Depth of the rank if found, None otherwise.
+        """
+        for depth, level in enumerate(self.levels):
+            if level and level[0].rank == rank:
+                return depth
+        return None
+
+    def __get_capacity(self, depth: int) -> int:
+        """
+        Gets the number of Talent Nodes a depth can hold.
+        @param: depth: Depth to measure.
+        @return: Twice the number of nodes at the depth above.
+        """
+        return 2 * len(self.levels[depth - 1])
+
+    def __move_to_front(self, node: TalentNode, depth: int) -> None:
+        """
+        Moves a Talent Node to the left-most position at a depth, shifting
+        the nodes that were to its left one position to the right.
+        Children stay where they are, so they pick up whichever node moved above them.
+        If the depth overflows, the right-most node is lost.
+        @param: node: Node to move.
+        @param: depth: Depth to move it to the front of.
+        """
+        level = self.levels[depth]
+        if level and level[0] is node:
+            return
+
+        if node in level:
+            level.remove(node)
+        level.insert(0, node)
+
+        # the right-most node has nowhere left to go
+        if len(level) > self.__get_capacity(depth):
+            lost_node = level.pop()
+            self.__lose_talent_node(lost_node)
+
+    def __promote_talent_node(self, promoted_node: TalentNode, old_depth: int) -> None:
+        """
+        Promotes the left-most Talent Node at a depth up the T Tree.
+        Be careful! If promoted too early, there's a risk of losing talents.
+        @param: promoted_node: Node to promote, already moved to the front of its depth.
+        @param: old_depth: Depth the promoted node is leaving.
+        """
+        # the promoted node leaves, so everything to its right shifts left
+        self.levels[old_depth].pop(0)
+        parent_rank = self.levels[old_depth - 1][0].rank
+
+        # if the parent's rank matches, join the front of the parent's depth
+        if parent_rank == promoted_node.rank:
+            self.__move_to_front(promoted_node, old_depth - 1)
+        # otherwise the promoted node is alone at a brand new depth,
+        # and only 2 nodes from the old depth fit underneath it
+        else:
+            self.levels.insert(old_depth, [promoted_node])
+
+        self.__trim_levels(old_depth)
+
+        return
+
+    def __trim_levels(self, depth: int) -> None:
+        """
+        Pushes every node that no longer fits under the depth above it to the
+        lost talents, along with its subtree. Starts at the given depth and works down.
+        @param: depth: First depth to trim.
+        """
+        for trim_depth in range(max(depth, 1), len(self.levels)):
+            level = self.levels[trim_depth]
+            capacity = self.__get_capacity(trim_depth)
+            if len(level) <= capacity:
+                continue
+
+            for index in range(capacity, len(level)):
+                for lost_node in self.__collect_subtree(trim_depth, index):
+                    self.__lose_talent_node(lost_node)
+            # the subtrees have been pushed, cut them out of every depth below
+            # and everything left over fits
+            for cut_depth in range(trim_depth, len(self.levels)):
+                del self.levels[cut_depth][capacity:]
+                capacity *= 2
+            break
+
+        # empty depths at the bottom are dead weight
+        while not self.levels[-1]:
+            self.levels.pop()
+
+    def __cut_subtree(self, depth: int, index: int) -> None:
+        """
+        Cuts a node and everything below it out of every depth. The subtree holds a
+        slice of each depth, twice as wide as the one above, so the nodes to its right
+        shift left into the hole, then whatever no longer fits is trimmed.
+        @param: depth: Depth of the root of the subtree.
+        @param: index: Position of the root of the subtree in its depth.
+        """
+        width = 1
+        for cut_depth in range(depth, len(self.levels)):
+            del self.levels[cut_depth][index:index + width]
+            index *= 2
+            width *= 2
+
+        self.__trim_levels(depth)
+
+    def __collect_subtree(self, depth: int, index: int) -> list:
+        """
+        Collects a node and everything below it, children before parents.
+        @param: depth: Depth of the root of the subtree.
+        @param: index: Position of the root of the subtree in its depth.
+        @return: List of Talent Nodes in post order.
+        """
+        subtree = []
+        stack = [(depth, index, False)]
+        while stack:
+            node_depth, node_index, is_visited = stack.pop()
+            if is_visited:
+                subtree.append(self.levels[node_depth][node_index])
+                continue
+
+            stack.append((node_depth, node_index, True))
+            child_depth = node_depth + 1
+            if child_depth < len(self.levels):
+                child_level = self.levels[child_depth]
+                # push the right child first so the left is handled first
+                for child_index in (2 * node_index + 1, 2 * node_index):
+                    if child_index < len(child_level):
+                        stack.append((child_depth, child_index, False))
+        return subtree
+
+    def __lose_talent_node(self, node: TalentNode) -> None:
+        """
+        Pushes a single Talent Node to the lost talents.
+        @param: node: Node that fell out of the tree.
+        """
+        self.lost_talents.append(node)
+        if self.talent_map.get(node.name) is node:
+            del self.talent_map[node.name]
+        self.total_nodes -= 1
+
+    # Internal functions
+    def _create_talent_node(self, talent_name: str) -> TalentNode:
+        """
+        Creates a Talent Node, with its own task store if the tree uses one.
+        @param: talent_name: Name of the talent.
+        @return: The new Talent Node.
+        """
+        task_store = self.task_store_type() if self.task_store_type else None
+        return TalentNode(talent_name, task_store=task_store)
+
+    def _capture_flowing_time(self, is_flowing: bool = True) -> int:
+        """
+        Gets the current time of the T Tree then increments if time is expected to flow.
+        @param: is_flowing: Boolean to determine if time should flow.
+        @return: Current time.
+        """
+        current_time = self.time
+        if is_flowing:
+            self.time += 1
+        return current_time
+
+    def _get_parent(self, node: TalentNode) -> TalentNode:
+        """
+        Gets the parent of a Talent Node from its position.
+        @param: node: Node to get the parent of.
+        @return: Parent node, None for the head or a node that isn't in the tree.
+        """
+        depth = self.__get_depth(node.rank)
+        if not depth:
+            return None
+        return self.levels[depth - 1][self.levels[depth].index(node) // 2]
+
+    def _get_children(self, node: TalentNode) -> tuple:
+        """
+        Gets the children of a Talent Node from its position.
+        @param: node: Node to get the children of.
+        @return: Tuple of the left and right child, either may be None.
+        """
+        depth = self.__get_depth(node.rank)
+        if depth is None or depth + 1 >= len(self.levels):
+            return (None, None)
+        index = self.levels[depth].index(node)
+        child_level = self.levels[depth + 1]
+        child_left = child_level[2 * index] if 2 * index < len(child_level) else None
+        child_right = child_level[2 * index + 1] if 2 * index + 1 < len(child_level) else None
+        return (child_left, child_right)
+
+    def _get_talent_node_list_at_rank(self, rank: float) -> list:
+        """
+        Gets all Talent Nodes at a given rank.
+        @param: rank: Rank to search for.
+        @return: List of Talent Nodes at the given rank from left to right.
+        """
+        depth = self.__get_depth(rank)
+        if depth is None:
+            return []
+        return list(self.levels[depth])
+
+    def _count_total_talents(self, root_node: TalentNode = None) -> int:
+        """
+        Counts the total number of talents in the T Tree.
+        @param: root_node: Unused, kept to match TTree._count_total_talents.
+        @return: Total number of talents.
+        """
+        # the head doesn't count
+        return sum(len(level) for level in self.levels) - 1
+
+    def _find_talent_node(self, talent_name: str, root_node: TalentNode = None) -> TalentNode:
+        """
+        Finds a Talent Node in the T Tree.
+        @param: talent_name: Name of the Talent Node to find.
+        @param: root_node: Unused, kept to match TTree._find_talent_node.
+        @return: Talent Node if found, None otherwise.
+        """
+        return self.talent_map.get(talent_name)
@@ -0,0 +1,212 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from structs.t_tree import TTree
+from structs.lost_talents import OLDEST
+
+# kinds of commands
+ADD = 'add'
+ACCESS = 'access'
+DIE = 'die'
+READ = 'read'
+
+class _Command:
+    """
+    A command waiting in the queue, and the future its caller is waiting on.
+    """
+    __slots__ = ('kind', 'arguments', 'future', 'result', 'error')
+
+    def __init__(self, kind: str, arguments: tuple, future: asyncio.Future):
+        self.kind = kind
+        self.arguments = arguments
+        self.future = future
+        self.result = None
+        self.error = None
+
+class AsyncTTree:
+    """
+    A T Tree for asyncio, that any number of coroutines can share.
+    Every call puts a command in a queue and waits on a future. A single writer coroutine
+    drains the queue a batch at a time and applies the batch on a thread of its own,
+    so long promotions and die() never block the event loop.
+    - Commands are applied one at a time, in the order they were queued, so the tree ends up
+      exactly where applying them one after another would leave it.
+    - A command that fails only fails for its own caller, the rest of its batch goes ahead.
+    - A caller that's cancelled while it waits doesn't take its command back, it's still applied.
+    The writer starts with the first call and stops with close(). Don't touch the wrapped tree
+    directly while the writer is running, use read() to look at it between batches.
+    @param: task_store_type: Optional class of task store for every Talent Node, like TaskHeap.
+    @param: lost_talent_capacity: Most lost talents to hold on to, None to hold them all.
+    @param: lost_talent_eviction: Which lost talent to let go of past the capacity, OLDEST or LOWEST_RANK.
+    @param: tree: An existing tree to share instead of a new one.
+    @param: max_batch_size: Most commands to apply in a single batch.
+    """
+    def __init__(self, task_store_type: type = None, lost_talent_capacity: int = None, lost_talent_eviction: str = OLDEST,
+                 tree: TTree = None, max_batch_size: int = 1000):
+        if max_batch_size < 1:
+            raise ValueError("A batch needs room for at least one command.")
+
+        self.tree = tree if tree is not None else TTree(task_store_type, lost_talent_capacity, lost_talent_eviction)
+        self.max_batch_size = max_batch_size
+        self.queue = asyncio.Queue()
+        # a single thread, so only one batch is ever applied at a time
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='AsyncTTree')
+        self.writer = None
+        self.is_closed = False
+        # metrics, see metrics()
+        self.total_batches = 0
+        self.total_commands = 0
+        self.last_batch_size = 0
+        self.last_batch_latency = 0.0
+        self.max_batch_latency = 0.0
+        self.total_batch_latency = 0.0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    # Public functions
+    async def add_task(self, task_name: str, talent_name: str) -> None:
+        """
+        Adds a task to a talent, like TTree.add_task.
+        @param: task_name: Name of the task to add.
+        @param: talent_name: Name of the talent to add the task to.
+        """
+        await self.__submit(ADD, (task_name, talent_name))
+
+    async def access_task(self, task_name: str, talent_name: str) -> bool:
+        """
+        Accesses a task, like TTree.access_task.
+        @param: task_name: Name of the task to access.
+        @param: talent_name: Name of the talent to access.
+        @return: Boolean indicating if the task was found.
+        """
+        return await self.__submit(ACCESS, (task_name, talent_name))
+
+    async def die(self) -> None:
+        """
+        Destroys the tree, like TTree.die.
+        """
+        await self.__submit(DIE, ())
+
+    async def read(self, reader):
+        """
+        Looks at the tree between batches, like saving a snapshot or counting talents.
+        @param: reader: Function that's given the tree. It runs on the writer's thread and shouldn't change the tree.
+        @return: What the reader returns.
+        """
+        return await self.__submit(READ, (reader,))
+
+    def metrics(self) -> dict:
+        """
+        Gets how the queue and the writer are keeping up. Latencies are in seconds,
+        from when the writer takes a batch to when its futures are set.
+        @return: Dict of queue_depth, total_batches, total_commands, last_batch_size,
+            last_batch_latency, max_batch_latency and mean_batch_latency.
+        """
+        return {
+            'queue_depth': self.queue.qsize(),
+            'total_batches': self.total_batches,
+            'total_commands': self.total_commands,
+            'last_batch_size': self.last_batch_size,
+            'last_batch_latency': self.last_batch_latency,
+            'max_batch_latency': self.max_batch_latency,
+            'mean_batch_latency': self.total_batch_latency / self.total_batches if self.total_batches else 0.0,
+        }
+
+    async def close(self) -> None:
+        """
+        Applies every command already queued, then stops the writer.
+        """
+        if self.is_closed:
+            return
+        self.is_closed = True
+        if self.writer is not None:
+            # None tells the writer there's nothing more to come
+            self.queue.put_nowait(None)
+            await self.writer
+        self.executor.shutdown()
+
+    # Private functions
+    async def __submit(self, kind: str, arguments: tuple):
+        """
+        Queues a command, starting the writer if it isn't running, and waits until it's applied.
+        @param: kind: ADD, ACCESS, DIE or READ.
+        @param: arguments: What the command is applied with.
+        @return: What came of the command.
+        """
+        if self.is_closed:
+            raise RuntimeError("The tree is closed.")
+        loop = asyncio.get_running_loop()
+        if self.writer is None:
+            self.writer = loop.create_task(self.__write())
+
+        command = _Command(kind, arguments, loop.create_future())
+        self.queue.put_nowait(command)
+        return await command.future
+
+    async def __write(self) -> None:
+        """
+        The writer, takes batches off the queue and applies them until it's told to stop.
+        """
+        queue = self.queue
+        loop = asyncio.get_running_loop()
+        is_stopping = False
+        while not is_stopping:
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            # close() turns new commands away, so nothing is queued after the None
+            if None in batch:
+                batch = batch[:batch.index(None)]
+                is_stopping = True
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            await loop.run_in_executor(self.executor, self.__apply_batch, batch)
+            for command in batch:
+                # the caller may have been cancelled, there's no one left to tell
+                if command.future.done():
+                    continue
+                if command.error is not None:
+                    command.future.set_exception(command.error)
+                else:
+                    command.future.set_result(command.result)
+            self.__record_batch(len(batch), time.perf_counter() - started)
+
+    def __apply_batch(self, batch: list) -> None:
+        """
+        Applies a batch of commands in order, keeping what came of each one for its caller.
+        Runs on the writer's thread.
+        @param: batch: The commands to apply.
+        """
+        tree = self.tree
+        for command in batch:
+            try:
+                if command.kind == ADD:
+                    tree.add_task(*command.arguments)
+                elif command.kind == ACCESS:
+                    command.result = tree.access_task(*command.arguments)
+                elif command.kind == DIE:
+                    tree.die()
+                else:
+                    command.result = command.arguments[0](tree)
+            except Exception as error:
+                command.error = error
+
+    def __record_batch(self, batch_size: int, latency: float) -> None:
+        """
+        Adds a batch to the metrics.
+        @param: batch_size: The number of commands in the batch.
+        @param: latency: Seconds it took to apply the batch and set its futures.
+        """
+        self.total_batches += 1
+        self.total_commands += batch_size
+        self.last_batch_size = batch_size
+        self.last_batch_latency = latency
+        self.total_batch_latency += latency
+        if latency > self.max_batch_latency:
+            self.max_batch_latency = latency
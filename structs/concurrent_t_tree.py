@@ -0,0 +1,275 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from structs.t_tree import TTree
+from structs.lost_talents import OLDEST
+
+# kinds of queued calls
+ADD = 'add'
+ACCESS = 'access'
+DIE = 'die'
+
+class ReadWriteLock:
+    """
+    Lets any number of readers hold it at once, or a single writer.
+    A writer holds a plain lock the whole time it writes, and readers only take it long enough
+    to check in, so a reader can't start while a writer holds it and a writer that finds
+    no readers pays for a single lock. It isn't fair: threading.Lock doesn't hand itself out
+    in order, so neither waiting readers nor waiting writers are promised to go first.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.readers_done = threading.Condition(threading.Lock())
+        self.total_readers = 0
+
+    # Public functions
+    def acquire_read(self) -> None:
+        """
+        Waits until there's no writer, then reads.
+        """
+        with self.lock:
+            with self.readers_done:
+                self.total_readers += 1
+
+    def release_read(self) -> None:
+        """
+        Stops reading, letting a writer in if it was the last reader.
+        """
+        with self.readers_done:
+            self.total_readers -= 1
+            if not self.total_readers:
+                self.readers_done.notify_all()
+
+    def acquire_write(self, blocking: bool = True) -> bool:
+        """
+        Waits until there's no other writer and the readers are done, then writes.
+        @param: blocking: Whether to wait for another writer, or give up straight away.
+        @return: True if the lock was taken.
+        """
+        if not self.lock.acquire(blocking):
+            return False
+        # no reader can check in while the lock is held, so the count only goes down from here
+        if self.total_readers:
+            with self.readers_done:
+                while self.total_readers:
+                    self.readers_done.wait()
+        return True
+
+    def release_write(self) -> None:
+        """
+        Stops writing.
+        """
+        self.lock.release()
+
+    @contextmanager
+    def reading(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+class _Call:
+    """
+    A call waiting to be applied to the tree, and what came of it.
+    """
+    __slots__ = ('kind', 'tasks', 'results', 'error', 'is_done')
+
+    def __init__(self, kind: str, tasks: list):
+        self.kind = kind
+        self.tasks = tasks
+        self.results = None
+        self.error = None
+        self.is_done = False
+
+class ConcurrentTTree:
+    """
+    A T Tree that any number of threads can share.
+
+    Locking model: there's one lock for the whole tree, a reader/writer lock.
+    Per-talent locks wouldn't buy anything here: almost every call moves its talent
+    to the front of its level, which changes the tree around it, and the GIL only lets
+    one thread run Python at a time anyway. What's worth saving is the handoff of the lock.
+    - A call that changes the tree (add_task, access_task, their batch forms and die)
+      takes the write lock straight away if nobody has it, and is applied.
+    - If the lock is taken, the call is put in a queue and the caller waits for the lock.
+      Whoever holds the lock applies every call in the queue before letting go,
+      so a thread that finally gets the lock usually finds its call already done
+      and leaves without touching the tree.
+    - Calls are applied one at a time, in the order they were queued, so the tree ends up
+      exactly where applying them one after another would leave it. A call that fails
+      only fails for its own caller, the calls before it stay applied like they would be.
+      The tasks of each call are checked by the caller before they're queued.
+    - reading() holds the read lock, so any number of threads can look at the tree at once,
+      like saving a snapshot or walking the rank levels, while no calls are applied.
+      Don't change the tree while reading.
+    This doesn't make the tree faster with more threads, it can't under the GIL. It runs about
+    as fast as wrapping every call in one plain lock, a little slower with dozens of threads queueing.
+    What it adds over that lock is readers that don't block each other, calls that are checked
+    before they go near the tree, and batch calls that nothing else lands in the middle of.
+    The wrapped TTree can still be used directly, but only while holding the lock.
+    @param: task_store_type: Optional class of task store for every Talent Node, like TaskHeap.
+    @param: lost_talent_capacity: Most lost talents to hold on to, None to hold them all.
+    @param: lost_talent_eviction: Which lost talent to let go of past the capacity, OLDEST or LOWEST_RANK.
+    @param: tree: An existing tree to share instead of a new one.
+    """
+    def __init__(self, task_store_type: type = None, lost_talent_capacity: int = None, lost_talent_eviction: str = OLDEST, tree: TTree = None):
+        self.tree = tree if tree is not None else TTree(task_store_type, lost_talent_capacity, lost_talent_eviction)
+        self.lock = ReadWriteLock()
+        # calls waiting to be applied. appending and popping are safe across threads
+        self.pending_calls = deque()
+
+    # Public functions
+    def add_task(self, task_name: str, talent_name: str) -> None:
+        """
+        Adds a task to a talent, like TTree.add_task.
+        @param: task_name: Name of the task to add.
+        @param: talent_name: Name of the talent to add the task to.
+        """
+        self.__check_task(task_name, talent_name)
+        lock = self.lock
+        # the common case, nobody else has the lock and nothing is queued
+        if lock.acquire_write(blocking=False):
+            try:
+                if self.pending_calls:
+                    self.__apply_pending_calls()
+                self.tree.add_task(task_name, talent_name)
+            finally:
+                lock.release_write()
+            return
+        self.__call(ADD, [(task_name, talent_name)])
+
+    def add_tasks(self, tasks) -> None:
+        """
+        Adds a batch of tasks in order, like TTree.add_tasks. No other call lands in the middle of it.
+        @param: tasks: Iterable of (task_name, talent_name) pairs.
+        """
+        self.__call(ADD, self.__check_tasks(tasks))
+
+    def access_task(self, task_name: str, talent_name: str) -> bool:
+        """
+        Accesses a task, like TTree.access_task.
+        @param: task_name: Name of the task to access.
+        @param: talent_name: Name of the talent to access.
+        @return: Boolean indicating if the task was found.
+        """
+        self.__check_task(task_name, talent_name)
+        lock = self.lock
+        if lock.acquire_write(blocking=False):
+            try:
+                if self.pending_calls:
+                    self.__apply_pending_calls()
+                return self.tree.access_task(task_name, talent_name)
+            finally:
+                lock.release_write()
+        return self.__call(ACCESS, [(task_name, talent_name)])[0]
+
+    def access_tasks(self, tasks) -> list:
+        """
+        Accesses a batch of tasks in order, like TTree.access_tasks. No other call lands in the middle of it.
+        @param: tasks: Iterable of (task_name, talent_name) pairs.
+        @return: List of booleans, True for each task that was found.
+        """
+        return self.__call(ACCESS, self.__check_tasks(tasks))
+
+    def die(self) -> None:
+        """
+        Destroys the tree, like TTree.die.
+        """
+        self.__call(DIE, [])
+
+    @contextmanager
+    def reading(self):
+        """
+        Holds the read lock while looking at the tree.
+        @return: The tree, to look at but not change.
+        """
+        with self.lock.reading():
+            yield self.tree
+
+    # Private functions
+    def __check_tasks(self, tasks) -> list:
+        """
+        Checks the tasks of a call in the caller's thread, so a bad one never gets near the tree.
+        @param: tasks: Iterable of (task_name, talent_name) pairs.
+        @return: List of the pairs.
+        """
+        checked_tasks = []
+        for task_name, talent_name in tasks:
+            self.__check_task(task_name, talent_name)
+            checked_tasks.append((task_name, talent_name))
+        return checked_tasks
+
+    def __check_task(self, task_name: str, talent_name: str) -> None:
+        """
+        Checks a task and its talent can go in the tree.
+        @param: task_name: Name of the task.
+        @param: talent_name: Name of the talent.
+        """
+        if talent_name is None:
+            raise ValueError("A talent needs a name, only the head of the tree has none.")
+        # names are looked up in maps, so they have to be hashable
+        hash(task_name)
+        hash(talent_name)
+
+    def __call(self, kind: str, tasks: list):
+        """
+        Applies a call straight away if nobody holds the lock, otherwise queues it
+        and waits until it's applied, applying the queue if nobody else has.
+        @param: kind: ADD, ACCESS or DIE.
+        @param: tasks: The (task_name, talent_name) pairs of the call.
+        @return: What came of the call.
+        """
+        call = _Call(kind, tasks)
+        if self.lock.acquire_write(blocking=False):
+            try:
+                # calls queued before this one go first
+                if self.pending_calls:
+                    self.__apply_pending_calls()
+                self.__apply_call(call)
+            finally:
+                self.lock.release_write()
+        else:
+            self.pending_calls.append(call)
+            self.lock.acquire_write()
+            try:
+                if not call.is_done:
+                    self.__apply_pending_calls()
+            finally:
+                self.lock.release_write()
+
+        if call.error is not None:
+            raise call.error
+        return call.results
+
+    def __apply_pending_calls(self) -> None:
+        """
+        Applies every queued call in order. Only called holding the write lock.
+        """
+        pending_calls = self.pending_calls
+        while pending_calls:
+            self.__apply_call(pending_calls.popleft())
+
+    def __apply_call(self, call: _Call) -> None:
+        """
+        Applies a call to the tree, keeping what came of it for its caller.
+        @param: call: The call to apply.
+        """
+        try:
+            if call.kind == ADD:
+                self.tree.add_tasks(call.tasks)
+            elif call.kind == ACCESS:
+                call.results = self.tree.access_tasks(call.tasks)
+            else:
+                self.tree.die()
+        except Exception as error:
+            call.error = error
+        call.is_done = True
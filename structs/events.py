@@ -0,0 +1,97 @@
+from collections import namedtuple
+
+# kinds of events
+PROMOTED = 'promoted'     # a talent ranked up and was promoted up the tree
+BURNT_OUT = 'burnt_out'   # a talent went from fine to burnt out
+RELEARNED = 'relearned'   # a talent waited too long between tasks and forgot its recent tasks
+LOST = 'lost'             # a talent was pushed out of the tree to the lost talents
+KINDS = (PROMOTED, BURNT_OUT, RELEARNED, LOST)
+
+# what subscribers are given. the rank is the talent's rank when it happened,
+# the new one for a promotion, and the time is the tree's time when it happened
+TalentEvent = namedtuple('TalentEvent', ('kind', 'talent_node', 'rank', 'time'))
+
+class _Subscription:
+    """
+    A subscriber, what it wants to hear about and, if it's batched, the events it hasn't been given yet.
+    """
+    __slots__ = ('callback', 'kinds', 'talent_node', 'is_batched', 'pending')
+
+    def __init__(self, callback, kinds: frozenset, talent_node, is_batched: bool):
+        self.callback = callback
+        self.kinds = kinds
+        self.talent_node = talent_node
+        self.is_batched = is_batched
+        self.pending = []
+
+class Events:
+    """
+    Hands a tree's transitions to whoever subscribed to them. Every TTree has one,
+    and its Talent Nodes share it. With no subscribers, an event is dropped as soon as it's emitted.
+    - A synchronous subscriber is called with each TalentEvent the moment it happens, in the middle
+      of the tree's operation. It shouldn't change the tree, and the tree may be halfway through a shift.
+    - A batched subscriber is called with a list of TalentEvents, in order, whenever flush() is called,
+      so it can look at the tree once the operation is done.
+    """
+    def __init__(self):
+        self.subscriptions = []
+
+    # Public functions
+    def subscribe(self, callback, kinds=None, talent_node=None, is_batched: bool = False):
+        """
+        Subscribes to events.
+        @param: callback: Function that's given a TalentEvent, or a list of them if it's batched.
+        @param: kinds: Kinds of events to hear about, like PROMOTED or LOST. Every kind if not given.
+        @param: talent_node: Only hear about this Talent Node. Every talent if not given.
+        @param: is_batched: Whether to hold the events until flush() instead of calling right away.
+        @return: The callback, so this works as a decorator.
+        """
+        if kinds is not None:
+            kinds = frozenset(kinds)
+            unknown_kinds = kinds.difference(KINDS)
+            if unknown_kinds:
+                raise ValueError(f"Unknown kinds of events {sorted(unknown_kinds)}, expected some of {KINDS}.")
+        self.subscriptions.append(_Subscription(callback, kinds, talent_node, is_batched))
+        return callback
+
+    def unsubscribe(self, callback, talent_node=None) -> None:
+        """
+        Stops calling a subscriber. Batched events it hasn't been given yet are dropped.
+        @param: callback: The function that was subscribed.
+        @param: talent_node: The Talent Node it was subscribed to, if it was.
+        """
+        self.subscriptions = [subscription for subscription in self.subscriptions
+                              if subscription.callback != callback or subscription.talent_node is not talent_node]
+
+    def emit(self, kind: str, talent_node, rank: float, time: int) -> None:
+        """
+        Sends an event to everyone subscribed to it.
+        @param: kind: One of KINDS.
+        @param: talent_node: The Talent Node it happened to.
+        @param: rank: The talent's rank when it happened.
+        @param: time: The tree's time when it happened.
+        """
+        if not self.subscriptions:
+            return
+
+        event = TalentEvent(kind, talent_node, rank, time)
+        # a callback may unsubscribe, so go through a copy
+        for subscription in tuple(self.subscriptions):
+            if subscription.kinds is not None and kind not in subscription.kinds:
+                continue
+            if subscription.talent_node is not None and subscription.talent_node is not talent_node:
+                continue
+            if subscription.is_batched:
+                subscription.pending.append(event)
+            else:
+                subscription.callback(event)
+
+    def flush(self) -> None:
+        """
+        Gives every batched subscriber the events it's been waiting on.
+        """
+        for subscription in tuple(self.subscriptions):
+            if subscription.pending:
+                pending = subscription.pending
+                subscription.pending = []
+                subscription.callback(pending)
@@ -0,0 +1,151 @@
+import time
+from bisect import bisect_left
+
+# counters, what each one counts
+NODES_VISITED = 'nodes_visited'           # Talent Nodes looked at to find a talent
+BONDS_ADDED = 'bonds_added'               # bonds made between a Talent Node and its parent, mostly by shifts
+BONDS_DISSOLVED = 'bonds_dissolved'       # bonds broken between a Talent Node and its parent, mostly by shifts
+TALENTS_LOST = 'talents_lost'             # Talent Nodes pushed to the lost talents
+HEAPIFY_SWAPS = 'heapify_swaps'           # tasks swapped to keep the most recently accessed on top
+PROMOTIONS = 'promotions'                 # Talent Nodes promoted up the tree
+COUNTERS = (NODES_VISITED, BONDS_ADDED, BONDS_DISSOLVED, TALENTS_LOST, HEAPIFY_SWAPS, PROMOTIONS)
+# the tree's operations that are timed
+OPERATIONS = ('add_task', 'add_tasks', 'access_task', 'access_tasks', 'die')
+# upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 0.1, 1.0)
+
+class Instruments:
+    """
+    Counts what a T Tree does to itself and how long each operation takes.
+    Nothing is counted until it's handed to instrument(), and a tree without instruments
+    only pays for checking that it has none.
+    @param: latency_buckets: Upper bounds of the latency buckets in seconds, smallest first.
+    """
+    def __init__(self, latency_buckets: tuple = LATENCY_BUCKETS):
+        self.latency_buckets = tuple(latency_buckets)
+        self.reset()
+
+    # Public functions
+    def count(self, counter: str, amount: int = 1) -> None:
+        """
+        Adds to a counter.
+        @param: counter: One of COUNTERS.
+        @param: amount: How much to add.
+        """
+        self.counters[counter] += amount
+
+    def observe(self, operation: str, seconds: float) -> None:
+        """
+        Adds how long an operation took to its histogram.
+        @param: operation: Name of the operation.
+        @param: seconds: How long it took.
+        """
+        histogram = self.histograms.get(operation)
+        if histogram is None:
+            histogram = self.histograms[operation] = [0] * (len(self.latency_buckets) + 1)
+            self.latency_sums[operation] = 0.0
+        # the last bucket is for anything slower than every bound
+        histogram[bisect_left(self.latency_buckets, seconds)] += 1
+        self.latency_sums[operation] += seconds
+
+    def timed(self, operation: str, function):
+        """
+        Wraps a function so every call is observed.
+        @param: operation: Name of the operation.
+        @param: function: The function to time.
+        @return: The wrapped function.
+        """
+        observe = self.observe
+        perf_counter = time.perf_counter
+
+        def timed_function(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(operation, perf_counter() - started)
+
+        timed_function.__wrapped__ = function
+        return timed_function
+
+    def reset(self) -> None:
+        """
+        Zeroes every counter and histogram.
+        """
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        # histograms of each operation, a count per bucket plus one for anything slower
+        self.histograms = {}
+        self.latency_sums = {}
+
+    def to_dict(self) -> dict:
+        """
+        @return: Dict of counters, and of operations with the count, total seconds
+            and cumulative count at each bucket bound of every operation.
+        """
+        operations = {}
+        for operation, histogram in self.histograms.items():
+            cumulative = []
+            total = 0
+            for bucket_count in histogram:
+                total += bucket_count
+                cumulative.append(total)
+            operations[operation] = {
+                'count': total,
+                'sum': self.latency_sums[operation],
+                'buckets': dict(zip(self.latency_buckets + (float('inf'),), cumulative)),
+            }
+        return {'counters': dict(self.counters), 'operations': operations}
+
+    def to_prometheus(self, prefix: str = 'ttree') -> str:
+        """
+        Writes the counters and histograms in the Prometheus text format.
+        @param: prefix: What every metric name starts with.
+        @return: The metrics, a line each.
+        """
+        values = self.to_dict()
+        lines = []
+        for counter, value in values['counters'].items():
+            lines.append(f"# TYPE {prefix}_{counter}_total counter")
+            lines.append(f"{prefix}_{counter}_total {value}")
+
+        name = f"{prefix}_operation_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        for operation, histogram in values['operations'].items():
+            for bound, cumulative in histogram['buckets'].items():
+                bound = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{{operation="{operation}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{operation="{operation}"}} {histogram["sum"]!r}')
+            lines.append(f'{name}_count{{operation="{operation}"}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+def instrument(tree, instruments: Instruments = None) -> Instruments:
+    """
+    Starts counting what a tree does. Its operations are timed by wrapping them on the tree itself,
+    so the class is left alone and uninstrumented trees aren't slowed down.
+    @param: tree: The TTree to instrument.
+    @param: instruments: Instruments to count with, new ones if not given. Several trees can share them.
+    @return: The instruments.
+    """
+    if instruments is None:
+        instruments = Instruments()
+    uninstrument(tree)
+
+    tree.instruments = instruments
+    for talent_node in tree.talent_map.values():
+        talent_node._set_instruments(instruments)
+    for operation in OPERATIONS:
+        setattr(tree, operation, instruments.timed(operation, getattr(tree, operation)))
+    return instruments
+
+def uninstrument(tree) -> None:
+    """
+    Stops counting what a tree does. The instruments keep what they've counted.
+    @param: tree: The TTree to stop instrumenting.
+    """
+    if tree.instruments is None:
+        return
+    tree.instruments = None
+    for talent_node in tree.talent_map.values():
+        talent_node._set_instruments(None)
+    for operation in OPERATIONS:
+        tree.__dict__.pop(operation, None)
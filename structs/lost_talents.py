@@ -0,0 +1,167 @@
+import heapq
+from structs.talent_node import TalentNode
+
+# eviction policies, which lost talent goes first once there are too many
+OLDEST = 'oldest'
+LOWEST_RANK = 'lowest_rank'
+EVICTIONS = (OLDEST, LOWEST_RANK)
+
+class LostTalents:
+    """
+    Holds the lost talents of a T Tree in the order they were lost, with a map of
+    names to where they are so a lost talent can be found without going through them all.
+    It can be given a capacity, past which a lost talent is evicted for every new one:
+    the oldest lost first, or the lowest rank first (oldest first among equal ranks).
+    Evicted talents are gone for good, their tasks are let go of like they are when the tree dies.
+    @param: capacity: Most lost talents to hold, None to hold them all.
+    @param: eviction: OLDEST or LOWEST_RANK.
+    """
+    def __init__(self, capacity: int = None, eviction: str = OLDEST):
+        if capacity is not None and capacity < 0:
+            raise ValueError("The capacity can't be negative.")
+        if eviction not in EVICTIONS:
+            raise ValueError(f"Unknown eviction '{eviction}', expected one of {', '.join(EVICTIONS)}.")
+
+        self.capacity = capacity
+        self.eviction = eviction
+        self.total_evicted = 0
+        self.__reset()
+
+    def __len__(self) -> int:
+        return len(self.talents) - self.gaps
+
+    def __iter__(self):
+        for talent_node in self.talents:
+            if talent_node is not None:
+                yield talent_node
+
+    def __contains__(self, talent_name: str) -> bool:
+        return talent_name in self.positions
+
+    def __getitem__(self, index):
+        if self.gaps:
+            self.__compact()
+        return self.talents[index]
+
+    # Public functions
+    def append(self, talent_node: TalentNode) -> None:
+        """
+        Holds on to a lost talent, evicting another if that goes past the capacity.
+        @param: talent_node: The talent that was lost.
+        """
+        index = len(self.talents)
+        self.talents.append(talent_node)
+        positions = self.positions.get(talent_node.name)
+        if positions is None:
+            self.positions[talent_node.name] = [index]
+        else:
+            positions.append(index)
+        if self.eviction == LOWEST_RANK:
+            heapq.heappush(self.rank_heap, (talent_node.rank, index))
+
+        if self.capacity is not None and len(self) > self.capacity:
+            self.__evict()
+
+    def get(self, talent_name: str) -> TalentNode:
+        """
+        Gets the last talent lost with a name.
+        @param: talent_name: Name of the talent.
+        @return: The talent, None if no talent with this name is held.
+        """
+        positions = self.positions.get(talent_name)
+        return self.talents[positions[-1]] if positions else None
+
+    def get_all(self, talent_name: str) -> list:
+        """
+        Gets every talent held that was lost with a name, the last one lost first.
+        @param: talent_name: Name of the talent.
+        @return: List of talents.
+        """
+        return [self.talents[index] for index in reversed(self.positions.get(talent_name, ()))]
+
+    def names(self):
+        """
+        @return: The names of every lost talent held.
+        """
+        return self.positions.keys()
+
+    def review(self, show_life: bool = False) -> None:
+        """
+        Deletes every lost talent and their tasks, but allows one last look at the tasks.
+        @param: show_life: Whether or not to show the task names.
+        """
+        for talent_node in self:
+            self.__release(talent_node, show_life)
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        Forgets every lost talent.
+        """
+        self.__reset()
+
+    # Private functions
+    def __reset(self) -> None:
+        """
+        Starts over with no lost talents.
+        """
+        # in the order they were lost, evicted talents leave a None behind until compacted
+        self.talents = []
+        self.gaps = 0
+        # index of the first talent that may not have been evicted
+        self.oldest = 0
+        # (rank, index) of every talent held, only kept when evicting the lowest rank
+        self.rank_heap = []
+        # Map of talent names to the index of each talent with that name, in the order they were lost
+        self.positions = {}
+
+    def __evict(self) -> None:
+        """
+        Evicts a lost talent by the eviction policy.
+        """
+        if self.eviction == OLDEST:
+            while self.talents[self.oldest] is None:
+                self.oldest += 1
+            index = self.oldest
+        else:
+            _, index = heapq.heappop(self.rank_heap)
+
+        talent_node = self.talents[index]
+        self.talents[index] = None
+        self.gaps += 1
+        positions = self.positions[talent_node.name]
+        positions.remove(index)
+        if not positions:
+            del self.positions[talent_node.name]
+        self.total_evicted += 1
+        self.__release(talent_node)
+
+        if self.gaps * 2 > len(self.talents):
+            self.__compact()
+
+    def __compact(self) -> None:
+        """
+        Closes the gaps left by evicted talents.
+        """
+        talents = [talent_node for talent_node in self.talents if talent_node is not None]
+        self.__reset()
+        self.talents = talents
+        for index, talent_node in enumerate(talents):
+            self.positions.setdefault(talent_node.name, []).append(index)
+        if self.eviction == LOWEST_RANK:
+            self.rank_heap = [(talent_node.rank, index) for index, talent_node in enumerate(talents)]
+            heapq.heapify(self.rank_heap)
+
+    def __release(self, talent_node: TalentNode, show_life: bool = False) -> None:
+        """
+        Lets go of a lost talent's tasks.
+        @param: talent_node: The talent to let go of.
+        @param: show_life: Whether or not to show the task names.
+        """
+        # tasks still on disk have nothing in memory to let go of, reading them in would only cost
+        if talent_node._task_loader is not None and not show_life:
+            talent_node._task_loader = None
+            return
+        talent_node.review_tasks(talent_node.task_head, show_life)
+        if talent_node.task_store is not None:
+            talent_node.task_store.review(show_life)
@@ -0,0 +1,302 @@
+import multiprocessing
+import os
+import zlib
+from itertools import groupby
+from operator import itemgetter
+from structs.t_tree import TTree
+from structs.lost_talents import OLDEST
+
+# messages to a shard, each is a tuple starting with its kind
+APPLY = 'apply'
+DIE = 'die'
+READ = 'read'
+STOP = 'stop'
+# most batches sent to a shard before waiting for it to catch up. past this,
+# a shard can end up stuck writing answers nobody reads while the caller is stuck writing batches
+MAX_UNANSWERED = 8
+
+class ShardedTTree:
+    """
+    A T Tree split across worker processes, so it can use more than one core.
+    Talents are hash partitioned by name into shards, each shard is a whole TTree of its own
+    in its own process. Calls are buffered per shard and sent down its pipe in batches,
+    adds don't wait for an answer, so every shard works through its batches at the same time.
+    Every shard applies its calls in the order they were made.
+
+    What's global in a single tree is approximated:
+    - Each shard has its own clock, ticked by its own calls only. A talent sees its shard's time,
+      so gaps between its tasks are about 1/N of what they'd be in a single tree.
+    - The relearn threshold in store_task compares that gap to twice the shard's own total_nodes,
+      which is also about 1/N of the whole. Both sides shrink together, so a talent forgets
+      its recent tasks after about the same share of all activity as it would in a single tree.
+      It's exact with one shard and holds on average when talents spread evenly.
+    - Each shard is its own tree, with its own head and ranks. Promotions only push talents
+      around within their shard, and there's room for about N times as many talents at each rank
+      before any are lost.
+    time and total_nodes add up every shard, so time is still the total number of calls.
+    Names are checked when a call is made. Since adds aren't waited on, anything that still
+    fails in a shard is raised by the next call that waits on that shard.
+    @param: total_shards: Number of worker processes, the number of CPUs if not given.
+    @param: task_store_type: Optional class of task store for every Talent Node, like TaskHeap.
+    @param: lost_talent_capacity: Most lost talents each shard holds on to, None to hold them all.
+    @param: lost_talent_eviction: Which lost talent a shard lets go of past the capacity, OLDEST or LOWEST_RANK.
+    @param: batch_size: Number of calls to buffer for a shard before they're sent.
+    @param: start_method: How to start the workers, like 'fork' or 'spawn'. The platform default if not given.
+    """
+    def __init__(self, total_shards: int = None, task_store_type: type = None, lost_talent_capacity: int = None,
+                 lost_talent_eviction: str = OLDEST, batch_size: int = 1000, start_method: str = None):
+        total_shards = total_shards or os.cpu_count() or 1
+        if batch_size < 1:
+            raise ValueError("A batch needs room for at least one call.")
+
+        self.total_shards = total_shards
+        self.batch_size = batch_size
+        context = multiprocessing.get_context(start_method)
+        self.connections = []
+        self.workers = []
+        for _ in range(total_shards):
+            connection, worker_connection = context.Pipe()
+            worker = context.Process(target=_run_shard, args=(worker_connection, task_store_type, lost_talent_capacity, lost_talent_eviction), daemon=True)
+            worker.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.workers.append(worker)
+        # calls waiting to be sent to each shard, as (is_access, task_name, talent_name)
+        self.buffers = [[] for _ in range(total_shards)]
+        # number of batches sent to each shard that haven't been answered yet
+        self.unanswered = [0] * total_shards
+        self.is_closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def time(self) -> int:
+        """
+        @return: The total number of calls applied, every shard's clock added up.
+        """
+        return sum(shard_time for shard_time, _, _ in self.read(_read_counts))
+
+    @property
+    def total_nodes(self) -> int:
+        """
+        @return: The number of talents in every shard.
+        """
+        return sum(total_nodes for _, total_nodes, _ in self.read(_read_counts))
+
+    # Public functions
+    def get_shard(self, talent_name: str) -> int:
+        """
+        Gets the shard a talent lives in. It's the same for a name in every process and every run.
+        @param: talent_name: Name of the talent.
+        @return: Index of the shard.
+        """
+        return zlib.crc32(talent_name.encode('utf-8')) % self.total_shards
+
+    def add_task(self, task_name: str, talent_name: str) -> None:
+        """
+        Adds a task to a talent, like TTree.add_task. It's sent with the rest of the shard's batch.
+        @param: task_name: Name of the task to add.
+        @param: talent_name: Name of the talent to add the task to.
+        """
+        shard = self.__route(task_name, talent_name)
+        buffer = self.buffers[shard]
+        buffer.append((False, task_name, talent_name))
+        if len(buffer) >= self.batch_size:
+            self.__send(shard)
+
+    def add_tasks(self, tasks) -> None:
+        """
+        Adds a batch of tasks in order, like TTree.add_tasks.
+        @param: tasks: Iterable of (task_name, talent_name) pairs.
+        """
+        for task_name, talent_name in tasks:
+            self.add_task(task_name, talent_name)
+
+    def access_task(self, task_name: str, talent_name: str) -> bool:
+        """
+        Accesses a task, like TTree.access_task. This waits on the talent's shard,
+        use access_tasks to access many at once.
+        @param: task_name: Name of the task to access.
+        @param: talent_name: Name of the talent to access.
+        @return: Boolean indicating if the task was found.
+        """
+        return self.access_tasks([(task_name, talent_name)])[0]
+
+    def access_tasks(self, tasks) -> list:
+        """
+        Accesses a batch of tasks, like TTree.access_tasks. Every shard works on its part at the same time.
+        @param: tasks: Iterable of (task_name, talent_name) pairs.
+        @return: List of booleans, True for each task that was found, in the order of the tasks.
+        """
+        # route every task before buffering any, so a bad name doesn't leave half a batch behind
+        routed_tasks = [(self.__route(task_name, talent_name), task_name, talent_name) for task_name, talent_name in tasks]
+        # where each result will be in its shard's answer
+        places = []
+        accesses_per_shard = [0] * self.total_shards
+        for shard, task_name, talent_name in routed_tasks:
+            self.buffers[shard].append((True, task_name, talent_name))
+            places.append((shard, accesses_per_shard[shard]))
+            accesses_per_shard[shard] += 1
+
+        shards = [shard for shard in range(self.total_shards) if accesses_per_shard[shard]]
+        for shard in shards:
+            self.__send(shard)
+        # the last answer from a shard is for the batch just sent, the ones before it only had adds
+        answers = {shard: self.__receive_all(shard) for shard in shards}
+        return [answers[shard][index] for shard, index in places]
+
+    def die(self) -> None:
+        """
+        Destroys every shard, like TTree.die.
+        """
+        self.flush()
+        for connection in self.connections:
+            connection.send((DIE,))
+        for shard in range(self.total_shards):
+            self.unanswered[shard] += 1
+            self.__receive_all(shard)
+
+    def read(self, reader) -> list:
+        """
+        Looks at every shard, once every call made so far has been applied.
+        @param: reader: Function that's given a shard's tree. It runs in the shard's process,
+            so it has to be picklable, like a function defined at the top of a module.
+        @return: List of what the reader returned for each shard.
+        """
+        self.flush()
+        for connection in self.connections:
+            connection.send((READ, reader))
+        answers = []
+        for shard in range(self.total_shards):
+            self.unanswered[shard] += 1
+            answers.append(self.__receive_all(shard))
+        return answers
+
+    def flush(self) -> None:
+        """
+        Sends every buffered call and waits until every shard has applied them.
+        """
+        for shard in range(self.total_shards):
+            if self.buffers[shard]:
+                self.__send(shard)
+        for shard in range(self.total_shards):
+            self.__receive_all(shard)
+
+    def close(self) -> None:
+        """
+        Applies every buffered call, then stops the workers.
+        """
+        if self.is_closed:
+            return
+        self.flush()
+        self.is_closed = True
+        for connection in self.connections:
+            connection.send((STOP,))
+        for connection, worker in zip(self.connections, self.workers):
+            worker.join()
+            connection.close()
+
+    # Private functions
+    def __route(self, task_name: str, talent_name: str) -> int:
+        """
+        Checks a task can go in a tree and finds its shard, in the caller's process.
+        @param: task_name: Name of the task.
+        @param: talent_name: Name of the talent.
+        @return: Index of the shard.
+        """
+        if not isinstance(talent_name, str):
+            raise TypeError(f"Talent names have to be strings to be sharded, not {type(talent_name).__name__}.")
+        # names are looked up in maps, so they have to be hashable
+        hash(task_name)
+        return self.get_shard(talent_name)
+
+    def __send(self, shard: int) -> None:
+        """
+        Sends a shard's buffered calls as a single batch, without waiting for the answer.
+        Answers that are already in are taken first, and if too many are owed, this waits for them.
+        @param: shard: Index of the shard.
+        """
+        if self.is_closed:
+            raise RuntimeError("The tree is closed.")
+        connection = self.connections[shard]
+        while self.unanswered[shard] >= MAX_UNANSWERED or (self.unanswered[shard] and connection.poll()):
+            self.__receive(shard)
+        connection.send((APPLY, self.buffers[shard]))
+        self.buffers[shard] = []
+        self.unanswered[shard] += 1
+
+    def __receive(self, shard: int):
+        """
+        Waits for the next answer a shard owes.
+        @param: shard: Index of the shard.
+        @return: The answer.
+        """
+        error, answer = self.connections[shard].recv()
+        self.unanswered[shard] -= 1
+        if error is not None:
+            raise error
+        return answer
+
+    def __receive_all(self, shard: int):
+        """
+        Waits for every answer a shard owes.
+        @param: shard: Index of the shard.
+        @return: The last answer, None if none were owed.
+        """
+        answer = None
+        while self.unanswered[shard]:
+            answer = self.__receive(shard)
+        return answer
+
+def _run_shard(connection, task_store_type: type, lost_talent_capacity: int, lost_talent_eviction: str) -> None:
+    """
+    Runs a shard in a worker process, answering every message with (error, answer) until it's told to stop.
+    @param: connection: The shard's end of the pipe.
+    @param: task_store_type: Optional class of task store for every Talent Node.
+    @param: lost_talent_capacity: Most lost talents to hold on to.
+    @param: lost_talent_eviction: Which lost talent to let go of past the capacity.
+    """
+    tree = TTree(task_store_type, lost_talent_capacity, lost_talent_eviction)
+    while True:
+        message = connection.recv()
+        kind = message[0]
+        if kind == STOP:
+            break
+        try:
+            if kind == APPLY:
+                answer = _apply_calls(tree, message[1])
+            elif kind == DIE:
+                answer = tree.die()
+            else:
+                answer = message[1](tree)
+        except Exception as error:
+            connection.send((error, None))
+            continue
+        connection.send((None, answer))
+    connection.close()
+
+def _apply_calls(tree: TTree, calls: list) -> list:
+    """
+    Applies a batch of calls in order, runs of adds and accesses in one go.
+    @param: tree: The shard's tree.
+    @param: calls: List of (is_access, task_name, talent_name).
+    @return: List of booleans for the accesses, in order.
+    """
+    results = []
+    for is_access, run in groupby(calls, key=itemgetter(0)):
+        tasks = [(task_name, talent_name) for _, task_name, talent_name in run]
+        if is_access:
+            results.extend(tree.access_tasks(tasks))
+        else:
+            tree.add_tasks(tasks)
+    return results
+
+def _read_counts(tree: TTree) -> tuple:
+    """
+    @return: The time, total nodes and number of lost talents of a shard.
+    """
+    return tree.time, tree.total_nodes, len(tree.lost_talents)
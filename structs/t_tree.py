@@ -1,45 +1,84 @@
 import math
+from collections import deque
+from itertools import groupby
+from operator import itemgetter
 from structs.talent_node import TalentNode
+from structs.lost_talents import LostTalents, OLDEST
+from structs.traversal import walk_post_order, count_nodes, find_node
+from structs.instruments import NODES_VISITED, BONDS_ADDED, BONDS_DISSOLVED, TALENTS_LOST, PROMOTIONS
+from structs.events import Events, PROMOTED, LOST
 
 class TTree:
-    def __init__(self):
+    """
+    The T Tree, made of Talent Nodes that hold Task Nodes.
+    @param: task_store_type: Optional class of task store for every Talent Node, like TaskHeap.
+    @param: lost_talent_capacity: Most lost talents to hold on to, None to hold them all.
+    @param: lost_talent_eviction: Which lost talent to let go of past the capacity, OLDEST or LOWEST_RANK.
+    """
+    def __init__(self, task_store_type: type = None, lost_talent_capacity: int = None, lost_talent_eviction: str = OLDEST):
         # Track total actions or time across the entire T Tree
         self.time = 0  
         self.total_nodes = 0
-        self.lost_talents = []
+        # kept up as talents change, see stats()
+        self.total_burnt_out = 0
+        self.total_tasks = 0
+        # a LostTalents, or anything that holds lost talents the same way like a LostTalentArchive
+        self.lost_talents = LostTalents(lost_talent_capacity, lost_talent_eviction)
+        # Map of talent names to the Talent Nodes currently in the tree
+        # lost talents are removed from here, so they can't be found
+        self.talent_map = {}
+        self.task_store_type = task_store_type
         # The head node is an infinite rank Talent Node that is unreachable and unknown
         # TODO: should this be a different kind of node that can scale?
         self.head = TalentNode(name=None, rank=math.inf) 
+        # Map of ranks to the Talent Nodes at that rank, from left to right
+        self.rank_levels = {self.head.rank: [self.head]}
+        # optional write-ahead journal, like utils.journal.Journal.
+        # every add, access and death is written to it before it happens
+        self.journal = None
+        # optional Instruments counting what the tree does, see structs.instruments.instrument
+        self.instruments = None
+        # hands promotions, burnouts, relearns and losses to subscribers, shared with every Talent Node
+        self.events = Events()
     
     # Public functions
     def add_task(self, task_name: str, talent_name: str) -> None:
-        # first, try to find the talent node
-        talent_node = self._find_talent_node(talent_name, self.head)
+        """
+        Adds a task to a talent, creating the talent if it isn't in the tree.
+        The side-effect is shifting this Talent Node to the left-most position
+        at its depth and promoting it if it ranked up.
+        @param: task_name: Name of the task to add.
+        @param: talent_name: Name of the talent to add the task to.
+        """
+        if self.journal is not None:
+            self.journal.add_task(self.time, task_name, talent_name)
 
-        # if the talent node is not found, we need to add it
-        if not talent_node:
-            # create an unattached talent node
-            talent_node = TalentNode(talent_name)
-            # and increment the total number of nodes
-            self.total_nodes += 1
+        talent_node = self.__find_or_create_talent_node(talent_name)
+        self.__store_task(talent_node, task_name)
 
-        # grab the starting rank of the talent node for comparison later
-        starting_rank = talent_node.rank
-        current_time = self._capture_flowing_time()
-        talent_node.store_task(talent_node, task_name, current_time, self.total_nodes)
-        parent_rank = talent_node.parent.rank if talent_node.parent else None
+        return
 
-        if talent_node.parent:
-            # create a temporary node to hold this node's bonds
-            self.__create_temporary_node(talent_node)
-            # add this node to the left most position at its depth
-        left_most_uncle = self.__get_left_most_talent_node_at_rank(self.head, parent_rank)
-        self.__shift_talent_nodes_right(talent_node, left_most_uncle)
+    def add_tasks(self, tasks) -> None:
+        """
+        Adds a batch of tasks in order. The tree ends up exactly where calling
+        add_task for each one would leave it, time included.
+        A run of tasks for the same talent looks the talent up once. The tasks still go in
+        one at a time, since each one reads the clock and may promote the talent.
+        @param: tasks: Iterable of (task_name, talent_name) pairs.
+        """
+        talent_name_in_run = None
+        talent_node = None
+        journal = self.journal
 
-        # the talent node's rank may have been updated, in store_task
-        # if so, a promotion is in order
-        if talent_node.rank > starting_rank:
-            self.__promote_talent_node(talent_node)
+        for task_name, talent_name in tasks:
+            if journal is not None:
+                journal.add_task(self.time, task_name, talent_name)
+            # only look up the talent when the run changes. a talent in the tree always
+            # has a parent, so if it lost it, the last task got it lost and it has to be made again
+            if talent_node is None or talent_name != talent_name_in_run or talent_node.parent is None:
+                talent_name_in_run = talent_name
+                talent_node = self.__find_or_create_talent_node(talent_name)
+            self.__store_task(talent_node, task_name)
 
         return
 
@@ -51,6 +90,9 @@ class TTree:
         @param: talent_name: Name of the talent to access.
         @return: Boolean indicating if the task was found.
         """
+        if self.journal is not None:
+            self.journal.access_task(self.time, task_name, talent_name)
+
         talent_node = self._find_talent_node(talent_name, self.head)
         # note that we look up the task and update the time here
         # this means if this task is not found, it burns time for us
@@ -63,102 +105,247 @@ class TTree:
         task_found = talent_node.recall_task(talent_node.task_head, task_name, current_time)
         
         if task_found:
-            parent_rank = talent_node.parent.rank
-            # create a temporary node to hold this node's bonds
-            self.__create_temporary_node(talent_node)
-            # then shift the talent node to the left most position at its depth
-            left_most_uncle = self.__get_left_most_talent_node_at_rank(self.head, parent_rank)
-            self.__shift_talent_nodes_right(talent_node, left_most_uncle)
+            self.__move_talent_node_to_left_most(talent_node)
             return True
         
         return False
 
+    def access_tasks(self, tasks) -> list:
+        """
+        Accesses a batch of tasks in order. The tree ends up exactly where calling
+        access_task for each one would leave it, and time still flows once per task.
+        A run of accesses to the same talent looks the talent up once, recalls its tasks
+        in one go and shifts it at most once.
+        @param: tasks: Iterable of (task_name, talent_name) pairs.
+        @return: List of booleans, True for each task that was found.
+        """
+        results = []
+        journal = self.journal
+
+        for talent_name, run in groupby(tasks, key=itemgetter(1)):
+            task_names = []
+            current_times = []
+            for task_name, _ in run:
+                if journal is not None:
+                    journal.access_task(self.time, task_name, talent_name)
+                task_names.append(task_name)
+                # time still flows for every access, found or not
+                current_times.append(self._capture_flowing_time())
+
+            talent_node = self._find_talent_node(talent_name, self.head)
+            if not talent_node:
+                results.extend([False] * len(task_names))
+                continue
+
+            run_results = talent_node.recall_tasks(task_names, current_times)
+            # accessing a task never loses a talent, so a single shift covers the whole run
+            if True in run_results:
+                self.__move_talent_node_to_left_most(talent_node)
+            results.extend(run_results)
+
+        return results
+
+    def subscribe(self, callback, kinds=None, is_batched: bool = False):
+        """
+        Subscribes to what happens to every talent in the tree, see structs.events.Events.
+        @param: callback: Function that's given a TalentEvent, or a list of them if it's batched.
+        @param: kinds: Kinds of events to hear about, like PROMOTED or LOST. Every kind if not given.
+        @param: is_batched: Whether to hold the events until flush_events() instead of calling right away.
+        @return: The callback, so this works as a decorator.
+        """
+        return self.events.subscribe(callback, kinds, is_batched=is_batched)
+
+    def unsubscribe(self, callback) -> None:
+        """
+        Stops calling a subscriber.
+        @param: callback: The function that was subscribed.
+        """
+        self.events.unsubscribe(callback)
+
+    def flush_events(self) -> None:
+        """
+        Gives every batched subscriber the events it's been waiting on.
+        """
+        self.events.flush()
+
+    def stats(self) -> dict:
+        """
+        Gets the shape of the tree without walking it. Everything is kept up as the tree changes,
+        the population of each rank is read off of the rank levels.
+        @return: Dict of time, talents, talents_per_rank, burnt_out, tasks (converted out of
+            the recent task maps, held by Task Nodes or task stores) and lost_talents.
+        """
+        return {
+            'time': self.time,
+            'talents': self.total_nodes,
+            'talents_per_rank': {rank: len(level) for rank, level in self.rank_levels.items() if rank != self.head.rank},
+            'burnt_out': self.total_burnt_out,
+            'tasks': self.total_tasks,
+            'lost_talents': len(self.lost_talents),
+        }
+
     def die(self, node: TalentNode = None, show_life: bool = False) -> None:
         """
         Destroys T Tree, clearing out all talent nodes and lost talents.
+        Given a talent, only it and its subtree die, and the rest of the tree carries on.
         All tasks flash before your eyes.
-        @param: node: Node to be sent to oblivion.
+        @param: node: Node to be sent to oblivion, it has to be in the tree.
         @param: show_life: Boolean to determine if the node's tasks should be displayed.
         """
+        # a node from somewhere else, like a lost talent, can't be journaled by name
+        # and replayed the same way, the name would find whatever is in the tree by then
+        if node and node is not self.head and self.talent_map.get(node.name) is not node:
+            raise ValueError(f"'{node.name}' isn't in the tree, it can't die with it.")
+
+        if self.journal is not None:
+            self.journal.die(self.time, node.name if node else None)
+
         # if it wasn't fed a node, start from the head
         if not node:
             node = self.head
-        
-        left_child = node.child_left
-        right_child = node.child_right
+        parent = node.parent
 
-        # out of respect, we won't delete the nameless, ininite head node
-        if node.name:
-            if node.parent:
-                if node.parent.child_left == node:
-                    self.__dissolve_bonds(node, node.parent, True)
-                else:
-                    self.__dissolve_bonds(node, node.parent, False)
-            if left_child:
-                self.__dissolve_bonds(left_child, node, True)
-                self.die(left_child, show_life)
-            if right_child:
-                self.__dissolve_bonds(right_child, node, False)
-                self.die(right_child, show_life)
-
-            if node.task_head:
+        # children die before their parents. the walk is gathered up front,
+        # so the bonds can be dissolved along the way
+        for dying_node in walk_post_order(node):
+            # out of respect, we won't delete the nameless, ininite head node
+            if not dying_node.name:
+                continue
+
+            if dying_node.parent:
+                self.__dissolve_bonds(dying_node, dying_node.parent, dying_node.parent.child_left is dying_node)
+            # forget it was ever here
+            if self.talent_map.get(dying_node.name) is dying_node:
+                del self.talent_map[dying_node.name]
+            self.__remove_from_rank_level(dying_node)
+            self.total_nodes -= 1
+            self.total_tasks -= dying_node.total_tasks
+            if dying_node.is_burnout:
+                self.total_burnt_out -= 1
+
+            # tasks still on disk were never read in, so there's nothing to let go of
+            if dying_node._task_loader is not None and not show_life:
+                dying_node._task_loader = None
+            elif dying_node.task_head or dying_node.task_store:
                 if show_life:
-                    print(f"{node.name} is dying. Observe all it knew:")
-                node.review_tasks(node.task_head, show_life)
+                    print(f"{dying_node.name} is dying. Observe all it knew:")
+                dying_node.review_tasks(dying_node.task_head, show_life)
+                if dying_node.task_store is not None:
+                    dying_node.task_store.review(show_life)
             else:
                 if show_life:
-                    print(f"{node.name} is dying. It knew nothing.")
-            del node
+                    print(f"{dying_node.name} is dying. It knew nothing.")
 
-        else:
-            if left_child:
-                self.die(left_child, show_life)
-            if right_child:
-                self.die(right_child, show_life)
+        # the rest of the tree lives on without the subtree
+        if node is not self.head:
+            self.__pack_rank_levels_below(parent.rank)
+            return
 
         # TODO: keep lost talents? do you believe in past lives?
-        while self.lost_talents:
-            lost_talent = self.lost_talents.pop(0)
-            TalentNode.review_tasks(lost_talent.task_head)
-            del lost_talent
+        self.lost_talents.review()
 
         # return to the beginning
+        self.talent_map.clear()
+        self.rank_levels = {self.head.rank: [self.head]}
         self.total_nodes = 0
+        self.total_burnt_out = 0
+        self.total_tasks = 0
         self.time = 0
         
         return
     
     # Private functions
-    def __get_right_sibling(self, left_sibling_node: TalentNode) -> TalentNode:
+    def __find_or_create_talent_node(self, talent_name: str) -> TalentNode:
         """
-        Gets the right sibling of a Talent Node.
-        @param: sibling_node: Node to start the search from.
-        @return: Right sibling of the root node if found, None otherwise.
+        Finds a talent in the tree, or makes it if it isn't there.
+        A new talent is left unattached until its first task is stored.
+        @param: talent_name: Name of the talent.
+        @return: The Talent Node.
         """
+        # first, try to find the talent node
+        talent_node = self._find_talent_node(talent_name, self.head)
 
-        parent_node = left_sibling_node.parent
-        
-        # if there is no parent node, somehow we have lost our way
+        # if the talent node is not found, we need to add it
+        if not talent_node:
+            # create an unattached talent node
+            talent_node = self._create_talent_node(talent_name)
+            self.talent_map[talent_name] = talent_node
+            # and increment the total number of nodes
+            self.total_nodes += 1
+
+        return talent_node
+
+    def __store_task(self, talent_node: TalentNode, task_name: str) -> None:
+        """
+        Stores a task in a Talent Node. The side-effect is shifting this Talent Node
+        to the left-most position at its depth and promoting it if it ranked up.
+        @param: talent_node: Node to store the task in.
+        @param: task_name: Name of the task to store.
+        """
+        # grab the starting rank of the talent node for comparison later
+        starting_rank = talent_node.rank
+        was_burnout = talent_node.is_burnout
+        starting_tasks = talent_node.total_tasks
+        current_time = self._capture_flowing_time()
+        talent_node.store_task(talent_node, task_name, current_time, self.total_nodes)
+        # only storing a task converts tasks or changes burnout
+        self.total_tasks += talent_node.total_tasks - starting_tasks
+        if talent_node.is_burnout != was_burnout:
+            self.total_burnt_out += 1 if talent_node.is_burnout else -1
+        parent_rank = talent_node.parent.rank if talent_node.parent else None
+
+        # if it's already the left-most node at its depth, there's nowhere to move.
+        # this is the common case when a talent gets several tasks in a row
+        if not self.__is_left_most_talent_node(talent_node):
+            if talent_node.parent:
+                # create a temporary node to hold this node's bonds
+                self.__create_temporary_node(talent_node)
+                # add this node to the left most position at its depth
+            left_most_uncle = self.__get_left_most_talent_node_at_rank(parent_rank)
+            self.__shift_talent_nodes_right(talent_node, left_most_uncle)
+            self.__refresh_rank_level(starting_rank)
+        # it didn't move, but if it ranked up it can't be listed at its old rank anymore
+        elif talent_node.rank > starting_rank:
+            self.__refresh_rank_level(starting_rank)
+
+        # the talent node's rank may have been updated, in store_task
+        # if so, a promotion is in order
+        if talent_node.rank > starting_rank:
+            # sent first, so it comes before any talents the promotion loses
+            self.events.emit(PROMOTED, talent_node, talent_node.rank, current_time)
+            self.__promote_talent_node(talent_node)
+
+        return
+
+    def __get_right_sibling(self, left_sibling_node: TalentNode) -> TalentNode:
+        """
+        Gets the next Talent Node to the right at the same depth, whoever its parent is.
+        Climbs until there's a right side to go to, then comes back down it
+        along the left-most path.
+        @param: left_sibling_node: Node to start the search from.
+        @return: Right sibling of the node if found, None otherwise.
+        """
+        node = left_sibling_node
+        # count how far we climb, so we know how far to come back down
+        levels_climbed = 0
+        while node.parent and node.parent.child_right is node:
+            node = node.parent
+            levels_climbed += 1
+
+        parent_node = node.parent
+        # if there is no parent node, this is the right-most node at its depth
         if not parent_node:
             return None
-        
-        # if the left sibling is the left child of the parent,
-        # then the right sibling is the right child of the parent
-        if left_sibling_node == parent_node.child_left:
-            return parent_node.child_right
-        
-        # otherwise, we need to find the grandparent node
-        else:
-            grandparent_node = parent_node.parent
-            # multiple checks to ensure we aren't reaching too far
-            if not grandparent_node:
-                return None
-            if not grandparent_node.child_right:
-                return None
-            if not grandparent_node.child_right.child_left:
+
+        # the nodes at a depth are packed to the left,
+        # so come back down the left side of the right subtree
+        sibling_node = parent_node.child_right
+        for _ in range(levels_climbed):
+            if not sibling_node:
                 return None
-            return grandparent_node.child_right.child_left
-        
+            sibling_node = sibling_node.child_left
+        return sibling_node
+
     def __create_temporary_node(self, node: TalentNode) -> None:
         """
         Creates a temporary node to hold the bonds of a Talent Node.
@@ -168,45 +355,55 @@ class TTree:
         left_child = node.child_left
         right_child = node.child_right
         parent = node.parent
+        # the temporary node takes whichever side this node was on
+        is_left = parent.child_left is node
         # then strip off all the bonds from the talent node
-        self.__dissolve_all_bonds(node, parent, True)
+        self.__dissolve_all_bonds(node, parent, is_left)
         # and add all the bonds to the temporary node
-        self.__add_all_bonds(temp_node, parent, left_child, right_child, True)
+        self.__add_all_bonds(temp_node, parent, left_child, right_child, is_left)
     
     def __push_subtree_to_lost_talents(self, node: TalentNode) -> None:
         """
-        Recursively pushes a subtree to the lost talents array.
+        Pushes a subtree to the lost talents array, children before their parents.
         This is a sad function.
         @param: node: Node to start the push from.
         """
         # if there are no more nodes to push, return
         if node is None:
             return
-        
-        # gather bonds to dissolve that once held this node to the tree
-        old_parent = node.parent
-        old_left = node.child_left
-        old_right = node.child_right
 
-        # the bonds may have already been dissolved, so it's good to check
+        # the bond that once held this subtree to the tree may have already been dissolved,
+        # so it's good to check
+        old_parent = node.parent
         if old_parent:
             if old_parent.child_left == node:
                 self.__dissolve_bonds(node, old_parent, True)
             else:
                 self.__dissolve_bonds(node, old_parent, False)
 
-        if old_left:
-            self.__dissolve_bonds(old_left, node, True)
-            self.__push_subtree_to_lost_talents(old_left)
-        if old_right:
-            self.__dissolve_bonds(old_right, node, False)
-            self.__push_subtree_to_lost_talents(old_right)
-
-        # this node is officially all alone
-        # push it to the lost talents
-        self.lost_talents.append(node)
-        # we lost a good one
-        self.total_nodes -= 1
+        lost_nodes = walk_post_order(node)
+        if self.instruments is not None:
+            self.instruments.count(TALENTS_LOST, len(lost_nodes))
+        for lost_node in lost_nodes:
+            # its children are already lost, let go of them
+            if lost_node.child_left:
+                self.__dissolve_bonds(lost_node.child_left, lost_node, True)
+            if lost_node.child_right:
+                self.__dissolve_bonds(lost_node.child_right, lost_node, False)
+
+            # this node is officially all alone
+            # push it to the lost talents and forget where it was
+            self.lost_talents.append(lost_node)
+            # time already flowed for the call that lost it
+            self.events.emit(LOST, lost_node, lost_node.rank, self.time - 1)
+            if self.talent_map.get(lost_node.name) is lost_node:
+                del self.talent_map[lost_node.name]
+            self.__remove_from_rank_level(lost_node)
+            # we lost a good one
+            self.total_nodes -= 1
+            self.total_tasks -= lost_node.total_tasks
+            if lost_node.is_burnout:
+                self.total_burnt_out -= 1
 
         return
 
@@ -218,81 +415,82 @@ class TTree:
         until there are no more nodes or no more parents to shift to.
         2. The new node is shifting from one place at this depth to the left most
         position at this depth.
+        Each pass hands the node that got pushed out to the next parent over,
+        so a shift across a wide level doesn't pile up calls.
         @param: new_node: The new node to this parent we will be adding as a child.
         @param: parent_node: The parent to hook it to.
-        @param: child_node_list: List of children to sequentially fold to the shifted nodes.
         """
-        # if new node has bonds, we need to raise an exception (it shouldn't)
-        if new_node.parent or new_node.child_left or new_node.child_right:
-            raise Exception("The new node has bonds.")
-        
-        # if there are no more nodes to shift, lose this node
-        if not parent_node:
-            self.__push_subtree_to_lost_talents(new_node)
-            return
-        
-        # if this parent is gaining its first child, we can stop
-        if not parent_node.child_left:
-            self.__add_bonds(new_node, parent_node, True)
-            return
-        
-        # if the left child has no name, it means this is a temporary
-        # node added in case 2
-        if not parent_node.child_left.name:
-            temp_node = parent_node.child_left
-            temp_left = temp_node.child_left
-            temp_right = temp_node.child_right
-            self.__dissolve_all_bonds(temp_node, parent_node, True)
-            self.__add_all_bonds(new_node, parent_node, temp_left, temp_right, True)
-            # this is one of the rare times where we delete a node.
-            # design flaw?
-            del temp_node
-            return
-
-        # pick up the left child and set it to the sent_node
-        sent_node = parent_node.child_left
-        sent_left = sent_node.child_left
-        sent_right = sent_node.child_right
-        self.__dissolve_all_bonds(sent_node, parent_node, True)
-        # place the new_node in the left child's old spot
-        self.__add_all_bonds(new_node, parent_node, sent_left, sent_right, True)
-        # pick up the right child to set it to the sent_node
-        shifted_node = parent_node.child_right
-        # if there is no right child, we can stop shifting
-        if not shifted_node:
-            self.__add_bonds(sent_node, parent_node, False)
-            return
-        
-        shifted_left = shifted_node.child_left
-        shifted_right = shifted_node.child_right
-        self.__dissolve_all_bonds(shifted_node, parent_node, False)
-        # place the sent_node in the right child's old spot
-        self.__add_all_bonds(sent_node, parent_node, shifted_left, shifted_right, False)
-        # set the new_node as the left child of the sent_node
-        sent_node = shifted_node
-    
-        # if somewhere along the way we picked up a None node,
-        # or we found the original spot from case 2
-        # we should stop shifting
-        if not sent_node:
-            return
-        
-        if sent_node.name == None:
-            del sent_node
-            return
-        
-        # if we just needed to swap the left and right nodes, we are done
-        if sent_node == new_node:
-            return
-
-        # find the parent's sibling...
-        uncle_node = self.__get_right_sibling(parent_node)
-        # and recurse
-        return self.__shift_talent_nodes_right(sent_node, uncle_node)
-    
-    def __shift_talent_nodes_left(self, node_list: list, new_parent_node: TalentNode, list_rank: float, new_child_left: TalentNode=None, new_child_right: TalentNode=None, remaining_nodes: list=[]) -> list:
-        """
-        Recursively shifts a list of nodes to the left until
+        while True:
+            # if new node has bonds, we need to raise an exception (it shouldn't)
+            if new_node.parent or new_node.child_left or new_node.child_right:
+                raise Exception("The new node has bonds.")
+
+            # if there are no more nodes to shift, lose this node
+            if not parent_node:
+                self.__push_subtree_to_lost_talents(new_node)
+                return
+
+            # if this parent is gaining its first child, we can stop
+            if not parent_node.child_left:
+                self.__add_bonds(new_node, parent_node, True)
+                return
+
+            # if the left child has no name, it means this is a temporary
+            # node added in case 2
+            if not parent_node.child_left.name:
+                temp_node = parent_node.child_left
+                temp_left = temp_node.child_left
+                temp_right = temp_node.child_right
+                self.__dissolve_all_bonds(temp_node, parent_node, True)
+                self.__add_all_bonds(new_node, parent_node, temp_left, temp_right, True)
+                # this is one of the rare times where we delete a node.
+                # design flaw?
+                del temp_node
+                return
+
+            # pick up the left child and set it to the sent_node
+            sent_node = parent_node.child_left
+            sent_left = sent_node.child_left
+            sent_right = sent_node.child_right
+            self.__dissolve_all_bonds(sent_node, parent_node, True)
+            # place the new_node in the left child's old spot
+            self.__add_all_bonds(new_node, parent_node, sent_left, sent_right, True)
+            # pick up the right child to set it to the sent_node
+            shifted_node = parent_node.child_right
+            # if there is no right child, we can stop shifting
+            if not shifted_node:
+                self.__add_bonds(sent_node, parent_node, False)
+                return
+
+            shifted_left = shifted_node.child_left
+            shifted_right = shifted_node.child_right
+            self.__dissolve_all_bonds(shifted_node, parent_node, False)
+            # place the sent_node in the right child's old spot
+            self.__add_all_bonds(sent_node, parent_node, shifted_left, shifted_right, False)
+            # set the new_node as the left child of the sent_node
+            sent_node = shifted_node
+
+            # if somewhere along the way we picked up a None node,
+            # or we found the original spot from case 2
+            # we should stop shifting
+            if not sent_node:
+                return
+
+            if sent_node.name == None:
+                del sent_node
+                return
+
+            # if we just needed to swap the left and right nodes, we are done
+            if sent_node == new_node:
+                return
+
+            # find the parent's sibling and go again
+            new_node = sent_node
+            parent_node = self.__get_right_sibling(parent_node)
+
+    def __shift_talent_nodes_left(self, node_list: list, new_parent_node: TalentNode, list_rank: float, new_child_left: TalentNode=None, new_child_right: TalentNode=None) -> list:
+        """
+        Shifts a list of nodes to the left until
         there are no more parents to shift to, then it adds the remaining
         nodes to the lost_talents array along with their subtrees
         @param: node_list: List of nodes to shift left
@@ -300,68 +498,73 @@ class TTree:
         @param: list_rank: Assumed rank of all nodes in the list
         @param: new_child_left: Initial left node to work with
         @param: new_child_right: Initial right node to work with
-        @param: remaining_nodes: List of nodes that stay at the current rank
         @return: List of remaining nodes that stay at the current rank
         """
-        # there are no more nodes to shift
-        if not node_list:
-            # move the leftover children to the lost_talents array
-            self.__push_subtree_to_lost_talents(new_child_left)
-            self.__push_subtree_to_lost_talents(new_child_right)
-            # return the remaining nodes
-            return remaining_nodes
-        
-        node = node_list.pop(0)
-        next_child_left = node.child_left
-        next_child_right = node.child_right
-
-        # there's no more parents to shift to, so the rest of the nodes
-        # and all children need to be added to the lost_talents array
-        if not new_parent_node:
-            # this will empty the remaining nodes list
-            # so the next iteration will return the remaining nodes
-            for node in node_list:
+        remaining_nodes = []
+        node_list = deque(node_list)
+
+        while node_list:
+            node = node_list.popleft()
+            next_child_left = node.child_left
+            next_child_right = node.child_right
+
+            # there's no more parents to shift to, so the rest of the nodes
+            # and all children need to be added to the lost_talents array
+            if not new_parent_node:
+                # this node goes too, and its children go with it
                 self.__push_subtree_to_lost_talents(node)
-            self.__push_subtree_to_lost_talents(new_child_left)
-            self.__push_subtree_to_lost_talents(new_child_right)
-            next_parent = None
-
-        # we add the promoted node to the old node list initially
-        # so we can just use its children and go ahead and break
-        # the bonds
-        # we can tell its the promoted node because it's rank is different
-        # than the rest of the list
-        elif node.rank != list_rank:
-            self.__dissolve_all_bonds(node, new_parent_node, True)
-            # if next_child_left:
-            #     self.__dissolve_bonds(next_child_left, node, True)
-            # if next_child_right:
-            #     self.__dissolve_bonds(next_child_right, node, False)
-            # we will keep the parent the same for the next node
-            next_parent = new_parent_node
-        # otherwise we need to place the node somewhere as the parent's children
-        else:
-            # if it's already the right child of the parent, we need to move it to the left
-            # conversely, if the parent doesn't have a left child, we can just add it there
-            if new_parent_node.child_right == node or not new_parent_node.child_left:
-                # first, make sure there's no other record of this node with the parent
-                if new_parent_node.child_right == node:
-                    self.__dissolve_all_bonds(node, new_parent_node, False)
-                # then, add the node to the left child of the parent
-                self.__add_all_bonds(node, new_parent_node, new_child_left, new_child_right, True)
-                # we will keep the parent the same
+                for lost_node in node_list:
+                    self.__push_subtree_to_lost_talents(lost_node)
+                self.__push_subtree_to_lost_talents(new_child_left)
+                self.__push_subtree_to_lost_talents(new_child_right)
+                # everyone is accounted for, so the loop is done
+                node_list.clear()
+                next_parent = None
+                next_child_left = None
+                next_child_right = None
+
+            # we add the promoted node to the old node list initially
+            # so we can just use its children and go ahead and break
+            # the bonds
+            # we can tell its the promoted node because it's rank is different
+            # than the rest of the list
+            elif node.rank != list_rank:
+                self.__dissolve_all_bonds(node, new_parent_node, True)
+                # we will keep the parent the same for the next node
                 next_parent = new_parent_node
+            # otherwise we need to place the node somewhere as the parent's children
             else:
-                # add this node to the right child spot
-                self.__add_all_bonds(node, new_parent_node, new_child_left, new_child_right, False)
-                # we will get the right sibling of the parent
-                next_parent = self.__get_right_sibling(new_parent_node)
-            # finally add this node to the remaining nodes list
-            remaining_nodes.append(node)
-
-        # recurse
-        return self.__shift_talent_nodes_left(node_list, next_parent, list_rank, next_child_left, next_child_right, remaining_nodes)
+                # let go of the old parent and children first, the children are already in hand.
+                # otherwise the old parent would still point at this node after it moves
+                old_parent = node.parent
+                self.__dissolve_all_bonds(node, old_parent, old_parent is not None and old_parent.child_left is node)
+
+                # if the parent doesn't have a left child, we can just add it there.
+                # this is also where the right child of the parent moves to
+                if not new_parent_node.child_left:
+                    # add the node to the left child of the parent
+                    self.__add_all_bonds(node, new_parent_node, new_child_left, new_child_right, True)
+                    # we will keep the parent the same
+                    next_parent = new_parent_node
+                else:
+                    # add this node to the right child spot
+                    self.__add_all_bonds(node, new_parent_node, new_child_left, new_child_right, False)
+                    # we will get the right sibling of the parent
+                    next_parent = self.__get_right_sibling(new_parent_node)
+                # finally add this node to the remaining nodes list
+                remaining_nodes.append(node)
+
+            # move along to the next node with this one's children in hand
+            new_parent_node = next_parent
+            new_child_left = next_child_left
+            new_child_right = next_child_right
 
+        # there are no more nodes to shift
+        # move the leftover children to the lost_talents array
+        self.__push_subtree_to_lost_talents(new_child_left)
+        self.__push_subtree_to_lost_talents(new_child_right)
+        # return the remaining nodes
+        return remaining_nodes
 
     def __update_time(self) -> None:
         """
@@ -376,26 +579,28 @@ class TTree:
         @param: root_node: Root node to start the search from.
         @return: Talent Node that was added.
         """
+        # keep searching down the left side of the tree
+        # until there's a child at the starting rank, or no child at all
+        while root_node.child_left is not None and root_node.child_left.rank != 0:
+            root_node = root_node.child_left
+
         # if this root node has no children, we can insert here
         if root_node.child_left == None:
             talent_node = TalentNode(name=talent_name)
+            self.talent_map[talent_name] = talent_node
             root_node.child_left = talent_node
             talent_node.parent = root_node
             return talent_node
 
         # if this root node has a child with the same starting rank, we can insert here
-        if root_node.child_left.rank == 0:
-            # first, create a new node
-            talent_node = TalentNode(name=talent_name)
-            talent_node.parent = root_node
-            # then, add it to the left most position (most recently accessed) 
-            # and shift all the other nodes to the right
-            self.__shift_talent_nodes_right(talent_node, root_node)
-            return talent_node
-        
-        
-        # otherwise, we need to keep searching down the left side of the tree
-        return self.__add_talent_node(talent_name, root_node.child_left)
+        # first, create a new node
+        talent_node = TalentNode(name=talent_name)
+        self.talent_map[talent_name] = talent_node
+        talent_node.parent = root_node
+        # then, add it to the left most position (most recently accessed) 
+        # and shift all the other nodes to the right
+        self.__shift_talent_nodes_right(talent_node, root_node)
+        return talent_node
         
     def __promote_talent_node(self, promoted_node: TalentNode) -> None:
         """
@@ -403,6 +608,8 @@ class TTree:
         Be careful! If promoted too early, there's a risk of losing talents
         @param: promoted_node: Node to promote.
         """
+        if self.instruments is not None:
+            self.instruments.count(PROMOTIONS)
         # first, we need to get some information about the promoted node and its surroundings
         old_rank = promoted_node.rank - 1
         old_parent = promoted_node.parent
@@ -441,6 +648,10 @@ class TTree:
             else:
                 new_right_child = None
 
+            # the new parent held onto the remaining nodes while they shifted,
+            # let go of them now that the promoted node is taking them in
+            if new_parent.child_right in (new_left_child, new_right_child):
+                new_parent.child_right = None
             self.__add_all_bonds(promoted_node, new_parent, new_left_child, new_right_child, True)
             # the rest of the nodes need to be pushed to the lost_talents array
             for node in remaining_nodes:
@@ -454,29 +665,129 @@ class TTree:
         # - old rank
         else:
             self.__shift_talent_nodes_right(promoted_node, new_parent)
+
+        # the promoted node's new rank is settled first, so the old rank
+        # can be read off of it from left to right
+        self.__refresh_rank_level(promoted_node.rank)
+        self.__refresh_rank_level(old_rank)
         
         return
 
-    def __get_left_most_talent_node_at_rank(self, talent_node: TalentNode, rank: float=None) -> TalentNode:
+    def __get_left_most_talent_node_at_rank(self, rank: float=None) -> TalentNode:
         """
         Gets the left most Talent Node at a given rank.
-        @param: talent_node: Node to start the search from.
-        @param: rank: Rank to search for.
+        @param: rank: Rank to search for. If not given, the parent of the leaf rank (0) is returned.
         @return: Left most Talent Node at the given rank.
         """
-        # search down the left side of the talent tree until we find the rank
-        if talent_node.rank == rank:
-            return talent_node
-        
-        # if there's no given node, we are inserting at leaf level, so find the next rank up from the leaf rank (0)
-        if not rank:
-            if (not talent_node.child_left or talent_node.child_left.rank == 0):
-                return talent_node
-        
-        # if there is a left child, search down the left side
-        if talent_node.child_left:
-            return self.__get_left_most_talent_node_at_rank(talent_node.child_left, rank)
-        
+        # if there's no given rank, we are inserting at leaf level, so find the next rank up from the leaf rank (0)
+        if rank is None:
+            rank = self.__get_parent_rank(0)
+
+        level = self.rank_levels.get(rank)
+        if level:
+            return level[0]
+
+    def __move_talent_node_to_left_most(self, talent_node: TalentNode) -> None:
+        """
+        Shifts a Talent Node that's already in the tree to the left-most position at its depth.
+        @param: talent_node: Node to move.
+        """
+        # if it's already the left-most node at its depth, there's nowhere to move
+        if self.__is_left_most_talent_node(talent_node):
+            return
+
+        parent_rank = talent_node.parent.rank
+        # create a temporary node to hold this node's bonds
+        self.__create_temporary_node(talent_node)
+        # then shift the talent node to the left most position at its depth
+        left_most_uncle = self.__get_left_most_talent_node_at_rank(parent_rank)
+        self.__shift_talent_nodes_right(talent_node, left_most_uncle)
+        self.__refresh_rank_level(talent_node.rank)
+
+    def __is_left_most_talent_node(self, node: TalentNode) -> bool:
+        """
+        Checks if a Talent Node is already where a shift would put it: the left child
+        of the left-most node at its parent's rank.
+        @param: node: Node to check.
+        @return: True if shifting the node would change nothing, False otherwise.
+        """
+        parent = node.parent
+        if not parent or parent.child_left is not node:
+            return False
+        return self.__get_left_most_talent_node_at_rank(parent.rank) is parent
+
+    def __get_parent_rank(self, rank: float) -> float:
+        """
+        Gets the closest rank above the given rank that has Talent Nodes.
+        The head's infinite rank is always there to fall back on.
+        @param: rank: Rank to look above.
+        @return: Rank of the level above.
+        """
+        return min(level_rank for level_rank in self.rank_levels if level_rank > rank)
+
+    def __refresh_rank_level(self, rank: float) -> None:
+        """
+        Rebuilds the list of Talent Nodes at a rank from the children of the level above it.
+        Only the level above is read, so this costs the width of that level, not the tree.
+        @param: rank: Rank of the level to rebuild.
+        """
+        # the head's level never changes
+        if rank == self.head.rank:
+            return
+
+        level = []
+        for parent in self.rank_levels[self.__get_parent_rank(rank)]:
+            if parent.child_left and parent.child_left.rank == rank:
+                level.append(parent.child_left)
+            if parent.child_right and parent.child_right.rank == rank:
+                level.append(parent.child_right)
+
+        if level:
+            self.rank_levels[rank] = level
+        else:
+            self.rank_levels.pop(rank, None)
+
+    def __remove_from_rank_level(self, node: TalentNode) -> None:
+        """
+        Removes a Talent Node from the list of Talent Nodes at its rank.
+        @param: node: Node to remove.
+        """
+        level = self.rank_levels.get(node.rank)
+        if not level or node not in level:
+            return
+
+        level.remove(node)
+        if not level:
+            del self.rank_levels[node.rank]
+
+    def __pack_rank_levels_below(self, rank: float) -> None:
+        """
+        Packs every rank level below a rank to the left again, after a subtree left a hole in them.
+        Shifts expect the talents at a depth to fill their parents from the left with no gaps,
+        so each talent takes the next spot under the level above, in order.
+        Talents that run out of parents are pushed to the lost talents with their subtrees.
+        @param: rank: Rank of the lowest level that's still whole.
+        """
+        for level_rank in sorted((level_rank for level_rank in self.rank_levels if level_rank < rank), reverse=True):
+            # a level above may have been emptied out, or pushed to the lost talents with this one
+            level = self.rank_levels.get(level_rank)
+            if not level:
+                continue
+            parents = self.rank_levels[self.__get_parent_rank(level_rank)]
+            for i, node in enumerate(list(level)):
+                if i // 2 >= len(parents):
+                    self.__push_subtree_to_lost_talents(node)
+                    continue
+
+                parent = parents[i // 2]
+                is_left = i % 2 == 0
+                # talents left of the hole are already where they belong
+                if node.parent is parent and (parent.child_left if is_left else parent.child_right) is node:
+                    continue
+                self.__dissolve_bonds(node, node.parent, node.parent.child_left is node)
+                # whoever held this spot is moved before it's needed, so it's already empty
+                self.__add_bonds(node, parent, is_left)
+
     def __add_bonds(self, node: TalentNode, parent: TalentNode, is_left: bool) -> None:
         """
         Adds bonds between a Talent Node and its parent.
@@ -487,6 +798,8 @@ class TTree:
         if not node:
             return 
 
+        if self.instruments is not None:
+            self.instruments.count(BONDS_ADDED)
         if is_left:
             parent.child_left = node
         else:
@@ -521,10 +834,14 @@ class TTree:
         if not node:
             return
 
-        if is_left:
-            parent.child_left = None
-        else:
-            parent.child_right = None
+        if self.instruments is not None:
+            self.instruments.count(BONDS_DISSOLVED)
+        # only let go of the side that's actually holding this node
+        if parent is not None:
+            if is_left and parent.child_left is node:
+                parent.child_left = None
+            elif not is_left and parent.child_right is node:
+                parent.child_right = None
         node.parent = None
         return
     
@@ -545,7 +862,33 @@ class TTree:
             self.__dissolve_bonds(node.child_right, node, False)
         return
 
+    def __count_visit(self, is_match):
+        """
+        Wraps a search's check so every node it looks at is counted.
+        @param: is_match: Function that checks a node.
+        @return: The wrapped check.
+        """
+        instruments = self.instruments
+
+        def counted_is_match(node) -> bool:
+            instruments.count(NODES_VISITED)
+            return is_match(node)
+        return counted_is_match
+
     # Internal functions
+    def _create_talent_node(self, talent_name: str) -> TalentNode:
+        """
+        Creates an unattached Talent Node, with its own task store if the tree uses one.
+        @param: talent_name: Name of the talent.
+        @return: The new Talent Node.
+        """
+        task_store = self.task_store_type() if self.task_store_type else None
+        talent_node = TalentNode(talent_name, task_store=task_store)
+        talent_node.events = self.events
+        if self.instruments is not None:
+            talent_node._set_instruments(self.instruments)
+        return talent_node
+
     def _capture_flowing_time(self, is_flowing: bool = True) -> int:
         """
         Gets the current time of the T Tree then increments if time is expected to flow.
@@ -559,15 +902,25 @@ class TTree:
 
     def _get_talent_node_list_at_rank(self, rank: float) -> list:
         """
-        Gets all Talent Nodes at a given rank using breadth first search.
+        Gets all Talent Nodes at a given rank.
+        @param: rank: Rank to search for.
+        @return: List of Talent Nodes at the given rank from left to right.
+        """
+        # hand back a copy, callers are free to shuffle it around
+        return list(self.rank_levels.get(rank, []))
+
+    def _scan_talent_node_list_at_rank(self, rank: float) -> list:
+        """
+        Gets all Talent Nodes at a given rank using breadth first search
+        over the whole tree. Used in testing to check the rank levels.
         @param: rank: Rank to search for.
         @return: List of Talent Nodes at the given rank from left to right.
         """
         node_list = []
-        queue = [self.head]
+        queue = deque([self.head])
 
         while queue:
-            current_node = queue.pop(0)
+            current_node = queue.popleft()
             if current_node.rank == rank:
                 node_list.append(current_node)
             if current_node.child_left:
@@ -580,44 +933,42 @@ class TTree:
     def _count_total_talents(self, root_node: TalentNode, count: int=0) -> int:
         """
         Counts the total number of talents in the T Tree.
-        @param: count: Total number of talents.
+        @param: root_node: Root node to start counting from.
+        @param: count: Unused, the count starts from 0.
         @return: Total number of talents.
         """
-        # base case: if we are at a leaf node, return the count
-        if not root_node:
-            return 0
-        
+        total_talents = count_nodes(root_node)
         # if it's the head node, do not count it
         if root_node is self.head:
-            left_count = self._count_total_talents(root_node.child_left)
-            right_count = self._count_total_talents(root_node.child_right)
-            return left_count + right_count
-        else:
-            # otherwise, count this node and recurse down the tree
-            left_count = self._count_total_talents(root_node.child_left)
-            right_count = self._count_total_talents(root_node.child_right)
-            return 1 + left_count + right_count
+            total_talents -= 1
+        return total_talents
 
-    def _find_talent_node(self, talent_name: str, root_node: TalentNode) -> TalentNode:
+    def _find_talent_node(self, talent_name: str, root_node: TalentNode = None) -> TalentNode:
         """
-        Finds a Talent Node in the T Tree using pre-order search to prioritize left-most nodes.
+        Finds a Talent Node in the T Tree. Searches from the head are answered
+        by the talent map, searches from any other node walk that subtree.
         @param: talent_name: Name of the Talent Node to find.
         @param: root_node: Root node to start the search from.
         @return: Talent Node if found, None otherwise.
         """
-        # Base case: if we are at a leaf node, return None
-        if not root_node:
-            return None
-        
-        # Search down the left side first
-        left_result = self._find_talent_node(talent_name, root_node.child_left)
-        
-        # If we found the node, return it           
-        if root_node.name == talent_name:
-            return root_node
-        
-        # Now search down the right side
-        right_result = self._find_talent_node(talent_name, root_node.child_right)
+        # the whole tree is indexed, so there's no need to go looking
+        if root_node is None or root_node is self.head:
+            talent_node = self.talent_map.get(talent_name)
+            # the map only ever looks at the node it finds
+            if self.instruments is not None and talent_node is not None:
+                self.instruments.count(NODES_VISITED)
+            return talent_node
+
+        return self._search_talent_subtree(talent_name, root_node)
 
-        # Return the result of the search
-        return left_result or right_result
\ No newline at end of file
+    def _search_talent_subtree(self, talent_name: str, root_node: TalentNode) -> TalentNode:
+        """
+        Searches a subtree for a Talent Node using pre-order search to prioritize left-most nodes.
+        @param: talent_name: Name of the Talent Node to find.
+        @param: root_node: Root node to start the search from.
+        @return: Talent Node if found, None otherwise.
+        """
+        if self.instruments is not None:
+            return find_node(root_node, self.__count_visit(lambda node: node.name == talent_name))
+        # search down the left side first, and only look right if it wasn't there
+        return find_node(root_node, lambda node: node.name == talent_name)
@@ -1,4 +1,8 @@
+from collections import deque
 from structs.task_node import TaskNode
+from structs.traversal import walk_post_order, find_node
+from structs.instruments import HEAPIFY_SWAPS
+from structs.events import BURNT_OUT, RELEARNED
 
 class TalentNode:
     """
@@ -10,20 +14,96 @@ class TalentNode:
     @param: burnout_limit: Number of sequential allowed tasks before burnout.
     @param: max_tasks: Maximum number of tasks allowed before converting to nodes.
     @param: rank: Rank of the Talent Node.
+    @param: task_store: Optional store to keep tasks in instead of the Task Node tree, like a TaskHeap.
     """
-    def __init__(self, name: str, burnout_limit: int = 2, max_tasks: int = 5, rank: int = 0):
+    # there will be a lot of these, so they don't get a __dict__
+    __slots__ = ('parent', 'child_left', 'child_right', 'name', '_recent_task_map', '_task_node_map',
+                 'is_burnout', 'is_mastered', '_task_head', 'task_tail', 'task_frontier', '_task_store',
+                 '_task_loader', 'last_access', 'rank', 'burnout_limit', 'max_tasks', 'instruments', 'events', 'total_tasks')
+
+    def __init__(self, name: str, burnout_limit: int = 2, max_tasks: int = 5, rank: int = 0, task_store=None):
         self.parent = None
         self.child_left = None
         self.child_right = None
         self.name = name
-        self.recent_task_map = {}
+        # the maps are made the first time they're needed,
+        # most talents never convert a task to a node
+        self._recent_task_map = None
+        # Map of task names to the Task Nodes holding them
+        self._task_node_map = None
         self.is_burnout = False
         self.is_mastered = False # TODO: make this apparent by rank and burnout limit
-        self.task_head = None
+        self._task_head = None
+        # the right-most Task Node, where burnt out tasks are added
+        self.task_tail = None
+        # Task Nodes with an open child position, top to bottom, left to right
+        self.task_frontier = None
+        # when there's a task store, it takes the place of the Task Node tree
+        self._task_store = task_store
+        # talents loaded from a snapshot leave their tasks on disk until they're needed.
+        # this is called with the Talent Node to fill in its tasks
+        self._task_loader = None
         self.last_access = -1 # TODO: incorporate more thoroughly
         self.rank = rank
         self.burnout_limit = burnout_limit # Start with a low burnout limit, but will grow
         self.max_tasks = max_tasks # Start with a low max tasks limit, but will grow
+        # the tree's Instruments, if it's counting
+        self.instruments = None
+        # the tree's Events, set when the tree takes this talent in
+        self.events = None
+        # number of tasks converted out of the recent task map, held by Task Nodes or the task store.
+        # it's kept up as they're converted, so nobody has to count them
+        self.total_tasks = 0
+
+    @property
+    def recent_task_map(self) -> dict:
+        """
+        Map of the times recent tasks were added to their names.
+        """
+        if self._task_loader is not None:
+            self.__load_tasks()
+        if self._recent_task_map is None:
+            self._recent_task_map = {}
+        return self._recent_task_map
+
+    @property
+    def task_node_map(self) -> dict:
+        """
+        Map of task names to the Task Nodes holding them.
+        """
+        if self._task_loader is not None:
+            self.__load_tasks()
+        if self._task_node_map is None:
+            self._task_node_map = {}
+        return self._task_node_map
+
+    @property
+    def task_head(self):
+        """
+        Head of the Task Node tree.
+        """
+        if self._task_loader is not None:
+            self.__load_tasks()
+        return self._task_head
+
+    @task_head.setter
+    def task_head(self, task_head) -> None:
+        self._task_head = task_head
+
+    @property
+    def task_store(self):
+        """
+        Store holding the tasks in place of the Task Node tree, if there is one.
+        """
+        if self._task_loader is not None:
+            self.__load_tasks()
+        return self._task_store
+
+    @task_store.setter
+    def task_store(self, task_store) -> None:
+        self._task_store = task_store
+        if self.instruments is not None:
+            self._set_instruments(self.instruments)
 
     # Public functions
     def store_task(self, talent_node, task_name: str, current_time: int, total_nodes: int) -> None:
@@ -37,11 +117,14 @@ class TalentNode:
         # if it's been too long since the last task
         if len(talent_node.recent_task_map) > 0:
             # get the last time a task was added
-            last_time = list(talent_node.recent_task_map.keys())[-1]
+            # dicts keep their order, so the last key is the last one added
+            last_time = next(reversed(talent_node.recent_task_map))
             # if the time between the last task and this task is greater than the total nodes * 2
             if current_time - last_time >= total_nodes * 2:
                 # we've forgotten everything, start over
                 talent_node.recent_task_map.clear()
+                if talent_node.events is not None:
+                    talent_node.events.emit(RELEARNED, talent_node, talent_node.rank, current_time)
                 return
 
         talent_node.recent_task_map[current_time] = task_name
@@ -68,13 +151,18 @@ class TalentNode:
             if total_in_order >= self.burnout_limit:
                 # if more tasks were added in sequence than allowed, 
                 # this talent node is burnt out
+                is_burning_out = not talent_node.is_burnout
                 talent_node.is_burnout = True
+                if is_burning_out and talent_node.events is not None:
+                    talent_node.events.emit(BURNT_OUT, talent_node, talent_node.rank, current_time)
             else:
                 # variety is the spice of life
                 # TODO: make this more comprehensive?
                 talent_node.is_burnout = False
 
             self.__convert_tasks_to_nodes(talent_node.recent_task_map)
+            # let the empty map go until there's something to put in it
+            talent_node._recent_task_map = None
 
         # TODO: update access rank & move up the tree if needed (will this require a left and right root?)
         # TODO: move to left most node at depth and shift the rest down
@@ -88,85 +176,144 @@ class TalentNode:
         @param: current_time: New time stamp to set the access time to.
         @return: True if the task was found, False otherwise.
         """
+        if self._task_loader is not None:
+            self.__load_tasks()
         # first check the recent task map
         if self.__recall_task_from_map(task_name, current_time):
             return True
-        # if the task wasn't found in the recent task map, search the tree
-        return self.__recall_task_from_tree(task_head, task_name, current_time)
+        # if the task wasn't found in the recent task map, look it up in the tree
+        return self.__recall_task_from_tree(task_name, current_time)
+
+    def recall_tasks(self, task_names: list, current_times: list) -> list:
+        """
+        Recalls a batch of tasks in order, exactly like calling recall_task for each one.
+        With a task store, the tasks that aren't in the recent task map are recalled
+        from the store in one go, so it only has to put itself back in order once.
+        @param: task_names: Names of the tasks to recall.
+        @param: current_times: Time stamp of each access, in the same order.
+        @return: List of booleans, True for each task that was found.
+        """
+        if self._task_loader is not None:
+            self.__load_tasks()
+        if self.task_store is None:
+            return [self.recall_task(self.task_head, task_name, current_time) for task_name, current_time in zip(task_names, current_times)]
+
+        results = []
+        # where each task missing from the recent task map goes in the results
+        store_positions = []
+        store_task_names = []
+        store_times = []
+        for task_name, current_time in zip(task_names, current_times):
+            # the store never touches the recent task map, so it's fine to check the map first for every task
+            if self.__recall_task_from_map(task_name, current_time):
+                results.append(True)
+                continue
+            store_positions.append(len(results))
+            store_task_names.append(task_name)
+            store_times.append(current_time)
+            results.append(False)
+
+        if store_task_names:
+            for position, task_found in zip(store_positions, self.task_store.recall_many(store_task_names, store_times)):
+                results[position] = task_found
+        return results
 
     def review_tasks(self, task_node: TaskNode, show_life: bool = False):
         """
-        Recursively deletes all task nodes, but allows one
+        Deletes all task nodes, children before their parents, but allows one
         last look at the each one before they are gone forever.
         @param: task_node: Node to be deleted.
         @param: show_life: Whether or not to show the task name.
         """
-
-        if task_node is None:
-            return
-        if task_node.child_left:
-            self.review_tasks(task_node.child_left, show_life)
-        if task_node.child_right:
-            self.review_tasks(task_node.child_right, show_life)
-        
         if show_life:
-            print(task_node.task_name)
-
-        del task_node
+            for reviewed_node in walk_post_order(task_node):
+                print(reviewed_node.task_name)
 
         return
     
+    def subscribe(self, callback, kinds=None, is_batched: bool = False):
+        """
+        Subscribes to what happens to this talent, see structs.events.Events.
+        @param: callback: Function that's given a TalentEvent, or a list of them if it's batched.
+        @param: kinds: Kinds of events to hear about, like PROMOTED or LOST. Every kind if not given.
+        @param: is_batched: Whether to hold the events until the tree's flush_events() instead of calling right away.
+        @return: The callback, so this works as a decorator.
+        """
+        if self.events is None:
+            raise ValueError(f"'{self.name}' isn't in a tree, there's nothing to subscribe to.")
+        return self.events.subscribe(callback, kinds, self, is_batched)
+
+    def unsubscribe(self, callback) -> None:
+        """
+        Stops calling a subscriber of this talent.
+        @param: callback: The function that was subscribed.
+        """
+        if self.events is not None:
+            self.events.unsubscribe(callback, self)
+
     # Private functions 
+    def __load_tasks(self) -> None:
+        """
+        Fills in the tasks that were left on disk, the first time they're needed.
+        """
+        task_loader = self._task_loader
+        # let go of it first, the loader sets the tasks through the same properties
+        self._task_loader = None
+        task_loader(self)
+
     def __recall_task_from_map(self, task_name: str, current_time: int) -> bool:
         """
-        Recalls a task from the Task Node tree.
+        Recalls a task from the recent task map.
         @param: task_name: Name of the task to recall.
         @param: current_time: New time stamp to set the access time to.
+        @return: True if the task was found, False otherwise.
         """
-        if task_name in self.recent_task_map.values():
-            key_to_move = None
-            for creation_time, task in self.recent_task_map.items():
-                if task == task_name:
-                    key_to_move = creation_time
-                    break
-                
-            if key_to_move:
-                # if the task is in the recent task map, we need to update the access time
-                del self.recent_task_map[key_to_move]
-                # reinsert it at the end of the list with the new access time
-                self.recent_task_map[key_to_move] = current_time
-                return True
-        else:
-            # if the task is not in the recent task map, we need to search the tree, starting from the head
-            return self.__recall_task_from_tree(self.task_head, task_name, current_time)
+        # nothing has been added since the last conversion
+        if not self._recent_task_map:
+            return False
 
-    def __recall_task_from_tree(self, task_node: TaskNode, task_name: str, current_time: int) -> bool:
+        key_to_move = None
+        for creation_time, task in self._recent_task_map.items():
+            if task == task_name:
+                key_to_move = creation_time
+                break
+
+        # the map is only as long as max_tasks, the tree is where the real search happens
+        if key_to_move is None:
+            return False
+
+        # if the task is in the recent task map, we need to update the access time
+        del self.recent_task_map[key_to_move]
+        # reinsert it at the end of the list with the new access time
+        self.recent_task_map[current_time] = task_name
+        return True
+
+    def __recall_task_from_tree(self, task_name: str, current_time: int) -> bool:
         """
         Recalls a task from the Task Node tree.
-        @param: task_node: Node to start the search from.
         @param: task_name: Name of the task to recall.
         @param: current_time: Time when the task was accessed.
+        @return: True if the task was found, False otherwise.
         """
-        # there's no task tree to search
+        if self.task_store is not None:
+            return self.task_store.recall(task_name, current_time)
+
+        # there's no task node to recall
+        if self._task_node_map is None:
+            return False
+
+        task_node = self._task_node_map.get(task_name)
         if task_node is None:
             return False
-        # if the task is in the tree, we need to update the access time
-        if task_node.task_name == task_name:
-            # if the task is burnt out, we need to reset it
-            task_node.is_burnt = False
-            self.__update_task_node_access_time(task_node, current_time)
-            # promote this one to the top of the tree
-            self.__promote_task_node_to_head(task_node)
-            # and heapify the tree, excluding burnt out nodes
-            self.__heapify_task_nodes(task_node)
-            return True
-        else:
-            # if the task is not in the tree, we need to search the children
-            if task_node.child_left:
-                return self.__recall_task_from_tree(task_node.child_left, task_name, current_time)
-            if task_node.child_right:
-                return self.__recall_task_from_tree(task_node.child_right, task_name, current_time)
-        return False
+
+        # if the task is burnt out, we need to reset it
+        task_node.is_burnt = False
+        self.__update_task_node_access_time(task_node, current_time)
+        # promote this one to the top of the tree
+        self.__promote_task_node_to_head(task_node)
+        # and heapify the tree, excluding burnt out nodes
+        self.__heapify_task_nodes(task_node)
+        return True
     
     def __convert_tasks_to_nodes(self, task_map: dict) -> None:
         """
@@ -175,9 +322,15 @@ class TalentNode:
         """
         # convert the recent tasks to task nodes
         for creation_time, task in task_map.items():
+            # the task store doesn't need nodes at all
+            if self.task_store is not None:
+                self.task_store.push(task, creation_time, self.is_burnout)
+                continue
             task_node = TaskNode(task, creation_time, self.is_burnout)
             self.__add_task_node(task_node)
+            self.task_node_map[task] = task_node
 
+        self.total_tasks += len(task_map)
         # clear the recent task map now that they are converted to nodes
         task_map.clear()
 
@@ -200,9 +353,9 @@ class TalentNode:
         @param: new_task_node: Task Node to add.
         """
         if self.is_burnout:
-            self.__insert_unbalanced_task_node(new_task_node, self.task_head)
+            self.__insert_unbalanced_task_node(new_task_node)
         else:    
-            self.__insert_balanced_task_node(new_task_node, self.task_head)
+            self.__insert_balanced_task_node(new_task_node)
         return
     
     def __update_task_node_access_time(self, task_node: TaskNode, access_time: int) -> None:
@@ -220,44 +373,43 @@ class TalentNode:
         but also fix unbalanced trees, one task at a time.
         @param: task_node: Task Node to promote.
         """
-        # if this node has no parent, we have reached the top of the tree
-        if not task_node.parent:
-            return
-        else:
+        # keep swapping until this node has no parent, the top of the tree
+        while task_node.parent:
             self.__swap_task_node_content(task_node, task_node.parent)
-        
-        return self.__promote_task_node_to_head(task_node.parent)
+            task_node = task_node.parent
 
-    def __insert_unbalanced_task_node(self, task_node: TaskNode, current_node: int) -> None:
+    def __insert_unbalanced_task_node(self, task_node: TaskNode) -> None:
         """
         Inserts a Task Node into the tree on the far right side, out of balance.
         @param: task_node: Task Node to insert.
-        @param: current_node: Current node to check for children.
         """
         # if there is no head, make this the head
         if self.task_head is None:
             self.task_head = task_node
+            self.task_tail = task_node
             return
         
-        # we only search down the right side of the tree if we are burnt out
-        if not current_node.child_right:
-            current_node.child_right = task_node
-            task_node.parent = current_node
-            return
-        
-        # if there are children, we need to go deeper
-        return self.__insert_unbalanced_task_node(task_node, current_node.child_right)
+        # we only add down the right side of the tree if we are burnt out,
+        # and the tail is always waiting at the bottom of it
+        self.task_tail.child_right = task_node
+        task_node.parent = self.task_tail
+        self.task_tail = task_node
 
-    def __insert_balanced_task_node(self, task_node: TaskNode, root_node: int) -> bool:
+    def __insert_balanced_task_node(self, task_node: TaskNode) -> None:
         """
-        Inserts a Task Node into the tree in a balanced manner, top to bottom, left to right
+        Inserts a Task Node into the tree in a balanced manner, top to bottom, left to right.
+        The first open position is always at the front of the task frontier.
         @param: task_node: Task Node to insert.
-        @param: root_node: Root node to start the search
         """
+        if self.task_frontier is None:
+            self.task_frontier = deque()
+
         # if there is no head, make this the head
         if self.task_head is None:
             self.task_head = task_node
-            return True
+            self.task_tail = task_node
+            self.task_frontier.append(task_node)
+            return
 
         # if the head is burnt out, we need to make this the head
         if self.task_head.is_burnt:
@@ -268,29 +420,32 @@ class TalentNode:
                 self.task_head.parent = task_node
                 task_node.child_right = self.task_head
                 self.task_head = task_node
-                return True
-        
+                # its left position is now the first one open
+                self.task_frontier.appendleft(task_node)
+                return
+
+        # nodes may have filled up since they joined the frontier,
+        # burnt out tasks take the right position without asking
+        while self.task_frontier and self.task_frontier[0].child_left and self.task_frontier[0].child_right:
+            self.task_frontier.popleft()
+
+        # every node we know of is full, the rest is the burnt out right side
+        if not self.task_frontier:
+            self.__insert_unbalanced_task_node(task_node)
+            return
+
+        root_node = self.task_frontier[0]
+        task_node.parent = root_node
         # if there is no left child, make this the left child
         if root_node.child_left is None:
             root_node.child_left = task_node
-            task_node.parent = root_node
-            return True
-        
-        # if there is no right child, make this the right child
-        if root_node.child_right is None:
+        # otherwise, make this the right child
+        else:
             root_node.child_right = task_node
-            task_node.parent = root_node
-            return True
-
-        # if there are children, we need to go deeper
-        left_position = self.__insert_balanced_task_node(task_node, root_node.child_left)
-        
-        # we don't want to go down the right side if we find a burnt out node
-        if not root_node.child_right.is_burnt:
-            right_position = self.__insert_balanced_task_node(task_node, root_node.child_right)
-        
-        return left_position or right_position
-
+            # the right side just got longer
+            if root_node is self.task_tail:
+                self.task_tail = task_node
+        self.task_frontier.append(task_node)
 
     def __heapify_task_nodes(self, task_node: TaskNode = None) -> None:
         """
@@ -302,21 +457,21 @@ class TalentNode:
             task_node = self.task_head
 
         # Skip heapify for burnt out nodes or if node doesn't exist
-        if task_node is None or task_node.is_burnt:
-            return  
+        while task_node is not None and not task_node.is_burnt:
+            largest = task_node
 
-        largest = task_node
+            if task_node.child_left and not task_node.child_left.is_burnt and task_node.child_left.last_access_time > task_node.last_access_time:
+                largest = task_node.child_left
+            if task_node.child_right and not task_node.child_right.is_burnt and task_node.child_right.last_access_time > largest.last_access_time:
+                largest = task_node.child_right
 
-        if task_node.child_left and not task_node.child_left.is_burnt and task_node.child_left.last_access_time > task_node.last_access_time:
-            largest = task_node.child_left
-        if task_node.child_right and not task_node.child_right.is_burnt and task_node.child_right.last_access_time > largest.last_access_time:
-            largest = task_node.child_right
+            if largest == task_node:
+                return
 
-        if largest != task_node:
             # Perform a swap
             self.__swap_task_node_content(task_node, largest)
-            # Recursively heapify the affected subtree
-            self.__heapify_task_nodes(largest)
+            # then carry on down the affected subtree
+            task_node = largest
 
     def __swap_task_node_content(self, node1: TaskNode, node2: TaskNode) -> None:
         """
@@ -324,24 +479,34 @@ class TalentNode:
         @param: node1: First node to swap.
         @param: node2: Second node to swap.
         """
+        if self.instruments is not None:
+            self.instruments.count(HEAPIFY_SWAPS)
         node1.task_name, node2.task_name = node2.task_name, node1.task_name
         node1.creation_time, node2.creation_time = node2.creation_time, node1.creation_time
         node1.last_access_time, node2.last_access_time = node2.last_access_time, node1.last_access_time
         node1.is_burnt, node2.is_burnt = node2.is_burnt, node1.is_burnt
+        # the task names moved, so the map has to follow them
+        if self.task_node_map.get(node1.task_name) is node2:
+            self.task_node_map[node1.task_name] = node1
+        if self.task_node_map.get(node2.task_name) is node1:
+            self.task_node_map[node2.task_name] = node2
 
     # Internal functions
+    def _set_instruments(self, instruments) -> None:
+        """
+        Hands the tree's Instruments to this node and its task store, None to stop counting.
+        @param: instruments: The Instruments, or None.
+        """
+        self.instruments = instruments
+        # only stores that swap tasks around have anything to count
+        if self._task_store is not None and hasattr(self._task_store, 'instruments'):
+            self._task_store.instruments = instruments
+
     def _find_task_node(self, task_name: str, task_node: TaskNode) -> TaskNode:
         """
-        Finds a Task Node in the tree. Used in testing. Maybe useful for debugging.
+        Finds a Task Node in the tree, left side first. Used in testing. Maybe useful for debugging.
         @param: task_name: Name of the task to find.
         @param: task_node: Node to start the search
         @return: Task Node if found, None otherwise.
         """
-        if task_node.task_name == task_name:
-            return task_node
-        else:
-            if task_node.child_left:
-                return self._find_task_node(task_name, task_node.child_left)
-            if task_node.child_right:
-                return self._find_task_node(task_name, task_node.child_right)
-        return None
+        return find_node(task_node, lambda node: node.task_name == task_name)
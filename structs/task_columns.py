@@ -0,0 +1,169 @@
+from structs.task_node import TaskNode, link_task_nodes
+
+# numpy is optional, only this task store needs it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class TaskColumns:
+    """
+    Stores the tasks of a Talent Node column by column in NumPy arrays,
+    one row per task in the order the tasks were added. Task names are kept
+    in a parallel list. Nothing is kept in heap order as tasks come and go,
+    the order is worked out in a single vectorized pass whenever it's asked for:
+    tasks that aren't burnt out by last access time, then burnt out tasks in the order they were added.
+    A Talent Node uses one of these as its task store in place of task_head.
+    @param: capacity: Number of rows to make room for up front.
+    """
+    __slots__ = ('task_names', 'creation_times', 'access_times', 'burnt_flags', 'total_tasks', 'task_positions', 'order')
+
+    def __init__(self, capacity: int = 8):
+        if np is None:
+            raise ImportError("TaskColumns needs numpy, install it with: pip install numpy")
+
+        self.task_names = []
+        self.creation_times = np.empty(capacity, dtype=np.int64)
+        self.access_times = np.empty(capacity, dtype=np.int64)
+        self.burnt_flags = np.empty(capacity, dtype=bool)
+        self.total_tasks = 0
+        # Map of task names to their row
+        self.task_positions = {}
+        # rows in heap order, worked out when it's needed
+        self.order = None
+
+    def __len__(self) -> int:
+        return self.total_tasks
+
+    # Public functions
+    def push(self, task_name: str, creation_time: int, is_burnt: bool, access_time: int = None) -> None:
+        """
+        Adds a task to the store.
+        @param: task_name: Name of the task to add.
+        @param: creation_time: Time when the task was created.
+        @param: is_burnt: Whether the talent was burnt out when the task was added.
+        @param: access_time: Time when the task was last accessed, the creation time if not given.
+        """
+        if self.total_tasks == len(self.access_times):
+            self.__grow()
+
+        row = self.total_tasks
+        self.task_names.append(task_name)
+        self.creation_times[row] = creation_time
+        self.access_times[row] = creation_time if access_time is None else access_time
+        self.burnt_flags[row] = is_burnt
+        self.task_positions[task_name] = row
+        self.total_tasks += 1
+        self.order = None
+
+    def recall(self, task_name: str, current_time: int) -> bool:
+        """
+        Recalls a task, updating its access time.
+        Burnt out tasks that are recalled are no longer burnt out.
+        @param: task_name: Name of the task to recall.
+        @param: current_time: Time when the task was accessed.
+        @return: True if the task was found, False otherwise.
+        """
+        row = self.task_positions.get(task_name)
+        if row is None:
+            return False
+
+        self.access_times[row] = current_time
+        self.burnt_flags[row] = False
+        self.order = None
+        return True
+
+    def recall_many(self, task_names: list, access_times: list) -> list:
+        """
+        Recalls a batch of tasks at once, then leaves the heap order to be
+        worked out once, instead of once per task.
+        @param: task_names: Names of the tasks to recall.
+        @param: access_times: Time each task was accessed, in the same order.
+        @return: List of booleans, True for each task that was found.
+        """
+        rows = np.fromiter((self.task_positions.get(task_name, -1) for task_name in task_names), dtype=np.int64, count=len(task_names))
+        found = rows >= 0
+        found_rows = rows[found]
+        # a task recalled more than once keeps its latest access
+        np.maximum.at(self.access_times, found_rows, np.asarray(access_times, dtype=np.int64)[found])
+        self.burnt_flags[found_rows] = False
+        self.order = None
+        return found.tolist()
+
+    def heap_order(self):
+        """
+        Gets the rows in heap order: tasks that aren't burnt out from the most
+        recently accessed, then burnt out tasks in the order they were added.
+        @return: NumPy array of rows.
+        """
+        if self.order is None:
+            rows = np.arange(self.total_tasks)
+            burnt_flags = self.burnt_flags[:self.total_tasks]
+            heap_rows = rows[~burnt_flags]
+            # stable, so ties stay in the order they were added
+            heap_rows = heap_rows[np.argsort(-self.access_times[heap_rows], kind='stable')]
+            self.order = np.concatenate((heap_rows, rows[burnt_flags]))
+        return self.order
+
+    def peek(self) -> str:
+        """
+        Gets the most recently accessed task that isn't burnt out.
+        @return: Name of the task at the head of the heap, None if every task is burnt out.
+        """
+        order = self.heap_order()
+        if not len(order) or self.burnt_flags[order[0]]:
+            return None
+        return self.task_names[order[0]]
+
+    def review(self, show_life: bool = False) -> None:
+        """
+        Deletes all tasks, but allows one last look at each one before they are gone forever.
+        @param: show_life: Whether or not to show the task names.
+        """
+        if show_life:
+            for row in self.heap_order():
+                print(self.task_names[row])
+
+        self.__init__()
+
+    def to_task_nodes(self) -> TaskNode:
+        """
+        Builds a linked Task Node tree from the store, for code that still walks task_head.
+        @return: Head of the Task Node tree, None if there are no tasks.
+        """
+        task_nodes = []
+        burnt_task_nodes = []
+        for row in self.heap_order().tolist():
+            is_burnt = bool(self.burnt_flags[row])
+            task_node = TaskNode(self.task_names[row], int(self.creation_times[row]), is_burnt)
+            task_node.last_access_time = int(self.access_times[row])
+            if is_burnt:
+                burnt_task_nodes.append(task_node)
+            else:
+                task_nodes.append(task_node)
+
+        return link_task_nodes(task_nodes, burnt_task_nodes)
+
+    def dump_tasks(self) -> list:
+        """
+        Gets every task in an order that rebuilds this store when pushed back in,
+        the order they were added.
+        @return: List of (task_name, creation_time, access_time, is_burnt) tuples.
+        """
+        total_tasks = self.total_tasks
+        return list(zip(self.task_names,
+                        self.creation_times[:total_tasks].tolist(),
+                        self.access_times[:total_tasks].tolist(),
+                        self.burnt_flags[:total_tasks].tolist()))
+
+    # Private functions
+    def __grow(self) -> None:
+        """
+        Doubles the number of rows in every column.
+        """
+        capacity = max(2 * len(self.access_times), 8)
+        for column in ('creation_times', 'access_times', 'burnt_flags'):
+            old_column = getattr(self, column)
+            new_column = np.empty(capacity, dtype=old_column.dtype)
+            new_column[:self.total_tasks] = old_column[:self.total_tasks]
+            setattr(self, column, new_column)
@@ -0,0 +1,207 @@
+from array import array
+from structs.task_node import TaskNode, link_task_nodes
+from structs.instruments import HEAPIFY_SWAPS
+
+class TaskHeap:
+    """
+    Stores the tasks of a Talent Node in flat arrays instead of Task Nodes.
+    Tasks that aren't burnt out live in a max heap by last access time,
+    where the children of index i are at 2i + 1 and 2i + 2.
+    Burnt out tasks are kept in order in a separate segment after the heap.
+    A Talent Node uses one of these as its task store in place of task_head.
+    """
+    __slots__ = ('task_names', 'creation_times', 'access_times', 'burnt_task_names',
+                 'burnt_creation_times', 'burnt_gaps', 'heap_positions', 'burnt_positions', 'instruments')
+
+    def __init__(self):
+        # the heap segment, one entry per task across each array
+        self.task_names = []
+        self.creation_times = array('q')
+        self.access_times = array('q')
+        # the burnt segment, in the order the tasks burnt out.
+        # recalled tasks leave a None behind until the segment is compacted
+        self.burnt_task_names = []
+        self.burnt_creation_times = array('q')
+        self.burnt_gaps = 0
+        # Map of task names to their index in each segment
+        self.heap_positions = {}
+        self.burnt_positions = {}
+        # the tree's Instruments, handed down by the Talent Node if the tree is counting
+        self.instruments = None
+
+    def __len__(self) -> int:
+        return len(self.task_names) + len(self.burnt_task_names) - self.burnt_gaps
+
+    # Public functions
+    def push(self, task_name: str, creation_time: int, is_burnt: bool, access_time: int = None) -> None:
+        """
+        Adds a task to the store.
+        @param: task_name: Name of the task to add.
+        @param: creation_time: Time when the task was created.
+        @param: is_burnt: Whether the talent was burnt out when the task was added.
+        @param: access_time: Time when the task was last accessed, the creation time if not given.
+        """
+        # burnt tasks are appended to the end, in order
+        if is_burnt:
+            self.burnt_positions[task_name] = len(self.burnt_task_names)
+            self.burnt_task_names.append(task_name)
+            self.burnt_creation_times.append(creation_time)
+            return
+
+        self.__push_to_heap(task_name, creation_time, creation_time if access_time is None else access_time)
+
+    def recall(self, task_name: str, current_time: int) -> bool:
+        """
+        Recalls a task, updating its access time and moving it to the head of the heap.
+        Burnt out tasks that are recalled are no longer burnt out.
+        @param: task_name: Name of the task to recall.
+        @param: current_time: Time when the task was accessed.
+        @return: True if the task was found, False otherwise.
+        """
+        index = self.heap_positions.get(task_name)
+        if index is not None:
+            self.access_times[index] = current_time
+            self.__sift_up(index)
+            return True
+
+        index = self.burnt_positions.pop(task_name, None)
+        if index is None:
+            return False
+
+        # leave a gap in the burnt segment and move the task into the heap
+        creation_time = self.burnt_creation_times[index]
+        self.burnt_task_names[index] = None
+        self.burnt_gaps += 1
+        if self.burnt_gaps * 2 > len(self.burnt_task_names):
+            self.__compact_burnt_segment()
+
+        self.__push_to_heap(task_name, creation_time, current_time)
+        return True
+
+    def recall_many(self, task_names: list, access_times: list) -> list:
+        """
+        Recalls a batch of tasks in order. Every recall moves its task up the heap,
+        so there's nothing to save over recalling them one at a time.
+        @param: task_names: Names of the tasks to recall.
+        @param: access_times: Time each task was accessed, in the same order.
+        @return: List of booleans, True for each task that was found.
+        """
+        return [self.recall(task_name, access_time) for task_name, access_time in zip(task_names, access_times)]
+
+    def peek(self) -> str:
+        """
+        Gets the most recently accessed task that isn't burnt out.
+        @return: Name of the task at the head of the heap, None if the heap is empty.
+        """
+        return self.task_names[0] if self.task_names else None
+
+    def review(self, show_life: bool = False) -> None:
+        """
+        Deletes all tasks, but allows one last look at each one before they are gone forever.
+        @param: show_life: Whether or not to show the task names.
+        """
+        if show_life:
+            for task_name in self.task_names:
+                print(task_name)
+            for task_name in self.burnt_task_names:
+                if task_name is not None:
+                    print(task_name)
+
+        self.__init__()
+
+    def to_task_nodes(self) -> TaskNode:
+        """
+        Builds a linked Task Node tree from the store, for code that still walks task_head.
+        The heap becomes a complete binary tree and the burnt tasks hang off
+        of its right-most node, one right child after another.
+        @return: Head of the Task Node tree, None if there are no tasks.
+        """
+        task_nodes = []
+        for index, task_name in enumerate(self.task_names):
+            task_node = TaskNode(task_name, self.creation_times[index], False)
+            task_node.last_access_time = self.access_times[index]
+            task_nodes.append(task_node)
+
+        burnt_task_nodes = []
+        for index, task_name in enumerate(self.burnt_task_names):
+            if task_name is not None:
+                burnt_task_nodes.append(TaskNode(task_name, self.burnt_creation_times[index], True))
+
+        return link_task_nodes(task_nodes, burnt_task_nodes)
+
+    def dump_tasks(self) -> list:
+        """
+        Gets every task in an order that rebuilds this store when pushed back in:
+        the heap from top to bottom, then the burnt tasks in order.
+        @return: List of (task_name, creation_time, access_time, is_burnt) tuples.
+        """
+        tasks = [(task_name, self.creation_times[index], self.access_times[index], False)
+                 for index, task_name in enumerate(self.task_names)]
+        for index, task_name in enumerate(self.burnt_task_names):
+            if task_name is not None:
+                creation_time = self.burnt_creation_times[index]
+                tasks.append((task_name, creation_time, creation_time, True))
+        return tasks
+
+    # Private functions
+    def __push_to_heap(self, task_name: str, creation_time: int, access_time: int) -> None:
+        """
+        Adds a task to the end of the heap and sifts it up into place.
+        @param: task_name: Name of the task to add.
+        @param: creation_time: Time when the task was created.
+        @param: access_time: Time when the task was last accessed.
+        """
+        index = len(self.task_names)
+        self.task_names.append(task_name)
+        self.creation_times.append(creation_time)
+        self.access_times.append(access_time)
+        self.heap_positions[task_name] = index
+        self.__sift_up(index)
+
+    def __sift_up(self, index: int) -> None:
+        """
+        Swaps a task with its parent until its parent was accessed more recently.
+        @param: index: Index of the task in the heap.
+        """
+        access_times = self.access_times
+        while index:
+            parent_index = (index - 1) // 2
+            if access_times[parent_index] >= access_times[index]:
+                return
+            self.__swap(index, parent_index)
+            index = parent_index
+
+    def __swap(self, index1: int, index2: int) -> None:
+        """
+        Swaps two tasks in the heap, keeping the positions map up to date.
+        @param: index1: Index of the first task.
+        @param: index2: Index of the second task.
+        """
+        if self.instruments is not None:
+            self.instruments.count(HEAPIFY_SWAPS)
+        task_names = self.task_names
+        task_names[index1], task_names[index2] = task_names[index2], task_names[index1]
+        self.creation_times[index1], self.creation_times[index2] = self.creation_times[index2], self.creation_times[index1]
+        self.access_times[index1], self.access_times[index2] = self.access_times[index2], self.access_times[index1]
+        # only move the names the map was pointing at, repeated names keep their latest entry
+        if self.heap_positions.get(task_names[index1]) == index2:
+            self.heap_positions[task_names[index1]] = index1
+        if self.heap_positions.get(task_names[index2]) == index1:
+            self.heap_positions[task_names[index2]] = index2
+
+    def __compact_burnt_segment(self) -> None:
+        """
+        Closes the gaps left in the burnt segment by recalled tasks.
+        """
+        task_names = []
+        creation_times = array('q')
+        for index, task_name in enumerate(self.burnt_task_names):
+            if task_name is None:
+                continue
+            task_names.append(task_name)
+            creation_times.append(self.burnt_creation_times[index])
+
+        self.burnt_task_names = task_names
+        self.burnt_creation_times = creation_times
+        self.burnt_gaps = 0
+        self.burnt_positions = {task_name: index for index, task_name in enumerate(task_names)}
@@ -1,4 +1,7 @@
 class TaskNode:
+    # there will be a lot of these, so they don't get a __dict__
+    __slots__ = ('child_left', 'child_right', 'parent', 'task_name', 'creation_time', 'last_access_time', 'is_burnt')
+
     def __init__(self, task_name, creation_time, is_burnt):
         self.child_left = None  # Pointer to the left child Task Node
         self.child_right = None  # Pointer to the right child Task Node
@@ -7,3 +10,36 @@ class TaskNode:
         self.creation_time = creation_time  # Time when the task was created
         self.last_access_time = creation_time  # Last time the task was accessed, initially set to creation time
         self.is_burnt = is_burnt  # Flag indicating if the Task Node is burnt out
+
+def link_task_nodes(task_nodes: list, burnt_task_nodes: list) -> TaskNode:
+    """
+    Links Task Nodes laid out as a heap array into a tree, where the children
+    of index i are at 2i + 1 and 2i + 2. Burnt out Task Nodes hang off of
+    the right-most node, one right child after another.
+    @param: task_nodes: Task Nodes in heap order.
+    @param: burnt_task_nodes: Burnt out Task Nodes in the order they were added.
+    @return: Head of the Task Node tree, None if there are no Task Nodes.
+    """
+    for index in range(1, len(task_nodes)):
+        task_node = task_nodes[index]
+        task_node.parent = task_nodes[(index - 1) // 2]
+        if index % 2:
+            task_node.parent.child_left = task_node
+        else:
+            task_node.parent.child_right = task_node
+
+    head = task_nodes[0] if task_nodes else None
+    # walk down the right side to find where the burnt tasks go
+    tail = head
+    while tail and tail.child_right:
+        tail = tail.child_right
+
+    for task_node in burnt_task_nodes:
+        if tail:
+            tail.child_right = task_node
+            task_node.parent = tail
+        else:
+            head = task_node
+        tail = task_node
+
+    return head
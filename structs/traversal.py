@@ -0,0 +1,91 @@
+"""
+Walks over any tree of nodes with child_left and child_right, Talent Nodes
+and Task Nodes alike. Every walk keeps its own stack instead of recursing,
+so deep trees (like a long burnt out spine of Task Nodes) never run into
+the recursion limit, and no Python frame is paid for per node.
+"""
+
+def walk_pre_order(root_node):
+    """
+    Walks a tree parent first, then the left subtree, then the right subtree.
+    Nodes are handed out as they are reached, so stop whenever you've found what you need.
+    @param: root_node: Node to start from, may be None.
+    @return: Generator of nodes in pre order.
+    """
+    if root_node is None:
+        return
+
+    stack = [root_node]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node = pop()
+        yield node
+        # push the right child first so the left is handled first
+        if node.child_right is not None:
+            push(node.child_right)
+        if node.child_left is not None:
+            push(node.child_left)
+
+def walk_post_order(root_node) -> list:
+    """
+    Walks a tree children first, left before right, then the parent.
+    The whole walk is collected before it's handed back,
+    so it's safe to dissolve bonds while going through it.
+    @param: root_node: Node to start from, may be None.
+    @return: List of nodes in post order.
+    """
+    # a pre order walk that goes right before left is exactly
+    # a post order walk backwards
+    nodes = []
+    if root_node is None:
+        return nodes
+
+    stack = [root_node]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node = pop()
+        nodes.append(node)
+        if node.child_left is not None:
+            push(node.child_left)
+        if node.child_right is not None:
+            push(node.child_right)
+
+    nodes.reverse()
+    return nodes
+
+def count_nodes(root_node) -> int:
+    """
+    Counts the nodes in a tree.
+    @param: root_node: Node to start from, may be None.
+    @return: Number of nodes, including the root.
+    """
+    if root_node is None:
+        return 0
+
+    # this is walked a lot, so it skips the generator and just counts
+    count = 0
+    stack = [root_node]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node = pop()
+        count += 1
+        if node.child_left is not None:
+            push(node.child_left)
+        if node.child_right is not None:
+            push(node.child_right)
+    return count
+
+def find_node(root_node, matches):
+    """
+    Finds the first node in pre order that matches, which favors left-most nodes.
+    @param: root_node: Node to start from, may be None.
+    @param: matches: Function that takes a node and returns True if it's the one.
+    @return: The matching node if found, None otherwise.
+    """
+    for node in walk_pre_order(root_node):
+        if matches(node):
+            return node
+    return None
@@ -1,7 +1,7 @@
 import string
 import random
-from sys import getsizeof
-from structs import TTree, TalentNode, TaskNode
+from structs import TTree, TalentNode
+from utils.memory import get_tree_memory_size
 
 class TestHelpers:
     def build_robust_balanced_tree(self, tree) -> str:
@@ -92,48 +92,46 @@ class TestHelpers:
         # Add the task to the talent
         tree.add_task(task, talent_name)
     
-    def get_tree_memory_size(self, node: TalentNode, size: int=0) -> int:
+    def add_mixed_tasks(self, tree: TTree, start: int = 0, stop: int = 150, total_talents: int = 9) -> None:
         """
-        Recursively gets the memory size of the tree.
-        @param node: the node to get the memory size of
-        @param size: the total size of the tree
-        @return the memory size of the tree
+        Adds tasks to a handful of talents, accessing some of them along the way,
+        enough to promote, burn out and lose talents.
+        The same range always makes the same calls, so two trees fed it end up the same.
+        @param tree: the tree to add the tasks to
+        @param start: the first call to make
+        @param stop: the call to stop before
+        @param total_talents: how many talents to spread the tasks across
         """
+        for i in range(start, stop):
+            tree.add_task(f"Task {i % 11}", f"Talent{i % total_talents}")
+            if i % 3 == 0:
+                tree.access_task(f"Task {i % 7}", f"Talent{i % total_talents}")
+            if i % 10 == 0:
+                tree.access_tasks([(f"Task {i % 4}", f"Talent{i % total_talents}"), ("Task 1", "Talent1")])
 
-        if node is None:
-            return
-        
-        size += getsizeof(node)
-
-        if node.child_left:
-            if node.child_left.task_head:
-                size += self._get_node_memory_size(node.child_left.task_head)
-            self.get_tree_memory_size(node.child_left, size)
-
-        if node.child_right:
-            if node.child_right.task_head:
-                size += self._get_node_memory_size(node.child_right.task_head)
-            self.get_tree_memory_size(node.child_right, size)
-
-        return size
+    def assert_same_tree(self, test_case, tree: TTree, other_tree: TTree) -> None:
+        """
+        Checks two trees have the same time, the same talents in the same places
+        and the same lost talents in the same order.
+        @param test_case: the test case to make the assertions with
+        @param tree: the tree that's expected
+        @param other_tree: the tree to check against it
+        """
+        test_case.assertEqual(other_tree.time, tree.time, "The time should be the same.")
+        test_case.assertEqual(other_tree.total_nodes, tree.total_nodes, "The total nodes should be the same.")
+        test_case.assertListEqual(sorted(other_tree.rank_levels), sorted(tree.rank_levels), "The same ranks should be in the tree.")
+        for rank, level in tree.rank_levels.items():
+            test_case.assertListEqual([node.name for node in other_tree.rank_levels[rank]], [node.name for node in level], f"The talents at rank {rank} should be in the same order.")
+            for node, other_node in zip(level, other_tree.rank_levels[rank]):
+                parent_name = node.parent.name if node.parent else None
+                test_case.assertEqual(other_node.parent.name if other_node.parent else None, parent_name, f"'{node.name}' should be under the same parent.")
+        test_case.assertListEqual([node.name for node in other_tree.lost_talents], [node.name for node in tree.lost_talents], "The lost talents should be the same, in order.")
 
-    
-    # Internal
-    def _get_node_memory_size(self, task: TaskNode, size: int=0) -> int:
+    def get_tree_memory_size(self, node: TalentNode) -> int:
         """
-        Recursively gets the memory size of the node.
+        Gets the memory size of the tree, every Talent Node, Task Node
+        and task map below the given node included.
         @param node: the node to get the memory size of
-        @param size: the total size of the node
-        @return the memory size of the node
+        @return the memory size of the tree
         """
-        if not task:
-            return
-        
-        size += getsizeof(task)
-
-        if task.child_left:
-            size += self._get_node_memory_size(task.child_left)
-        if task.child_right:
-            size += self._get_node_memory_size(task.child_right)
-
-        return size
\ No newline at end of file
+        return get_tree_memory_size(node)
@@ -0,0 +1,131 @@
+import unittest
+from structs import TTree, ArrayTTree
+from structs.lost_talents import LOWEST_RANK
+from .helpers import TestHelpers
+
+class TestArrayTTree(unittest.TestCase):
+    def test_add_three_talents_with_lost_node(self):
+        """
+        Test to see if the tree pushes nodes that can't fit into the lost talents list.
+        """
+        tree = ArrayTTree()
+        tree.add_task("Some long task", "TalentB")
+        tree.add_task("Some short task", "TalentA")
+        tree.add_task("Some medium task", "TalentC")
+
+        self.assertEqual([node.name for node in tree.levels[1]], ["TalentC", "TalentA"], "The newest talents should be at the first depth, most recent on the left.")
+        self.assertEqual(tree.lost_talents[0].name, "TalentB", "'TalentB' should have been moved to lost_talents.")
+        self.assertIsNone(tree._find_talent_node("TalentB"), "'TalentB' should be lost, not found.")
+        self.assertEqual(tree._count_total_talents(), tree.total_nodes, "There should be 2 talents in the tree.")
+
+        del tree
+
+    def test_access_moves_talent_to_front(self):
+        tree = ArrayTTree()
+        tree.add_task("Some long task", "TalentB")
+        tree.add_task("Some short task", "TalentA")
+        tree.add_task("Some medium task", "TalentB")
+
+        self.assertTrue(tree.access_task("Some short task", "TalentA"), "The task should be found in the recent task map.")
+        self.assertEqual(tree.levels[1][0].name, "TalentA", "Accessing a task should move its talent to the front.")
+        self.assertFalse(tree.access_task("Some long task", "TalentC"), "A missing talent can't have its task found.")
+        self.assertEqual(tree.time, 5, "Every access should burn time, found or not.")
+
+        del tree
+
+    def test_promote_talent_in_robust_balanced_tree(self):
+        tree = ArrayTTree()
+        final_node_name = TestHelpers().build_robust_balanced_tree(tree)
+        self.assertEqual(len(tree.lost_talents), 0, "There should be no lost talents.")
+        self.assertEqual(tree._count_total_talents(), 7, "There should be 7 starting talents in the tree.")
+        tree.add_task("Promotional task", final_node_name)
+
+        list_at_rank_1 = tree._get_talent_node_list_at_rank(1)
+
+        self.assertEqual(len(tree.lost_talents), 1, "The promotion should have pushed 1 talent to lost_talents.")
+        self.assertEqual(list_at_rank_1[0].name, final_node_name, "The first talent at rank 1 should be the promoted node.")
+        self.assertEqual(len(tree._get_talent_node_list_at_rank(2)), 1, "There should be 1 talent at rank 2.")
+        self.assertEqual(len(list_at_rank_1), 2, "There should be 2 talents at rank 1.")
+        self.assertEqual(len(tree._get_talent_node_list_at_rank(0)), 3, "There should be 3 talents at rank 0.")
+        self.assertEqual(tree._get_parent(tree._get_talent_node_list_at_rank(0)[2]), list_at_rank_1[1], "The last leaf should belong to the second talent at rank 1.")
+        self.assertEqual(tree._count_total_talents(), tree.total_nodes, "There should be 6 remaining talents in the tree.")
+
+        del tree
+
+    def test_promote_talent_in_gapped_balanced_tree(self):
+        tree = ArrayTTree()
+        final_node_name = TestHelpers().build_gapped_balanced_tree(tree)
+        TestHelpers().promote_talent_node(tree, final_node_name, 1)
+
+        self.assertEqual(len(tree.lost_talents), 2, "The promotion should have pushed 2 talents to lost_talents.")
+        self.assertEqual(tree._get_talent_node_list_at_rank(3)[0].name, final_node_name, "The first talent at rank 3 should be the promoted node.")
+        self.assertEqual(len(tree._get_talent_node_list_at_rank(2)), 1, "There should be 1 talent at rank 2.")
+        self.assertEqual(len(tree._get_talent_node_list_at_rank(0)), 2, "There should be 2 talents at rank 0.")
+        self.assertEqual(tree._get_children(tree._get_talent_node_list_at_rank(2)[0]), tuple(tree.levels[-1]), "The leaves should hang off of the only talent at rank 2.")
+
+        del tree
+
+    def test_matches_linked_tree(self):
+        """
+        Test to see if both engines agree on every rank after the same moves and promotions.
+        """
+        trees = [TTree(), ArrayTTree()]
+        for tree in trees:
+            TestHelpers().build_gapped_balanced_tree(tree)
+            tree.add_task("Moving task", "Talent5")
+            tree.access_task("Moving task", "Talent6")
+            TestHelpers().promote_talent_node(tree, "Talent7", 1)
+
+        linked_tree, array_tree = trees
+        for rank in linked_tree.rank_levels:
+            linked_names = [node.name for node in linked_tree._get_talent_node_list_at_rank(rank)]
+            array_names = [node.name for node in array_tree._get_talent_node_list_at_rank(rank)]
+            self.assertListEqual(linked_names, array_names, f"Both trees should hold the same talents at rank {rank}.")
+        self.assertEqual([node.name for node in linked_tree.lost_talents], [node.name for node in array_tree.lost_talents], "Both trees should have lost the same talents.")
+
+        del trees
+
+    def test_lost_talent_capacity(self):
+        trees = [TTree(lost_talent_capacity=2, lost_talent_eviction=LOWEST_RANK), ArrayTTree(lost_talent_capacity=2, lost_talent_eviction=LOWEST_RANK)]
+        for tree in trees:
+            TestHelpers().add_mixed_tasks(tree)
+
+        linked_tree, array_tree = trees
+        self.assertEqual(len(array_tree.lost_talents), 2, "The tree should hold on to at most 2 lost talents.")
+        self.assertEqual([node.name for node in linked_tree.lost_talents], [node.name for node in array_tree.lost_talents], "Both trees should evict the same lost talents.")
+
+    def test_kill_tree(self):
+        tree = ArrayTTree()
+        TestHelpers().build_robust_balanced_tree(tree)
+        tree.add_task("Promotional task", "Talent4")
+        tree.die()
+
+        self.assertEqual(tree.total_nodes, 0, "The tree should have only the god node after dying.")
+        self.assertListEqual(tree.levels, [[tree.head]], "Only the head should be left standing.")
+        self.assertEqual(len(tree.lost_talents), 0, "Lost talents should die with the tree.")
+
+        del tree
+
+    def test_kill_subtree_matches_linked_tree(self):
+        trees = [TTree(), ArrayTTree()]
+        for tree in trees:
+            TestHelpers().build_robust_balanced_tree(tree)
+            tree.add_task("Promotional task", "Talent4")
+            tree.die(tree._find_talent_node("Talent2"))
+            tree.add_task("Another task", "Talent7")
+
+        linked_tree, array_tree = trees
+        self.assertIsNone(array_tree._find_talent_node("Talent2"), "The dead talent should be forgotten.")
+        for rank in linked_tree.rank_levels:
+            linked_names = [node.name for node in linked_tree._get_talent_node_list_at_rank(rank)]
+            array_names = [node.name for node in array_tree._get_talent_node_list_at_rank(rank)]
+            self.assertListEqual(linked_names, array_names, f"Both trees should hold the same talents at rank {rank}.")
+        self.assertEqual(array_tree._count_total_talents(), array_tree.total_nodes, "The survivors should still be counted.")
+        self.assertGreater(len(array_tree.lost_talents), 0, "Lost talents should outlive a subtree.")
+        with self.assertRaises(ValueError, msg="A lost talent isn't in the tree to die."):
+            array_tree.die(array_tree.lost_talents[0])
+
+        del trees
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import asyncio
+import unittest
+from structs import TTree, AsyncTTree
+from .helpers import TestHelpers
+
+class TestAsyncTTree(unittest.IsolatedAsyncioTestCase):
+    def build_calls(self, total_calls: int) -> list:
+        calls = []
+        for i in range(total_calls):
+            calls.append(('add', f"Task {i % 11}", f"Talent{i % 9}"))
+            if i % 3 == 0:
+                calls.append(('access', f"Task {i % 7}", f"Talent{i % 9}"))
+        return calls
+
+    async def test_matches_sequential(self):
+        calls = self.build_calls(400)
+        async with AsyncTTree(max_batch_size=64) as async_tree:
+            # every call is queued in the order gather starts them
+            results = await asyncio.gather(*[
+                async_tree.add_task(task_name, talent_name) if kind == 'add' else async_tree.access_task(task_name, talent_name)
+                for kind, task_name, talent_name in calls])
+
+        tree = TTree()
+        expected_results = [tree.add_task(task_name, talent_name) if kind == 'add' else tree.access_task(task_name, talent_name)
+                            for kind, task_name, talent_name in calls]
+        self.assertListEqual(results, expected_results, "Every caller should get what applying the calls in order gives.")
+        TestHelpers().assert_same_tree(self, tree, async_tree.tree)
+
+    async def test_batches_and_metrics(self):
+        async with AsyncTTree(max_batch_size=50) as async_tree:
+            await asyncio.gather(*[async_tree.add_task(f"Task {i}", f"Talent{i % 5}") for i in range(200)])
+            metrics = async_tree.metrics()
+
+        self.assertEqual(metrics['total_commands'], 200, "Every command should be counted.")
+        self.assertLess(metrics['total_batches'], 200, "Commands queued together should be applied in batches.")
+        self.assertLessEqual(metrics['last_batch_size'], 50, "No batch should go past the most commands in a batch.")
+        self.assertEqual(metrics['queue_depth'], 0, "Nothing should be left in the queue.")
+        self.assertGreaterEqual(metrics['max_batch_latency'], metrics['mean_batch_latency'], "The longest batch should take at least as long as the average.")
+
+    async def test_errors_only_reach_their_caller(self):
+        async with AsyncTTree() as async_tree:
+            results = await asyncio.gather(
+                async_tree.add_task("Task 1", "Talent1"),
+                async_tree.add_task("Task 2", ["unhashable"]),
+                async_tree.access_task("Task 1", "Talent1"),
+                return_exceptions=True)
+            total_talents = await async_tree.read(lambda tree: len(tree.talent_map))
+
+        self.assertIsNone(results[0], "The call before the bad one should go ahead.")
+        self.assertIsInstance(results[1], TypeError, "The bad call should fail for its caller.")
+        self.assertTrue(results[2], "The call after the bad one should go ahead.")
+        self.assertEqual(total_talents, 1, "Only the good calls should be in the tree.")
+
+    async def test_die_and_close(self):
+        async_tree = AsyncTTree()
+        TestHelpers().build_robust_balanced_tree(async_tree.tree)
+        await async_tree.die()
+        self.assertEqual(await async_tree.read(lambda tree: tree.total_nodes), 0, "Dying should go through the queue like any other call.")
+
+        await async_tree.close()
+        with self.assertRaises(RuntimeError):
+            await async_tree.add_task("Task 1", "Talent1")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import threading
+import unittest
+from structs import TTree, ConcurrentTTree
+from .helpers import TestHelpers
+
+class CallRecorder:
+    """
+    Stands in for a journal, writing down every call in the order the tree applied them.
+    """
+    def __init__(self):
+        self.calls = []
+
+    def add_task(self, time: int, task_name: str, talent_name: str) -> None:
+        self.calls.append(('add', task_name, talent_name))
+
+    def access_task(self, time: int, task_name: str, talent_name: str) -> None:
+        self.calls.append(('access', task_name, talent_name))
+
+    def die(self, time: int, talent_name: str = None) -> None:
+        self.calls.append(('die', talent_name))
+
+class TestConcurrentTTree(unittest.TestCase):
+    def run_threads(self, target, total_threads: int = 8) -> None:
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(total_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_matches_sequential(self):
+        concurrent_tree = ConcurrentTTree()
+        recorder = CallRecorder()
+        concurrent_tree.tree.journal = recorder
+        found = []
+
+        def work(thread_index: int) -> None:
+            total_found = 0
+            for i in range(300):
+                talent_name = f"Talent{(i + thread_index) % 9}"
+                concurrent_tree.add_task(f"Task {i % 11}", talent_name)
+                if i % 3 == 0:
+                    total_found += concurrent_tree.access_task(f"Task {i % 7}", talent_name)
+                if i % 10 == 0:
+                    concurrent_tree.add_tasks([(f"Task {i % 5}", talent_name), ("Task 1", "Talent1")])
+                    total_found += sum(concurrent_tree.access_tasks([(f"Task {i % 4}", talent_name), ("Task 1", "Talent1")]))
+            found.append(total_found)
+
+        self.run_threads(work)
+
+        # apply the calls one after another, in the order the tree got them
+        tree = TTree()
+        total_found = 0
+        for call in recorder.calls:
+            if call[0] == 'add':
+                tree.add_task(call[1], call[2])
+            else:
+                total_found += tree.access_task(call[1], call[2])
+
+        self.assertEqual(len(found), 8, "Every thread should finish.")
+        self.assertEqual(len(recorder.calls), 8 * (300 + 100 + 30 * 4), "Every call should be applied once.")
+        self.assertEqual(sum(found), total_found, "Every thread should get the same answers as applying the calls in order.")
+        TestHelpers().assert_same_tree(self, tree, concurrent_tree.tree)
+
+    def test_batches_stay_together(self):
+        concurrent_tree = ConcurrentTTree()
+        recorder = CallRecorder()
+        concurrent_tree.tree.journal = recorder
+
+        def work(thread_index: int) -> None:
+            for i in range(50):
+                concurrent_tree.add_tasks([(f"Task {i}-{j}", f"Talent{thread_index}") for j in range(4)])
+
+        self.run_threads(work)
+
+        for i in range(0, len(recorder.calls), 4):
+            batch = recorder.calls[i:i + 4]
+            self.assertEqual(len({talent_name for _, _, talent_name in batch}), 1, "Nothing should land in the middle of a batch.")
+
+    def test_errors_only_reach_their_caller(self):
+        concurrent_tree = ConcurrentTTree()
+        errors = []
+
+        def work(thread_index: int) -> None:
+            for i in range(100):
+                if thread_index == 0 and i % 10 == 0:
+                    try:
+                        concurrent_tree.add_tasks([("Task 1", "Talent1"), ("Task 2", ["unhashable"])])
+                    except TypeError:
+                        errors.append(i)
+                    try:
+                        concurrent_tree.access_task("Task 1", None)
+                    except ValueError:
+                        errors.append(i)
+                    continue
+                concurrent_tree.add_task(f"Task {i % 11}", f"Talent{thread_index}")
+
+        self.run_threads(work)
+
+        self.assertEqual(len(errors), 20, "Every bad call should fail for its caller.")
+        with concurrent_tree.reading() as tree:
+            self.assertEqual(tree.time, 7 * 100 + 90, "Every good call should be applied, and no part of a bad batch.")
+            self.assertNotIn(None, tree.talent_map, "Only the talents of good calls should be in the tree.")
+
+    def test_reading(self):
+        concurrent_tree = ConcurrentTTree()
+        TestHelpers().build_robust_balanced_tree(concurrent_tree.tree)
+        totals = []
+
+        def read(thread_index: int) -> None:
+            with concurrent_tree.reading() as tree:
+                totals.append(len(tree.talent_map))
+
+        self.run_threads(read)
+        self.assertListEqual(totals, [7] * 8, "Every reader should see the whole tree.")
+
+        concurrent_tree.die()
+        with concurrent_tree.reading() as tree:
+            self.assertEqual(tree.total_nodes, 0, "Dying should go through the lock like any other call.")
+
+if __name__ == '__main__':
+    unittest.main()
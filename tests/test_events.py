@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from structs import TTree, TalentNode
+from structs.events import PROMOTED, BURNT_OUT, RELEARNED, LOST
+from utils.snapshot import save_snapshot, load_snapshot
+from .helpers import TestHelpers
+
+def describe(events: list) -> list:
+    return [(event.kind, event.talent_node.name, event.rank, event.time) for event in events]
+
+class TestEvents(unittest.TestCase):
+    def build_tree(self) -> TTree:
+        tree = TTree()
+        for i in range(12):
+            tree.add_task(f"Task {i}", ["TalentA", "TalentB"][i % 2])
+        return tree
+
+    def test_promotion_burnout_and_loss(self):
+        tree = TTree()
+        events = []
+        tree.subscribe(events.append)
+        for i in range(12):
+            tree.add_task(f"Task {i}", ["TalentA", "TalentB"][i % 2])
+        # tasks in a row burn a talent out
+        for i in range(5):
+            tree.add_task(f"Job {i}", "TalentC")
+
+        self.assertListEqual(describe(events), [
+            (PROMOTED, "TalentA", 1, 8),
+            (PROMOTED, "TalentB", 1, 9),
+            (BURNT_OUT, "TalentC", 0, 16),
+            (PROMOTED, "TalentC", 1, 16),
+            (LOST, "TalentA", 1, 16),
+        ], "Every transition should be heard about in order, with its rank and time.")
+        self.assertIn(tree.lost_talents[0], [event.talent_node for event in events], "The lost talent should be handed over.")
+
+    def test_relearn(self):
+        tree = TTree()
+        events = []
+        tree.subscribe(events.append, kinds=[RELEARNED])
+        for i, talent_name in enumerate(["A", "B", "A", "B", "B", "A", "B", "B", "B", "B", "B", "A"]):
+            tree.add_task(f"Task {i}", talent_name)
+
+        self.assertListEqual(describe(events), [(RELEARNED, "A", 0, 11)], "Waiting too long between tasks should forget the recent ones.")
+
+    def test_every_loss_is_heard(self):
+        tree = TTree()
+        lost_names = []
+        tree.subscribe(lambda event: lost_names.append(event.talent_node.name), kinds=[LOST])
+        TestHelpers().add_mixed_tasks(tree)
+
+        self.assertListEqual(lost_names, [talent_node.name for talent_node in tree.lost_talents], "Every lost talent should be heard about, in order.")
+
+    def test_talent_subscribers_and_batches(self):
+        tree = self.build_tree()
+        talent_events = []
+        batches = []
+        tree.talent_map["TalentA"].subscribe(talent_events.append)
+        tree.subscribe(batches.append, kinds=[PROMOTED], is_batched=True)
+        for i in range(12, 24):
+            tree.add_task(f"Task {i}", ["TalentA", "TalentB"][i % 2])
+
+        self.assertTrue(talent_events, "TalentA should hear about itself.")
+        self.assertTrue(all(event.talent_node.name == "TalentA" for event in talent_events), "A talent should only hear about itself.")
+        self.assertListEqual(batches, [], "Batched events should wait for a flush.")
+        tree.flush_events()
+        self.assertEqual(len(batches), 1, "A flush should hand over every waiting event at once.")
+        self.assertTrue(batches[0] and all(event.kind == PROMOTED for event in batches[0]), "Only the kinds asked for should be batched.")
+
+        tree.unsubscribe(batches.append)
+        tree.talent_map["TalentA"].unsubscribe(talent_events.append)
+        self.assertListEqual(tree.events.subscriptions, [], "Unsubscribing should leave no one listening.")
+
+    def test_bad_subscriptions(self):
+        with self.assertRaises(ValueError, msg="A talent outside of a tree has nothing to subscribe to."):
+            TalentNode("Talent").subscribe(print)
+        with self.assertRaises(ValueError, msg="Unknown kinds of events should be turned away."):
+            TTree().subscribe(print, kinds=["forgotten"])
+
+    def test_snapshot_talents_send_events(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'tree.snapshot')
+        save_snapshot(self.build_tree(), path)
+
+        tree = load_snapshot(path)
+        events = []
+        tree.talent_map["TalentB"].subscribe(events.append)
+        for i in range(12, 24):
+            tree.add_task(f"Task {i}", ["TalentA", "TalentB"][i % 2])
+
+        self.assertTrue(events, "Talents loaded from a snapshot should send events too.")
+
+if __name__ == '__main__':
+    unittest.main()
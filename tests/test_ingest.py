@@ -0,0 +1,49 @@
+import io
+import unittest
+from structs import TTree
+from utils.ingest import ADD, ACCESS, read_jsonl_events, read_csv_events, ingest_events
+
+class TestIngest(unittest.TestCase):
+    def test_read_events(self):
+        jsonl = io.StringIO('{"action": "add", "task_name": "Read", "talent_name": "TalentA"}\n'
+                            '\n'
+                            '{"action": "access_task", "task_name": "Read", "talent_name": "TalentA"}\n')
+        csv = io.StringIO('action,task_name,talent_name\n'
+                          'add,Read,TalentA\n'
+                          'access,"Read, quickly",TalentA\n')
+
+        self.assertListEqual(list(read_jsonl_events(jsonl)), [(ADD, "Read", "TalentA"), (ACCESS, "Read", "TalentA")], "Both JSON events should be read, skipping the blank line.")
+        self.assertListEqual(list(read_csv_events(csv)), [(ADD, "Read", "TalentA"), (ACCESS, "Read, quickly", "TalentA")], "Both CSV rows should be read, skipping the header.")
+        with self.assertRaises(ValueError):
+            list(read_jsonl_events(io.StringIO('{"action": "forget", "task_name": "Read", "talent_name": "TalentA"}\n')))
+        with self.assertRaises(ValueError):
+            list(read_csv_events(io.StringIO('add,Read\n')))
+
+    def test_ingest_matches_single_calls(self):
+        events = []
+        for i in range(60):
+            events.append((ADD, f"Task {i % 7}", f"Talent{i % 3}"))
+            if i % 4 == 0:
+                events.append((ACCESS, f"Task {i % 5}", f"Talent{i % 3}"))
+
+        single_tree = TTree()
+        found = 0
+        for action, task_name, talent_name in events:
+            if action == ADD:
+                single_tree.add_task(task_name, talent_name)
+            else:
+                found += single_tree.access_task(task_name, talent_name)
+
+        reports = []
+        batch_tree = TTree()
+        totals = ingest_events(batch_tree, iter(events), chunk_size=8, report=lambda totals: reports.append(totals['events']))
+
+        self.assertEqual(totals['events'], len(events), "Every event should be applied.")
+        self.assertEqual(totals['found'], found, "The same tasks should be found either way.")
+        self.assertEqual(reports[0], 8, "Progress should be reported after every chunk.")
+        self.assertEqual(batch_tree.time, single_tree.time, "Every event should burn time.")
+        for rank in single_tree.rank_levels:
+            self.assertListEqual([node.name for node in batch_tree._get_talent_node_list_at_rank(rank)], [node.name for node in single_tree._get_talent_node_list_at_rank(rank)], f"Both trees should hold the same talents at rank {rank}.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from structs import TTree, TaskHeap, Instruments, instrument, uninstrument
+from structs.instruments import COUNTERS
+from .helpers import TestHelpers
+
+class TestInstruments(unittest.TestCase):
+    def test_counts_what_the_tree_does(self):
+        helpers = TestHelpers()
+        tree = TTree(task_store_type=TaskHeap)
+        instruments = instrument(tree)
+        helpers.add_mixed_tasks(tree)
+        counters = instruments.to_dict()['counters']
+
+        for counter in COUNTERS:
+            # the mixed tasks lose talents before they rank up or recall much, those are checked on their own
+            if counter not in ('heapify_swaps', 'promotions'):
+                self.assertGreater(counters[counter], 0, f"The mixed tasks should count some {counter}.")
+        self.assertEqual(counters['talents_lost'], len(tree.lost_talents), "Every talent pushed to the lost talents should be counted.")
+
+        plain_tree = TTree(task_store_type=TaskHeap)
+        helpers.add_mixed_tasks(plain_tree)
+        helpers.assert_same_tree(self, plain_tree, tree)
+
+    def test_promotions_and_heapify_swaps(self):
+        for task_store_type in (None, TaskHeap):
+            tree = TTree(task_store_type=task_store_type)
+            instruments = instrument(tree)
+            for i in range(12):
+                tree.add_task(f"Task {i}", ["TalentA", "TalentB"][i % 2])
+            swaps = instruments.counters['heapify_swaps']
+            tree.access_tasks([("Task 0", "TalentA"), ("Task 4", "TalentA"), ("Task 1", "TalentB")])
+
+            self.assertGreater(instruments.counters['heapify_swaps'], swaps, f"Recalling old tasks should swap them up, with {task_store_type}.")
+            self.assertEqual(instruments.counters['promotions'], 2, f"Both talents should have been promoted once, with {task_store_type}.")
+
+    def test_operations_are_timed(self):
+        tree = TTree()
+        instruments = instrument(tree)
+        TestHelpers().add_mixed_tasks(tree)
+        tree.die()
+        operations = instruments.to_dict()['operations']
+
+        self.assertEqual(operations['add_task']['count'], 150, "Every add should be timed.")
+        self.assertEqual(operations['access_task']['count'], 50, "Every access should be timed.")
+        self.assertEqual(operations['access_tasks']['count'], 15, "Every batch of accesses should be timed.")
+        self.assertEqual(operations['die']['count'], 1, "Dying should be timed.")
+        self.assertEqual(operations['add_task']['buckets'][float('inf')], 150, "The last bucket should hold every add.")
+        self.assertGreater(operations['add_task']['sum'], 0, "The time spent adding should add up.")
+
+    def test_uninstrument(self):
+        tree = TTree()
+        instruments = instrument(tree)
+        tree.add_task("Read", "Literacy")
+        uninstrument(tree)
+        tree.add_task("Write", "Literacy")
+        tree.add_task("Add", "Numeracy")
+
+        self.assertIsNone(tree.instruments, "The tree should stop counting.")
+        self.assertNotIn('add_task', vars(tree), "The tree's own add_task should be back.")
+        self.assertIsNone(tree.talent_map["Literacy"].instruments, "Talents should stop counting too.")
+        self.assertEqual(instruments.to_dict()['operations']['add_task']['count'], 1, "Only the add made while counting should be timed.")
+
+    def test_shared_instruments(self):
+        instruments = Instruments()
+        trees = [TTree(), TTree()]
+        for tree in trees:
+            instrument(tree, instruments)
+            tree.add_task("Read", "Literacy")
+        visited = instruments.counters['nodes_visited']
+        trees[0]._find_talent_node("Literacy")
+        # a search from anywhere but the head walks the subtree
+        trees[0]._find_talent_node("Literacy", trees[0].head.child_left)
+
+        self.assertEqual(instruments.to_dict()['operations']['add_task']['count'], 2, "Both trees should be timed together.")
+        self.assertEqual(instruments.counters['nodes_visited'] - visited, 2, "A lookup in the map and a subtree search should each count the nodes they looked at.")
+
+    def test_prometheus(self):
+        tree = TTree()
+        instruments = instrument(tree, Instruments(latency_buckets=(0.5, 1.0)))
+        tree.add_task("Read", "Literacy")
+        lines = instruments.to_prometheus().splitlines()
+
+        self.assertIn("# TYPE ttree_promotions_total counter", lines, "Counters should be typed.")
+        self.assertIn("ttree_bonds_added_total 1", lines, "Adding the first talent should bond it to the head.")
+        self.assertIn('ttree_operation_seconds_bucket{operation="add_task",le="+Inf"} 1', lines, "Histograms should end with a +Inf bucket.")
+        self.assertIn('ttree_operation_seconds_count{operation="add_task"} 1', lines, "Histograms should have a count.")
+
+if __name__ == '__main__':
+    unittest.main()
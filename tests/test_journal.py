@@ -0,0 +1,101 @@
+import os
+import tempfile
+import unittest
+from structs import TTree
+from utils.journal import Journal, replay_journal, recover, checkpoint
+from utils.snapshot import save_snapshot
+from .helpers import TestHelpers
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.snapshot_path = os.path.join(directory.name, 'tree.snapshot')
+        self.journal_path = os.path.join(directory.name, 'tree.journal')
+
+    def test_replay(self):
+        tree = TTree()
+        with Journal(self.journal_path, sync_every=7) as journal:
+            tree.journal = journal
+            TestHelpers().add_mixed_tasks(tree, 0, 40, total_talents=5)
+            tree.die()
+            TestHelpers().add_mixed_tasks(tree, 40, 60, total_talents=5)
+
+        replayed_tree = TTree()
+        position, _ = replay_journal(replayed_tree, self.journal_path)
+        self.assertEqual(position, journal.position, "Every entry should be replayed.")
+        self.assertIsNone(replayed_tree.journal, "Replaying shouldn't set a journal.")
+        TestHelpers().assert_same_tree(self, tree, replayed_tree)
+
+    def test_die_on_lost_talent(self):
+        tree = TTree()
+        with Journal(self.journal_path) as journal:
+            tree.journal = journal
+            TestHelpers().add_mixed_tasks(tree, 0, 60, total_talents=5)
+            position = journal.position
+            with self.assertRaises(ValueError):
+                tree.die(tree.lost_talents[0])
+            self.assertEqual(journal.position, position, "A die that can't happen shouldn't be journaled.")
+            name = next(iter(tree.talent_map))
+            tree.die(tree.talent_map[name])
+
+        replayed_tree = TTree()
+        replay_journal(replayed_tree, self.journal_path)
+        TestHelpers().assert_same_tree(self, tree, replayed_tree)
+
+    def test_recover_from_checkpoint(self):
+        tree = recover(self.snapshot_path, self.journal_path)
+        TestHelpers().add_mixed_tasks(tree, 0, 30, total_talents=5)
+        checkpoint(tree, self.snapshot_path)
+        self.assertEqual(os.path.getsize(self.journal_path), 0, "A checkpoint should empty the journal.")
+        TestHelpers().add_mixed_tasks(tree, 30, 50, total_talents=5)
+        tree.journal.close()
+
+        recovered_tree = recover(self.snapshot_path, self.journal_path)
+        TestHelpers().assert_same_tree(self, tree, recovered_tree)
+        self.assertEqual(recovered_tree.journal.position, tree.journal.position, "The journal should carry on from the same position.")
+        recovered_tree.journal.close()
+
+    def test_recover_lost_talent_capacity(self):
+        tree = recover(self.snapshot_path, self.journal_path, lost_talent_capacity=2)
+        self.assertEqual(tree.lost_talents.capacity, 2, "A new tree should get the lost talent capacity.")
+        TestHelpers().add_mixed_tasks(tree, 0, 60, total_talents=5)
+        checkpoint(tree, self.snapshot_path)
+        tree.journal.close()
+
+        recovered_tree = recover(self.snapshot_path, self.journal_path)
+        self.assertEqual(recovered_tree.lost_talents.capacity, 2, "The snapshot should bring its lost talent capacity.")
+        recovered_tree.journal.close()
+
+    def test_recover_after_crash(self):
+        tree = recover(self.snapshot_path, self.journal_path)
+        TestHelpers().add_mixed_tasks(tree, 0, 30, total_talents=5)
+        # crash after the snapshot is saved, but before the journal is emptied
+        tree.journal.flush()
+        save_snapshot(tree, self.snapshot_path)
+        TestHelpers().add_mixed_tasks(tree, 30, 50, total_talents=5)
+        tree.journal.close()
+        # and cut off the last line halfway
+        with open(self.journal_path, 'ab') as file:
+            file.write(b'[1000, 1000, "add", "Tas')
+
+        recovered_tree = recover(self.snapshot_path, self.journal_path)
+        TestHelpers().assert_same_tree(self, tree, recovered_tree)
+        recovered_tree.add_task("Task 1", "Talent1")
+        recovered_tree.journal.close()
+        with open(self.journal_path, 'rb') as file:
+            self.assertTrue(file.read().endswith(b'"Task 1","Talent1"]\n'), "New entries should start on a line of their own.")
+
+    def test_journal_must_follow_tree(self):
+        tree = TTree()
+        with Journal(self.journal_path) as journal:
+            tree.journal = journal
+            TestHelpers().add_mixed_tasks(tree, 0, 10, total_talents=5)
+
+        mismatched_tree = TTree()
+        mismatched_tree.add_task("Task 1", "Talent1")
+        with self.assertRaises(ValueError):
+            replay_journal(mismatched_tree, self.journal_path)
+
+if __name__ == '__main__':
+    unittest.main()
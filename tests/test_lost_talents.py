@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from structs import TTree, TaskHeap, TalentNode, LostTalents
+from structs.lost_talents import OLDEST, LOWEST_RANK
+from utils.lost_talents import LostTalentArchive
+from .helpers import TestHelpers
+
+class TestLostTalents(unittest.TestCase):
+    def lose(self, lost_talents: LostTalents, *talents) -> None:
+        for name, rank in talents:
+            lost_talents.append(TalentNode(name, rank=rank))
+
+    def test_index(self):
+        lost_talents = LostTalents()
+        self.lose(lost_talents, ("TalentA", 1), ("TalentB", 0), ("TalentA", 2))
+
+        self.assertIn("TalentA", lost_talents, "Lost names should be found.")
+        self.assertNotIn("TalentC", lost_talents, "Talents that were never lost shouldn't be found.")
+        self.assertEqual(lost_talents.get("TalentA").rank, 2, "The last talent lost with a name should be found.")
+        self.assertListEqual([node.rank for node in lost_talents.get_all("TalentA")], [2, 1], "Every talent lost with a name should be found, the last one first.")
+        self.assertEqual(lost_talents[1].name, "TalentB", "Lost talents should be in the order they were lost.")
+
+    def test_evict_oldest(self):
+        lost_talents = LostTalents(capacity=2, eviction=OLDEST)
+        self.lose(lost_talents, ("TalentA", 1), ("TalentB", 0), ("TalentC", 2), ("TalentD", 1))
+
+        self.assertListEqual([node.name for node in lost_talents], ["TalentC", "TalentD"], "The oldest lost talents should be evicted first.")
+        self.assertNotIn("TalentA", lost_talents, "Evicted talents shouldn't be found.")
+        self.assertEqual(lost_talents.total_evicted, 2, "Evictions should be counted.")
+
+    def test_evict_lowest_rank(self):
+        lost_talents = LostTalents(capacity=2, eviction=LOWEST_RANK)
+        self.lose(lost_talents, ("TalentA", 1), ("TalentB", 0), ("TalentC", 2), ("TalentD", 1))
+
+        self.assertListEqual([node.name for node in lost_talents], ["TalentC", "TalentD"], "The lowest rank, then the oldest, should be evicted first.")
+        with self.assertRaises(ValueError):
+            LostTalents(eviction="newest")
+
+    def test_tree_capacity(self):
+        tree = TTree(lost_talent_capacity=3)
+        unbounded_tree = TTree()
+        for i in range(150):
+            for each_tree in (tree, unbounded_tree):
+                each_tree.add_task(f"Task {i % 11}", f"Talent{i % 9}")
+
+        self.assertEqual(len(tree.lost_talents), 3, "The tree should hold on to at most 3 lost talents.")
+        self.assertListEqual([node.name for node in tree.lost_talents], [node.name for node in unbounded_tree.lost_talents][-3:], "The last talents lost should be kept.")
+        for rank, level in unbounded_tree.rank_levels.items():
+            self.assertListEqual([node.name for node in tree.rank_levels[rank]], [node.name for node in level], f"Evicting lost talents shouldn't change the talents at rank {rank}.")
+
+class TestLostTalentArchive(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.archive = LostTalentArchive(os.path.join(directory.name, 'lost.archive'))
+        self.addCleanup(self.archive.close)
+
+    def test_matches_list(self):
+        for task_store_type in (None, TaskHeap):
+            tree = TTree(task_store_type)
+            archived_tree = TTree(task_store_type)
+            archived_tree.lost_talents = self.archive
+            TestHelpers().add_mixed_tasks(tree)
+            TestHelpers().add_mixed_tasks(archived_tree)
+
+            self.assertEqual(len(self.archive), len(tree.lost_talents), "Every lost talent should be archived.")
+            for lost_talent, archived_talent in zip(tree.lost_talents, self.archive):
+                self.assertEqual(archived_talent.name, lost_talent.name, "Lost talents should be read back in the order they were lost.")
+                self.assertEqual(archived_talent.rank, lost_talent.rank, f"'{lost_talent.name}' should keep its rank.")
+                self.assertDictEqual(archived_talent.recent_task_map, lost_talent.recent_task_map, f"'{lost_talent.name}' should keep its recent tasks.")
+                if task_store_type:
+                    self.assertListEqual(archived_talent.task_store.dump_tasks(), lost_talent.task_store.dump_tasks(), f"'{lost_talent.name}' should keep its task store.")
+            for rank, level in tree.rank_levels.items():
+                self.assertListEqual([node.name for node in archived_tree.rank_levels[rank]], [node.name for node in level], f"Archiving shouldn't change the talents at rank {rank}.")
+
+            archived_tree.die()
+            self.assertEqual(len(self.archive), 0, "Dying should clear the archive.")
+
+    def test_get(self):
+        tree = TTree()
+        tree.lost_talents = self.archive
+        TestHelpers().add_mixed_tasks(tree)
+
+        lost_names = [talent_node.name for talent_node in self.archive]
+        name = lost_names[0]
+        self.assertIn(name, self.archive, "Lost names should be in the archive.")
+        self.assertNotIn("Talent Never", self.archive, "Talents that were never lost shouldn't be in the archive.")
+        self.assertIsNone(self.archive.get("Talent Never"), "Talents that were never lost can't be read back.")
+        self.assertEqual(self.archive.get(name).name, name, "A lost talent should be read back by name.")
+        self.assertEqual(len(self.archive.get_all(name)), lost_names.count(name), "Every talent lost with a name should be read back.")
+        self.assertIsNotNone(self.archive.get(name)._task_loader, "Tasks should only be read once they're touched.")
+
+if __name__ == '__main__':
+    unittest.main()
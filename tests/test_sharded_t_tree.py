@@ -0,0 +1,116 @@
+import unittest
+from structs import TTree, ShardedTTree, TaskHeap
+
+def describe_tree(tree: TTree) -> tuple:
+    """
+    Boils a tree down to what's needed to compare it, so it can be sent back from a shard.
+    @param tree: the tree to describe
+    @return the time, total nodes, the talents and their parents at each rank and the lost talents
+    """
+    ranks = {rank: [(node.name, node.parent.name if node.parent else None) for node in level]
+             for rank, level in tree.rank_levels.items()}
+    return tree.time, tree.total_nodes, ranks, [node.name for node in tree.lost_talents]
+
+def count_talents(tree: TTree) -> int:
+    return len(tree.talent_map)
+
+class TestShardedTTree(unittest.TestCase):
+    def build_calls(self, total_calls: int) -> list:
+        calls = []
+        for i in range(total_calls):
+            calls.append((False, f"Task {i % 11}", f"Talent{i % 13}"))
+            if i % 3 == 0:
+                calls.append((True, f"Task {i % 7}", f"Talent{i % 13}"))
+        return calls
+
+    def test_shards_match_trees_fed_their_own_talents(self):
+        calls = self.build_calls(600)
+        with ShardedTTree(total_shards=3, task_store_type=TaskHeap, batch_size=16) as sharded_tree:
+            results = []
+            for is_access, task_name, talent_name in calls:
+                if is_access:
+                    results.append(sharded_tree.access_task(task_name, talent_name))
+                else:
+                    sharded_tree.add_task(task_name, talent_name)
+            descriptions = sharded_tree.read(describe_tree)
+
+            trees = [TTree(task_store_type=TaskHeap) for _ in range(3)]
+            expected_results = []
+            for is_access, task_name, talent_name in calls:
+                tree = trees[sharded_tree.get_shard(talent_name)]
+                if is_access:
+                    expected_results.append(tree.access_task(task_name, talent_name))
+                else:
+                    tree.add_task(task_name, talent_name)
+
+        self.assertListEqual(results, expected_results, "Every access should find what it would in a tree of its shard's talents.")
+        for shard, tree in enumerate(trees):
+            self.assertEqual(descriptions[shard], describe_tree(tree), f"Shard {shard} should be a tree fed only its own talents.")
+
+    def test_one_shard_is_a_single_tree(self):
+        calls = self.build_calls(300)
+        tree = TTree()
+        with ShardedTTree(total_shards=1, batch_size=7) as sharded_tree:
+            for is_access, task_name, talent_name in calls:
+                if is_access:
+                    sharded_tree.access_tasks([(task_name, talent_name)])
+                    tree.access_task(task_name, talent_name)
+                else:
+                    sharded_tree.add_tasks([(task_name, talent_name)])
+                    tree.add_task(task_name, talent_name)
+            description, = sharded_tree.read(describe_tree)
+
+        self.assertEqual(description, describe_tree(tree), "A single shard should end up the same as a single tree.")
+
+    def test_access_tasks_keeps_order(self):
+        added_tasks = [(f"Task {i}", f"Talent{i % 5}") for i in range(20)]
+        tasks = [(f"Task {i}", f"Talent{i % 5}") for i in range(0, 30, 3)]
+        with ShardedTTree(total_shards=2) as sharded_tree:
+            sharded_tree.add_tasks(added_tasks)
+            results = sharded_tree.access_tasks(tasks)
+
+            trees = [TTree() for _ in range(2)]
+            for task_name, talent_name in added_tasks:
+                trees[sharded_tree.get_shard(talent_name)].add_task(task_name, talent_name)
+            expected_results = [trees[sharded_tree.get_shard(talent_name)].access_task(task_name, talent_name) for task_name, talent_name in tasks]
+
+        self.assertEqual(len({sharded_tree.get_shard(talent_name) for _, talent_name in tasks}), 2, "The tasks should be spread across every shard.")
+        self.assertListEqual(results, expected_results, "Results should come back in the order of the tasks, across shards.")
+
+    def test_time_and_total_nodes_add_up(self):
+        with ShardedTTree(total_shards=4, batch_size=10) as sharded_tree:
+            sharded_tree.add_tasks((f"Task {i}", f"Talent{i % 6}") for i in range(95))
+            sharded_tree.access_tasks([("Task 0", "Talent0"), ("Task 1", "Talent1")])
+
+            self.assertEqual(sharded_tree.time, 97, "Time should be the total number of calls.")
+            self.assertEqual(sharded_tree.total_nodes, sum(sharded_tree.read(count_talents)), "Total nodes should add up every shard.")
+
+    def test_die(self):
+        with ShardedTTree(total_shards=2) as sharded_tree:
+            sharded_tree.add_tasks((f"Task {i}", f"Talent{i % 4}") for i in range(40))
+            sharded_tree.die()
+
+            self.assertListEqual(sharded_tree.read(count_talents), [0, 0], "Every shard should be emptied.")
+            self.assertEqual(sharded_tree.total_nodes, 0, "There should be no talents left.")
+
+    def test_bad_names(self):
+        with ShardedTTree(total_shards=2) as sharded_tree:
+            sharded_tree.add_task("Read", "Literacy")
+            with self.assertRaises(TypeError, msg="A talent name that isn't a string can't be sharded."):
+                sharded_tree.add_task("Read", 7)
+            with self.assertRaises(TypeError, msg="A task name that can't be hashed should be turned away."):
+                sharded_tree.access_tasks([("Read", "Literacy"), (["Read"], "Literacy")])
+            self.assertEqual(sharded_tree.time, 1, "Nothing from the bad calls should reach a shard.")
+
+    def test_closed(self):
+        sharded_tree = ShardedTTree(total_shards=1)
+        sharded_tree.add_task("Read", "Literacy")
+        sharded_tree.close()
+        sharded_tree.close()
+
+        self.assertFalse(sharded_tree.workers[0].is_alive(), "The worker should be stopped.")
+        with self.assertRaises(RuntimeError, msg="A closed tree should turn calls away."):
+            sharded_tree.access_task("Read", "Literacy")
+
+if __name__ == '__main__':
+    unittest.main()
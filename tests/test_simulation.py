@@ -0,0 +1,37 @@
+import unittest
+from structs import TaskHeap
+from utils.simulation import FIELDS, generate_schedule, simulate_learner, simulate_population, read_summary
+
+class TestSimulation(unittest.TestCase):
+    def test_schedules_come_from_their_seed(self):
+        schedule = list(generate_schedule(7, total_tasks=200))
+
+        self.assertListEqual(list(generate_schedule(7, total_tasks=200)), schedule, "The same seed should make the same schedule.")
+        self.assertNotEqual(list(generate_schedule(8, total_tasks=200)), schedule, "Another seed should make another schedule.")
+        skewed_talents = [talent_name for _, _, talent_name in generate_schedule(7, total_tasks=200, skew=4)]
+        self.assertGreater(skewed_talents.count("Talent0"), 150, "A high skew should keep coming back to the first talent.")
+
+    def test_learner_summary(self):
+        summary = read_summary(simulate_learner(3, max_rank=4, total_tasks=500))
+
+        self.assertEqual(summary['seed'], 3, "The summary should say which learner it's for.")
+        self.assertEqual(summary['time'], 500, "Every event should tick the clock.")
+        self.assertEqual(len(summary['rank_histogram']), 5, "There should be a bin for every rank up to the highest.")
+        self.assertEqual(sum(summary['rank_histogram']), summary['talents'], "Every talent in the tree should be in a bin.")
+        self.assertLessEqual(summary['burnt_out'], summary['talents'], "Only talents in the tree can be burnt out.")
+
+    def test_population_matches_learners_run_one_by_one(self):
+        options = {'total_tasks': 300, 'total_talents': 12, 'skew': 1.5}
+        summaries = simulate_population(range(10), max_workers=2, chunk_size=3, max_rank=6, task_store_type=TaskHeap, **options)
+
+        self.assertListEqual([summary['seed'] for summary in summaries], list(range(10)), "Summaries should come back in the order of the seeds.")
+        for summary in summaries:
+            expected_summary = read_summary(simulate_learner(summary['seed'], max_rank=6, task_store_type=TaskHeap, **options))
+            self.assertDictEqual(summary, expected_summary, f"Learner {summary['seed']} should be the same in a worker.")
+        self.assertSetEqual(set(summaries[0]), set(FIELDS) | {'rank_histogram'}, "Summaries should only hold the compact fields.")
+
+    def test_empty_population(self):
+        self.assertListEqual(simulate_population([]), [], "No seeds should need no workers.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from structs import TTree, TaskHeap
+from structs.lost_talents import LOWEST_RANK
+from utils.snapshot import save_snapshot, load_snapshot
+from .helpers import TestHelpers
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'tree.snapshot')
+
+    def build_tree(self, task_store_type: type = None) -> TTree:
+        tree = TTree(task_store_type)
+        TestHelpers().add_mixed_tasks(tree, 0, 120)
+        return tree
+
+    def test_round_trip(self):
+        tree = self.build_tree()
+        save_snapshot(tree, self.path)
+        loaded_tree = load_snapshot(self.path)
+
+        TestHelpers().assert_same_tree(self, tree, loaded_tree)
+        for i in range(12):
+            self.assertEqual(loaded_tree.access_task(f"Task {i}", f"Talent{i % 9}"), tree.access_task(f"Task {i}", f"Talent{i % 9}"), f"Task {i} should be found the same way after loading.")
+        TestHelpers().assert_same_tree(self, tree, loaded_tree)
+
+    def test_round_trip_task_store(self):
+        tree = self.build_tree(TaskHeap)
+        save_snapshot(tree, self.path)
+        loaded_tree = load_snapshot(self.path)
+
+        self.assertIs(loaded_tree.task_store_type, TaskHeap, "The task store type should be saved.")
+        for name, talent_node in tree.talent_map.items():
+            loaded_store = loaded_tree.talent_map[name].task_store
+            self.assertIsInstance(loaded_store, TaskHeap, f"'{name}' should get its task store back.")
+            self.assertListEqual(loaded_store.dump_tasks(), talent_node.task_store.dump_tasks(), f"'{name}' should hold the same tasks.")
+
+    def test_stats_without_loading_tasks(self):
+        for task_store_type in (None, TaskHeap):
+            tree = self.build_tree(task_store_type)
+            for i in range(30):
+                tree.add_task(f"Task {i % 7}", ["TalentA", "TalentB"][i % 2])
+            save_snapshot(tree, self.path)
+            loaded_tree = load_snapshot(self.path)
+
+            self.assertGreater(tree.stats()['tasks'], 0, "The tree should have converted some tasks.")
+            self.assertDictEqual(loaded_tree.stats(), tree.stats(), f"The stats should come back with the tree, with {task_store_type}.")
+            self.assertTrue(all(node._task_loader is not None for node in loaded_tree.talent_map.values()), "Counting tasks shouldn't read them in.")
+
+    def test_tasks_load_lazily(self):
+        tree = self.build_tree()
+        save_snapshot(tree, self.path)
+        loaded_tree = load_snapshot(self.path)
+
+        name, other_name = list(tree.talent_map)[:2]
+        talent_node = loaded_tree.talent_map[name]
+        self.assertIsNotNone(talent_node._task_loader, "Tasks should stay on disk until they're needed.")
+        self.assertIsNone(talent_node._recent_task_map, "Recent tasks should stay on disk until they're needed.")
+        self.assertDictEqual(talent_node.recent_task_map, tree.talent_map[name].recent_task_map, "Recent tasks should be read when they're first needed.")
+        self.assertIsNone(talent_node._task_loader, "Tasks should only be read once.")
+        self.assertIsNotNone(loaded_tree.talent_map[other_name]._task_loader, "Other talents should leave their tasks on disk.")
+
+    def test_lost_talent_capacity(self):
+        tree = TTree(lost_talent_capacity=3, lost_talent_eviction=LOWEST_RANK)
+        TestHelpers().add_mixed_tasks(tree)
+        save_snapshot(tree, self.path)
+        loaded_tree = load_snapshot(self.path)
+
+        self.assertEqual(loaded_tree.lost_talents.capacity, 3, "The lost talent capacity should be saved.")
+        self.assertEqual(loaded_tree.lost_talents.eviction, LOWEST_RANK, "The lost talent eviction should be saved.")
+        TestHelpers().add_mixed_tasks(tree, 150, 300)
+        TestHelpers().add_mixed_tasks(loaded_tree, 150, 300)
+        TestHelpers().assert_same_tree(self, tree, loaded_tree)
+
+    def test_release_leaves_tasks_on_disk(self):
+        tree = self.build_tree()
+        save_snapshot(tree, self.path)
+        loaded_tree = load_snapshot(self.path)
+
+        lost_talents = list(loaded_tree.lost_talents)
+        talent_nodes = list(loaded_tree.talent_map.values())
+        loaded_tree.die()
+        for talent_node in lost_talents + talent_nodes:
+            self.assertIsNone(talent_node._task_loader, f"'{talent_node.name}' should let go of its tasks on disk.")
+            self.assertIsNone(talent_node._task_head, f"'{talent_node.name}' shouldn't read its tasks in just to let go of them.")
+
+    def test_not_a_snapshot(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'\0' * 128)
+        with self.assertRaises(ValueError):
+            load_snapshot(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
+import random
 import unittest
-from structs import TTree
+from structs import TTree, TaskHeap
+from structs.traversal import walk_pre_order
 from .helpers import TestHelpers
 
 class TestTTree(unittest.TestCase):
@@ -40,6 +42,38 @@ class TestTTree(unittest.TestCase):
 
         del tree
 
+    def test_talent_map_matches_tree(self):
+        """
+        Test to see if the talent map only knows about talents still in the tree.
+        """
+        tree = TTree()
+        TestHelpers().build_robust_balanced_tree(tree)
+        tree.add_task("Promotional task", "Talent4")
+
+        for name, node in tree.talent_map.items():
+            self.assertIs(tree._search_talent_subtree(name, tree.head), node, f"'{name}' should be in the tree where the talent map says it is.")
+        for lost_talent in tree.lost_talents:
+            self.assertIsNone(tree._find_talent_node(lost_talent.name, tree.head), f"'{lost_talent.name}' should be lost, not found.")
+        self.assertEqual(len(tree.talent_map), tree.total_nodes, "The talent map should hold every talent in the tree.")
+
+        del tree
+
+    def test_rank_levels_match_tree(self):
+        """
+        Test to see if the rank levels keep up with the tree through moves and promotions.
+        """
+        tree = TTree()
+        TestHelpers().build_gapped_balanced_tree(tree)
+        # move a right-hand talent to the front, then promote at the leaves
+        tree.add_task("Moving task", "Talent5")
+        TestHelpers().promote_talent_node(tree, "Talent7", 1)
+
+        for rank in tree.rank_levels:
+            self.assertListEqual(tree._get_talent_node_list_at_rank(rank), tree._scan_talent_node_list_at_rank(rank), f"The talents at rank {rank} should match the tree from left to right.")
+        self.assertEqual(tree._get_talent_node_list_at_rank(1)[0].name, "Talent7", "The promoted talent should be the left-most talent at its new rank.")
+
+        del tree
+
     def test_time(self):
         tree = TTree()
         self.assertEqual(tree.time, 0, "The time should be 0 upon initialization.")
@@ -59,7 +93,7 @@ class TestTTree(unittest.TestCase):
     def test_promote_talent_in_robust_balanced_tree(self):
         tree = TTree()
         final_node_name = TestHelpers().build_robust_balanced_tree(tree)
-        self.assertListEqual(tree.lost_talents, [], "There should be no lost talents.")
+        self.assertListEqual(list(tree.lost_talents), [], "There should be no lost talents.")
         self.assertEqual(tree._count_total_talents(tree.head), 7, "There should be 7 starting talents in the tree.")
         # add one more task to promote the talent
         tree.add_task("Promotional task", final_node_name)
@@ -81,7 +115,7 @@ class TestTTree(unittest.TestCase):
     def test_promote_talent_in_gapped_balanced_tree(self):
         tree = TTree()
         final_node_name = TestHelpers().build_gapped_balanced_tree(tree)
-        self.assertListEqual(tree.lost_talents, [], "There should be no lost talents.")
+        self.assertListEqual(list(tree.lost_talents), [], "There should be no lost talents.")
         self.assertEqual(tree._count_total_talents(tree.head), 7, "There should be 7 starting talents in the tree.")
         # promote the talent
         TestHelpers().promote_talent_node(tree, final_node_name, 1)
@@ -132,5 +166,217 @@ class TestTTree(unittest.TestCase):
 
         del tree
 
+    def test_bonds_stay_consistent(self):
+        """
+        Test to see if every talent keeps a single parent that points back at it
+        through a long run of moves, promotions and losses.
+        """
+        tree = TTree()
+        randomizer = random.Random(39)
+        talents = [f"Talent{i}" for i in range(5)]
+        for _ in range(300):
+            talent_name = randomizer.choice(talents)
+            task_name = f"Task {randomizer.randint(0, 20)}"
+            if randomizer.random() < 0.7:
+                tree.add_task(task_name, talent_name)
+            else:
+                tree.access_task(task_name, talent_name)
+
+            seen = set()
+            for node in walk_pre_order(tree.head):
+                self.assertNotIn(node, seen, f"'{node.name}' should only be reachable from one parent.")
+                seen.add(node)
+                for child in (node.child_left, node.child_right):
+                    if child:
+                        self.assertIs(child.parent, node, f"'{child.name}' should point back at its parent.")
+            self.assertEqual(tree._count_total_talents(tree.head), tree.total_nodes, "Every talent in the tree should be counted once.")
+
+        del tree
+
+    def test_add_tasks_matches_add_task(self):
+        """
+        Test to see if adding a batch of tasks leaves the tree exactly where adding them one at a time does.
+        """
+        randomizer = random.Random(7)
+        tasks = []
+        while len(tasks) < 500:
+            talent_name = f"Talent{randomizer.randint(0, 12)}"
+            # tasks tend to come in runs for the same talent
+            for _ in range(randomizer.randint(1, 6)):
+                tasks.append((f"Task {randomizer.randint(0, 20)}", talent_name))
+
+        single_tree = TTree()
+        for task_name, talent_name in tasks:
+            single_tree.add_task(task_name, talent_name)
+        batch_tree = TTree()
+        batch_tree.add_tasks(iter(tasks))
+
+        self.assertEqual(batch_tree.time, single_tree.time, "Every task in the batch should burn time.")
+        self.assertEqual(batch_tree.total_nodes, single_tree.total_nodes, "Both trees should hold the same number of talents.")
+        self.assertListEqual(sorted(batch_tree.rank_levels), sorted(single_tree.rank_levels), "Both trees should have the same ranks.")
+        for rank in single_tree.rank_levels:
+            single_nodes = single_tree._get_talent_node_list_at_rank(rank)
+            batch_nodes = batch_tree._get_talent_node_list_at_rank(rank)
+            self.assertListEqual([node.name for node in batch_nodes], [node.name for node in single_nodes], f"Both trees should hold the same talents at rank {rank}.")
+            self.assertListEqual([node.last_access for node in batch_nodes], [node.last_access for node in single_nodes], f"The talents at rank {rank} should have been accessed at the same times.")
+        self.assertListEqual([node.name for node in batch_tree.lost_talents], [node.name for node in single_tree.lost_talents], "Both trees should have lost the same talents.")
+
+        del single_tree, batch_tree
+
+    def test_add_tasks_finds_talent_once_per_run(self):
+        """
+        Test to see if a run of tasks for the same talent only looks the talent up once.
+        """
+        tree = TTree()
+        find_talent_node = tree._find_talent_node
+        looked_up = []
+        def counting_find_talent_node(talent_name, root_node=None):
+            looked_up.append(talent_name)
+            return find_talent_node(talent_name, root_node)
+        tree._find_talent_node = counting_find_talent_node
+
+        tree.add_tasks([("Read", "TalentA"), ("Write", "TalentA"), ("Draw", "TalentB"), ("Sing", "TalentB"), ("Read", "TalentA")])
+
+        self.assertListEqual(looked_up, ["TalentA", "TalentB", "TalentA"], "Each run should look its talent up once.")
+        self.assertEqual(tree.time, 5, "Every task in the batch should burn time.")
+
+        del tree
+
+    def test_access_tasks_matches_access_task(self):
+        """
+        Test to see if accessing a batch of tasks finds the same tasks and leaves the tree
+        exactly where accessing them one at a time does.
+        """
+        trees = [TTree(), TTree()]
+        for tree in trees:
+            tree.add_tasks([("Read", "TalentA"), ("Write", "TalentB"), ("Draw", "TalentC"), ("Sing", "TalentB")])
+        tasks = [("Read", "TalentA"), ("Read", "TalentA"), ("Dance", "TalentA"),
+                 ("Write", "TalentB"), ("Read", "TalentD"), ("Draw", "TalentC")]
+
+        single_tree, batch_tree = trees
+        single_results = [single_tree.access_task(task_name, talent_name) for task_name, talent_name in tasks]
+        batch_results = batch_tree.access_tasks(tasks)
+
+        self.assertListEqual(batch_results, single_results, "Both ways should find the same tasks.")
+        self.assertIn(True, batch_results, "Some of the tasks should have been found.")
+        self.assertIn(False, batch_results, "Some of the tasks should have been missed.")
+        self.assertEqual(batch_tree.time, single_tree.time, "Every access should burn time, found or not.")
+        for rank in single_tree.rank_levels:
+            self.assertListEqual([node.name for node in batch_tree._get_talent_node_list_at_rank(rank)], [node.name for node in single_tree._get_talent_node_list_at_rank(rank)], f"Both trees should hold the same talents at rank {rank}.")
+
+        del trees
+
+    def test_shift_across_deep_levels(self):
+        """
+        Test to see if a shift can reach nodes whose parents only share a distant ancestor.
+        """
+        tree = TTree()
+        randomizer = random.Random(1)
+        while tree._count_total_talents(tree.head) < 15:
+            talent_name = f"Talent{randomizer.randint(0, 500)}"
+            for _ in range(randomizer.randint(1, 8)):
+                tree.add_task(f"Task {randomizer.randint(0, 50)}", talent_name)
+        # the tree is now 3 talents deep below the head, so a new talent
+        # has to shift across parents that only share the head
+        tree.add_task("Some new task", "NewTalent")
+
+        for rank in tree.rank_levels:
+            self.assertListEqual(tree._get_talent_node_list_at_rank(rank), tree._scan_talent_node_list_at_rank(rank), f"The talents at rank {rank} should match the tree from left to right.")
+        self.assertEqual(tree._get_talent_node_list_at_rank(0)[0].name, "NewTalent", "The new talent should be the left-most leaf.")
+        self.assertEqual(tree._count_total_talents(tree.head), tree.total_nodes, "Every talent in the tree should be counted once.")
+
+        del tree
+
+    def test_right_sibling_across_subtrees(self):
+        """
+        Test to see if the right sibling of a node is found whoever its parent is,
+        even when the two only share a distant ancestor.
+        """
+        tree = TTree()
+        randomizer = random.Random(1)
+        while tree._count_total_talents(tree.head) < 15:
+            talent_name = f"Talent{randomizer.randint(0, 500)}"
+            for _ in range(randomizer.randint(1, 8)):
+                tree.add_task(f"Task {randomizer.randint(0, 50)}", talent_name)
+
+        # the sibling lookup is private, it's only ever used to walk a depth during a shift
+        get_right_sibling = tree._TTree__get_right_sibling
+        for rank, level in tree.rank_levels.items():
+            siblings = [get_right_sibling(node) for node in level]
+            self.assertListEqual(siblings, level[1:] + [None], f"Every talent at rank {rank} should find the next one to its right.")
+
+        del tree
+
+    def test_kill_tree_with_lost_talents(self):
+        tree = TTree()
+        TestHelpers().build_robust_balanced_tree(tree)
+        tree.add_task("Promotional task", "Talent4")
+        self.assertGreater(len(tree.lost_talents), 0, "The promotion should have lost some talents.")
+
+        tree.die()
+
+        self.assertEqual(tree.total_nodes, 0, "The tree should have only the god node after dying.")
+        self.assertListEqual(list(tree.lost_talents), [], "Lost talents should die with the tree.")
+        self.assertIsNone(tree.head.child_left, "The head should have no children left.")
+        self.assertIsNone(tree.head.child_right, "The head should have no children left.")
+
+        del tree
+
+    def test_kill_subtree(self):
+        tree = TTree()
+        TestHelpers().build_robust_balanced_tree(tree)
+        time = tree.time
+
+        # the left subtree leaves a hole the right one has to shift into
+        tree.die(tree.talent_map["Talent2"])
+
+        self.assertListEqual(sorted(tree.talent_map), ["Talent1", "Talent3", "Talent6", "Talent7"], "Only the subtree should be forgotten.")
+        for rank in tree.rank_levels:
+            self.assertListEqual(tree._get_talent_node_list_at_rank(rank), tree._scan_talent_node_list_at_rank(rank), f"The talents at rank {rank} should match the tree from left to right.")
+        self.assertEqual(tree.head.child_left.child_left.name, "Talent3", "The survivors should be packed to the left.")
+        for talent_name in tree.talent_map:
+            self.assertIs(tree._find_talent_node(talent_name, tree.head.child_left), tree.talent_map[talent_name], f"{talent_name} should still be in the tree.")
+        self.assertEqual(tree.total_nodes, tree._count_total_talents(tree.head), "The survivors should still be counted.")
+        self.assertEqual(tree.stats()['talents'], tree._count_total_talents(tree.head), "The stats should count the survivors.")
+        self.assertDictEqual(tree.stats()['talents_per_rank'], {2: 1, 1: 1, 0: 2}, "Every rank should only hold the survivors.")
+        self.assertEqual(tree.time, time, "Time shouldn't be turned back for the survivors.")
+
+        tree.add_task("Another task", "Talent1")
+        self.assertEqual(tree.total_nodes, 4, "A survivor shouldn't be made again.")
+        dying_names = {node.name for node in walk_pre_order(tree.talent_map["Talent3"])}
+        survivor_names = sorted(set(tree.talent_map) - dying_names)
+        tree.die(tree.talent_map["Talent3"])
+        self.assertListEqual(sorted(tree.talent_map), survivor_names, "A survivor should be able to die too.")
+        self.assertEqual(tree.stats()['talents'], tree._count_total_talents(tree.head), "The stats should count what's left.")
+
+        del tree
+
+    def test_stats_match_a_walk(self):
+        for task_store_type in (None, TaskHeap):
+            tree = TTree(task_store_type)
+            TestHelpers().add_mixed_tasks(tree, 0, 150, total_talents=4)
+            for i in range(40):
+                tree.add_task(f"Task {i % 6}", ["TalentA", "TalentB"][i % 2])
+            for i in range(6):
+                tree.add_task(f"Job {i}", "TalentC")
+            stats = tree.stats()
+
+            talent_nodes = [node for node in walk_pre_order(tree.head) if node is not tree.head]
+            talents_per_rank = {}
+            for node in talent_nodes:
+                talents_per_rank[node.rank] = talents_per_rank.get(node.rank, 0) + 1
+            tasks = sum(len(node.task_store) if node.task_store is not None else len(list(walk_pre_order(node.task_head))) for node in talent_nodes)
+
+            self.assertEqual(stats['talents'], len(talent_nodes), "Every talent in the tree should be counted.")
+            self.assertDictEqual(stats['talents_per_rank'], talents_per_rank, "Every rank should have its own population.")
+            self.assertEqual(stats['burnt_out'], sum(node.is_burnout for node in talent_nodes), "Only burnt out talents in the tree should be counted.")
+            self.assertGreater(stats['burnt_out'], 0, "A run of tasks should burn a talent out.")
+            self.assertEqual(stats['tasks'], tasks, f"Every converted task should be counted, with {task_store_type}.")
+            self.assertEqual(stats['lost_talents'], len(tree.lost_talents), "The lost talents should be counted.")
+
+            tree.die()
+            stats = tree.stats()
+            self.assertEqual((stats['talents'], stats['burnt_out'], stats['tasks'], stats['talents_per_rank']), (0, 0, 0, {}), "Nothing should be left after dying.")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
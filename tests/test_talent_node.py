@@ -49,6 +49,91 @@ class TestTalentNode(unittest.TestCase):
         self.assertEqual(node.recent_task_map, {}, "The Talent Node should have an empty recent task map waiting too long between tasks (most recent add time - last add time is >= 2 x the amount of talent nodes).")
         del tree
         
+    def test_task_node_map_follows_heap(self):
+        """
+        Tests to see if the task node map still points at the right task nodes
+        after tasks are converted to nodes and accessed tasks are promoted to the head.
+        """
+        tree = TTree()
+        talents = ["TalentA", "TalentB"] * 5
+        for i in range(len(talents)):
+            tree.add_task(f"Task {i}", talents[i])
+        node = tree._find_talent_node("TalentA", tree.head)
+        self.assertTrue(tree.access_task("Task 2", "TalentA"), "A task converted to a node should be found.")
+        self.assertEqual(node.task_head.task_name, "Task 2", "The accessed task should be promoted to the head.")
+
+        # walk every task node and check the map agrees with it
+        task_nodes = [node.task_head]
+        while task_nodes:
+            task_node = task_nodes.pop()
+            if task_node is None:
+                continue
+            self.assertIs(node.task_node_map[task_node.task_name], task_node, f"'{task_node.task_name}' should map to the node holding it.")
+            task_nodes.extend([task_node.child_left, task_node.child_right])
+        self.assertFalse(tree.access_task("Task 1", "TalentA"), "A task from another talent should not be found.")
+        del tree
+
+    def test_long_burnout(self):
+        """
+        Tests to see if a talent that stays burnt out can keep adding tasks
+        well past the recursion limit, always at the bottom of the right side.
+        """
+        tree = TTree()
+        for i in range(5000):
+            tree.add_task(f"Task {i}", "TalentA")
+        node = tree._find_talent_node("TalentA", tree.head)
+        self.assertIs(node.is_burnout, True, "Adding tasks without a break should burn the talent out.")
+        self.assertEqual(node.task_tail.task_name, "Task 4999", "The last task added should be at the tail.")
+
+        task_node = node.task_head
+        while task_node.child_right:
+            task_node = task_node.child_right
+        self.assertIs(task_node, node.task_tail, "The tail should be the right-most Task Node.")
+        del tree
+
+    def test_balanced_insertions(self):
+        """
+        Tests to see if tasks converted over several rank ups fill the Task Node
+        tree top to bottom, left to right, with every task attached exactly once.
+        """
+        tree = TTree()
+        talents = ["TalentA", "TalentB"] * 60
+        for i in range(len(talents)):
+            tree.add_task(f"Task {i}", talents[i])
+        node = tree._find_talent_node("TalentA", tree.head)
+        self.assertIs(node.is_burnout, False, "Spacing out tasks should not burn the talent out.")
+
+        # walk the tree in level order, there should be no gaps before the last node
+        task_nodes = [node.task_head]
+        for task_node in task_nodes:
+            if task_node.child_right:
+                self.assertIsNotNone(task_node.child_left, "The left position should fill before the right.")
+            for child in (task_node.child_left, task_node.child_right):
+                if child:
+                    self.assertIs(child.parent, task_node, "Every Task Node should be attached to one parent.")
+                    task_nodes.append(child)
+        self.assertEqual(len(task_nodes), len(node.task_node_map), "Every converted task should be in the tree once.")
+        del tree
+
+    def test_compact_talent_node(self):
+        """
+        Tests to see if Talent Nodes stay compact, only making their maps when they need them.
+        """
+        tree = TTree()
+        tree.add_task("Some long task", "TalentA")
+        node = tree._find_talent_node("TalentA", tree.head)
+        self.assertFalse(hasattr(node, "__dict__"), "Talent Nodes should only have slots.")
+        self.assertIsNone(node._task_node_map, "The task node map should wait until a task is converted.")
+        self.assertIsNone(node.task_frontier, "The task frontier should wait until a task is converted.")
+
+        built_size = TestHelpers().get_tree_memory_size(tree.head)
+        for task in ["Some short task", "Some medium task", "Workbook", "Trying it again"]:
+            tree.add_task(task, "TalentA")
+        self.assertIsNone(node._recent_task_map, "The recent task map should be let go after its tasks are converted.")
+        self.assertIsNotNone(node.task_head, "The tasks should have been converted to Task Nodes.")
+        self.assertGreater(TestHelpers().get_tree_memory_size(tree.head), built_size, "Task Nodes should be counted in the size of the tree.")
+        del tree
+
     def test_time_function_retrieval(self):
         pass
 if __name__ == '__main__':
@@ -0,0 +1,77 @@
+import unittest
+from unittest import mock
+from structs import TTree, TaskColumns
+from structs import task_columns
+
+@unittest.skipUnless(task_columns.np is not None, "TaskColumns needs numpy")
+class TestTaskColumns(unittest.TestCase):
+    def test_columns_grow(self):
+        columns = TaskColumns(capacity=2)
+        for time, task in enumerate(["Read", "Write", "Draw", "Sing", "Dance"]):
+            columns.push(task, time, time == 3, access_time=time + 10)
+
+        self.assertEqual(len(columns), 5, "The columns should grow to fit every task.")
+        self.assertGreaterEqual(len(columns.access_times), 5, "Every column should have room for every row.")
+        self.assertEqual(len(columns.creation_times), len(columns.burnt_flags), "Every column should grow together.")
+        self.assertListEqual(columns.dump_tasks()[3:], [("Sing", 3, 13, True), ("Dance", 4, 14, False)], "Rows should keep their columns lined up after growing.")
+
+    def test_heap_order_is_worked_out_when_needed(self):
+        columns = TaskColumns()
+        for time, task in enumerate(["Read", "Write", "Draw"]):
+            columns.push(task, time, False)
+
+        order = columns.heap_order()
+        self.assertIs(columns.heap_order(), order, "The order should only be worked out again after a change.")
+        columns.recall("Read", 10)
+        self.assertIsNone(columns.order, "A recall should leave the order to be worked out again.")
+        self.assertListEqual([columns.task_names[row] for row in columns.heap_order()], ["Read", "Draw", "Write"], "The recalled task should be first.")
+
+    def test_recall_many(self):
+        columns = TaskColumns()
+        for time, task in enumerate(["Read", "Write", "Draw", "Sing"]):
+            columns.push(task, time, time % 2 == 1)
+
+        found = columns.recall_many(["Write", "Dance", "Draw", "Write"], [8, 9, 6, 7])
+        self.assertListEqual(found, [True, False, True, True], "Only tasks that were added should be found.")
+        self.assertEqual(columns.peek(), "Write", "A task recalled more than once should keep its latest access.")
+        self.assertListEqual([columns.task_names[row] for row in columns.heap_order()], ["Write", "Draw", "Read", "Sing"], "Burnt tasks should come after every task that isn't burnt.")
+
+    def test_recall_many_matches_recall(self):
+        single_columns = TaskColumns()
+        batch_columns = TaskColumns()
+        for columns in (single_columns, batch_columns):
+            for time, task in enumerate(["Read", "Write", "Draw", "Sing", "Dance"]):
+                columns.push(task, time, time % 3 == 0)
+
+        task_names = ["Sing", "Read", "Paint", "Read", "Draw"]
+        access_times = [10, 11, 12, 13, 14]
+        single_found = [single_columns.recall(task_name, access_time) for task_name, access_time in zip(task_names, access_times)]
+        batch_found = batch_columns.recall_many(task_names, access_times)
+
+        self.assertListEqual(batch_found, single_found, "Both ways should find the same tasks.")
+        self.assertListEqual(batch_columns.dump_tasks(), single_columns.dump_tasks(), "Both ways should leave the same rows.")
+        self.assertListEqual(batch_columns.heap_order().tolist(), single_columns.heap_order().tolist(), "Both ways should leave the same order.")
+
+    def test_tree_recalls_runs_at_once(self):
+        trees = [TTree(task_store_type=TaskColumns), TTree(task_store_type=TaskColumns)]
+        for tree in trees:
+            for i in range(12):
+                tree.add_task(f"Task {i}", ["TalentA", "TalentB"][i % 2])
+        # the last task of each talent is still in its recent task map, the rest are in the task store
+        tasks = [("Task 0", "TalentA"), ("Task 10", "TalentA"), ("Task 2", "TalentA"), ("Task 5", "TalentA"), ("Task 1", "TalentB"), ("Task 4", "TalentA")]
+
+        single_tree, batch_tree = trees
+        single_results = [single_tree.access_task(task_name, talent_name) for task_name, talent_name in tasks]
+        with mock.patch.object(TaskColumns, 'recall_many', autospec=True, side_effect=TaskColumns.recall_many) as recall_many:
+            batch_results = batch_tree.access_tasks(tasks)
+
+        self.assertListEqual(batch_results, single_results, "Both ways should find the same tasks.")
+        self.assertEqual(recall_many.call_count, 3, "Each run should go to the task store once.")
+        self.assertListEqual(recall_many.call_args_list[0].args[1], ["Task 0", "Task 2", "Task 5"], "The whole run should be recalled together, leaving out tasks found in the recent task map.")
+        for name, talent_node in single_tree.talent_map.items():
+            batch_store = batch_tree.talent_map[name].task_store
+            self.assertListEqual(batch_store.dump_tasks(), talent_node.task_store.dump_tasks(), f"'{name}' should hold the same tasks.")
+            self.assertEqual(batch_store.peek(), talent_node.task_store.peek(), f"'{name}' should have the same task at the head.")
+
+if __name__ == '__main__':
+    unittest.main()
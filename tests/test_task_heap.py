@@ -0,0 +1,66 @@
+import unittest
+from structs import TTree, TaskHeap
+
+class TestTaskHeap(unittest.TestCase):
+    def test_recall_moves_task_to_head(self):
+        heap = TaskHeap()
+        for time, task in enumerate(["Read", "Write", "Draw", "Sing"]):
+            heap.push(task, time, False)
+        self.assertEqual(heap.peek(), "Sing", "The most recently added task should be at the head.")
+
+        self.assertTrue(heap.recall("Read", 10), "A task in the heap should be found.")
+        self.assertEqual(heap.peek(), "Read", "The recalled task should be at the head.")
+        self.assertFalse(heap.recall("Dance", 11), "A task that was never added should not be found.")
+        for index in range(1, len(heap.task_names)):
+            self.assertGreaterEqual(heap.access_times[(index - 1) // 2], heap.access_times[index], "Every parent should be accessed more recently than its children.")
+            self.assertEqual(heap.heap_positions[heap.task_names[index]], index, "The positions map should follow the tasks around.")
+
+    def test_burnt_tasks_stay_at_the_end(self):
+        heap = TaskHeap()
+        heap.push("Read", 0, False)
+        heap.push("Write", 1, True)
+        heap.push("Draw", 2, True)
+        heap.push("Sing", 3, False)
+
+        head = heap.to_task_nodes()
+        self.assertEqual(head.task_name, "Sing", "The head should be the most recent task that isn't burnt.")
+        self.assertEqual(head.child_right.task_name, "Write", "Burnt tasks should hang off of the right-most task.")
+        self.assertEqual(head.child_right.child_right.task_name, "Draw", "Burnt tasks should stay in the order they were added.")
+        self.assertTrue(head.child_right.is_burnt, "Burnt tasks should stay burnt in the view.")
+
+        self.assertTrue(heap.recall("Write", 4), "A burnt task should still be found.")
+        self.assertEqual(heap.peek(), "Write", "A recalled burnt task should move to the head of the heap.")
+        self.assertEqual(len(heap), 4, "Recalling a burnt task should not change how many tasks there are.")
+        self.assertNotIn("Write", heap.burnt_task_names, "The recalled task should leave the burnt segment.")
+
+    def test_tree_access_tasks_with_task_heap(self):
+        trees = [TTree(task_store_type=TaskHeap), TTree(task_store_type=TaskHeap)]
+        for tree in trees:
+            for i in range(12):
+                tree.add_task(f"Task {i}", ["TalentA", "TalentB"][i % 2])
+        tasks = [("Task 0", "TalentA"), ("Task 10", "TalentA"), ("Task 7", "TalentA"), ("Task 1", "TalentB"), ("Task 4", "TalentA")]
+
+        single_tree, batch_tree = trees
+        single_results = [single_tree.access_task(task_name, talent_name) for task_name, talent_name in tasks]
+        self.assertListEqual(batch_tree.access_tasks(tasks), single_results, "Both ways should find the same tasks.")
+        for name, talent_node in single_tree.talent_map.items():
+            self.assertListEqual(batch_tree.talent_map[name].task_store.task_names, talent_node.task_store.task_names, f"'{name}' should have its heap in the same order.")
+
+    def test_tree_with_task_heap(self):
+        tree = TTree(task_store_type=TaskHeap)
+        talents = ["TalentA", "TalentB"] * 5
+        for i in range(len(talents)):
+            tree.add_task(f"Task {i}", talents[i])
+        node = tree._find_talent_node("TalentA", tree.head)
+
+        self.assertIsNone(node.task_head, "Tasks should go to the task store instead of Task Nodes.")
+        self.assertEqual(len(node.task_store), 5, "All of the recent tasks should be converted into the task store.")
+        self.assertTrue(tree.access_task("Task 2", "TalentA"), "A task in the task store should be found.")
+        self.assertEqual(node.task_store.peek(), "Task 2", "The accessed task should be at the head of the heap.")
+
+        tree.die()
+        self.assertEqual(len(node.task_store), 0, "The task store should be emptied when the tree dies.")
+        del tree
+
+if __name__ == '__main__':
+    unittest.main()
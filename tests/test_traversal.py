@@ -0,0 +1,31 @@
+import sys
+import unittest
+from structs.task_node import TaskNode, link_task_nodes
+from structs.traversal import walk_pre_order, walk_post_order, count_nodes, find_node
+
+class TestTraversal(unittest.TestCase):
+    def test_walk_orders(self):
+        # a complete tree of 7 nodes, named by their heap index
+        head = link_task_nodes([TaskNode(str(i), i, False) for i in range(7)], [])
+
+        self.assertListEqual([node.task_name for node in walk_pre_order(head)], ["0", "1", "3", "4", "2", "5", "6"], "Pre order should go parent, left, right.")
+        self.assertListEqual([node.task_name for node in walk_post_order(head)], ["3", "4", "1", "5", "6", "2", "0"], "Post order should go left, right, parent.")
+        self.assertEqual(count_nodes(head), 7, "Every node should be counted.")
+        self.assertEqual(find_node(head, lambda node: node.task_name == "5").task_name, "5", "A node on the right side should be found.")
+        self.assertIsNone(find_node(head, lambda node: node.task_name == "7"), "A missing node should not be found.")
+        self.assertListEqual(list(walk_pre_order(None)), [], "There is nothing to walk without a root.")
+        self.assertEqual(count_nodes(None), 0, "There is nothing to count without a root.")
+
+    def test_deep_spine(self):
+        """
+        Test to see if a burnt out spine deeper than the recursion limit can be walked.
+        """
+        depth = sys.getrecursionlimit() * 2
+        head = link_task_nodes([], [TaskNode(str(i), i, True) for i in range(depth)])
+
+        self.assertEqual(count_nodes(head), depth, "Every node down the spine should be counted.")
+        self.assertEqual(find_node(head, lambda node: node.task_name == str(depth - 1)).creation_time, depth - 1, "The bottom of the spine should be found.")
+        self.assertEqual(walk_post_order(head)[0].task_name, str(depth - 1), "The bottom of the spine should come first in post order.")
+
+if __name__ == '__main__':
+    unittest.main()
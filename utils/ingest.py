@@ -0,0 +1,130 @@
+import csv
+import json
+import sys
+import time
+from itertools import groupby, islice
+from operator import itemgetter
+
+# event actions and the names they go by in logs
+ADD = 'add'
+ACCESS = 'access'
+ACTIONS = {
+    'add': ADD,
+    'add_task': ADD,
+    'access': ACCESS,
+    'access_task': ACCESS,
+}
+
+def read_jsonl_events(lines):
+    """
+    Reads events from JSON lines, one object per line like:
+    {"action": "add", "task_name": "Read", "talent_name": "Literacy"}
+    Blank lines are skipped. Nothing is read ahead, so memory stays flat.
+    @param lines: iterable of lines, like an open file
+    @return generator of (action, task_name, talent_name) events
+    """
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+            yield (_get_action(event['action']), event['task_name'], event['talent_name'])
+        except (ValueError, KeyError, TypeError) as error:
+            raise ValueError(f"Line {line_number} is not a valid event: {error}") from error
+
+def read_csv_events(lines):
+    """
+    Reads events from CSV rows of action, task_name, talent_name.
+    A header row is skipped if there is one.
+    @param lines: iterable of lines, like an open file
+    @return generator of (action, task_name, talent_name) events
+    """
+    for line_number, row in enumerate(csv.reader(lines), 1):
+        if not row:
+            continue
+        if line_number == 1 and row[0] == 'action':
+            continue
+        try:
+            action, task_name, talent_name = row
+            yield (_get_action(action), task_name, talent_name)
+        except ValueError as error:
+            raise ValueError(f"Line {line_number} is not a valid event: {error}") from error
+
+def read_events(path: str, event_format: str = None):
+    """
+    Reads events from a file, or from stdin if the path is '-'.
+    The file is read a line at a time, however big it is.
+    @param path: path to the file, or '-' for stdin
+    @param event_format: 'jsonl' or 'csv', guessed from the file extension if not given
+    @return generator of (action, task_name, talent_name) events
+    """
+    if event_format is None:
+        event_format = 'csv' if path.endswith('.csv') else 'jsonl'
+    if event_format not in ('jsonl', 'csv'):
+        raise ValueError(f"Unknown event format '{event_format}', expected 'jsonl' or 'csv'.")
+    reader = read_csv_events if event_format == 'csv' else read_jsonl_events
+
+    if path == '-':
+        yield from reader(sys.stdin)
+        return
+
+    with open(path, newline='', encoding='utf-8') as file:
+        yield from reader(file)
+
+def ingest_events(tree, events, chunk_size: int = 10000, report=None) -> dict:
+    """
+    Applies events to a tree in order, a chunk at a time. Within a chunk, every run
+    of the same action is handed to add_tasks or access_tasks in one go.
+    Only one chunk is held in memory at a time.
+    @param tree: the tree to apply the events to, a TTree or ArrayTTree
+    @param events: iterable of (action, task_name, talent_name) events
+    @param chunk_size: the number of events to pull in at a time
+    @param report: optional function called with the running totals after every chunk
+    @return totals of events, adds, accesses, tasks found, seconds and events per second
+    """
+    totals = {'events': 0, 'adds': 0, 'accesses': 0, 'found': 0, 'seconds': 0.0, 'events_per_second': 0.0}
+    events = iter(events)
+    start = time.perf_counter()
+
+    while True:
+        chunk = list(islice(events, chunk_size))
+        if not chunk:
+            break
+
+        for action, run in groupby(chunk, key=itemgetter(0)):
+            tasks = [(task_name, talent_name) for _, task_name, talent_name in run]
+            if action == ADD:
+                tree.add_tasks(tasks)
+                totals['adds'] += len(tasks)
+            else:
+                totals['found'] += sum(tree.access_tasks(tasks))
+                totals['accesses'] += len(tasks)
+
+        totals['events'] += len(chunk)
+        _update_rate(totals, start)
+        if report:
+            report(totals)
+
+    _update_rate(totals, start)
+    return totals
+
+def _get_action(action: str) -> str:
+    """
+    Gets the action an event name stands for.
+    @param action: name of the action in the log
+    @return ADD or ACCESS
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown action '{action}'")
+    return ACTIONS[action]
+
+def _update_rate(totals: dict, start: float) -> None:
+    """
+    Updates the time spent and the events per second so far.
+    @param totals: running totals to update
+    @param start: time the ingestion started, from time.perf_counter
+    """
+    totals['seconds'] = time.perf_counter() - start
+    if totals['seconds'] > 0:
+        totals['events_per_second'] = totals['events'] / totals['seconds']
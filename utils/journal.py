@@ -0,0 +1,223 @@
+import json
+import os
+from json.encoder import encode_basestring_ascii
+from itertools import groupby, islice
+from operator import itemgetter
+from structs import TTree
+from structs.lost_talents import OLDEST
+from utils.snapshot import save_snapshot, load_snapshot, read_journal_position
+
+# journal entries are JSON arrays, one per line:
+#   [position, time, "add", task_name, talent_name]
+#   [position, time, "access", task_name, talent_name]
+#   [position, time, "die", talent_name]
+# the position counts every entry ever written, so it keeps going across checkpoints
+# and tells replay which entries a snapshot already has. the time is the tree's time
+# when the call was made, used to check the journal really follows the tree
+ADD = 'add'
+ACCESS = 'access'
+DIE = 'die'
+
+class Journal:
+    """
+    Append-only write-ahead journal for a T Tree. Set it as the tree's journal
+    and every add_task, access_task and die is written here before it happens.
+    Entries are buffered and written and fsynced in groups, so a crash can lose
+    at most the last group. Use recover() to get the tree back and checkpoint()
+    to save a snapshot and start the journal over.
+    @param path: where to keep the journal, it's appended to if it's already there
+    @param position: position of the next entry
+    @param sync_every: number of entries to buffer before they're written and fsynced
+    """
+    def __init__(self, path: str, position: int = 0, sync_every: int = 1000):
+        self.path = path
+        self.position = position
+        self.sync_every = sync_every
+        self.buffer = []
+        self.file = open(path, 'ab')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # Public functions
+    def add_task(self, time: int, task_name: str, talent_name: str) -> None:
+        """
+        Records an add_task call.
+        @param time: time of the tree when it was called
+        @param task_name: name of the task
+        @param talent_name: name of the talent
+        """
+        self.__record(f'[{self.position},{time},"{ADD}",{encode_basestring_ascii(task_name)},{encode_basestring_ascii(talent_name)}]\n')
+
+    def access_task(self, time: int, task_name: str, talent_name: str) -> None:
+        """
+        Records an access_task call.
+        @param time: time of the tree when it was called
+        @param task_name: name of the task
+        @param talent_name: name of the talent
+        """
+        self.__record(f'[{self.position},{time},"{ACCESS}",{encode_basestring_ascii(task_name)},{encode_basestring_ascii(talent_name)}]\n')
+
+    def die(self, time: int, talent_name: str = None) -> None:
+        """
+        Records a die call.
+        @param time: time of the tree when it was called
+        @param talent_name: name of the talent it was called on, None for the whole tree
+        """
+        self.__record(f'[{self.position},{time},"{DIE}",{json.dumps(talent_name)}]\n')
+
+    def flush(self) -> None:
+        """
+        Writes and fsyncs every buffered entry.
+        """
+        if self.buffer:
+            self.file.write(''.join(self.buffer).encode('utf-8'))
+            self.buffer.clear()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def truncate(self) -> None:
+        """
+        Empties the journal, once a snapshot holds everything in it.
+        Positions carry on from where they were.
+        """
+        self.buffer.clear()
+        self.file.truncate(0)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        """
+        Writes anything left in the buffer and closes the journal.
+        """
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+    # Private functions
+    def __record(self, line: str) -> None:
+        """
+        Buffers an entry, writing out the group once it's full.
+        @param line: the entry, as a line of JSON
+        """
+        self.buffer.append(line)
+        self.position += 1
+        if len(self.buffer) >= self.sync_every:
+            self.flush()
+
+def replay_journal(tree: TTree, path: str, position: int = 0, chunk_size: int = 10000) -> tuple:
+    """
+    Applies the entries of a journal to a tree, starting at a position.
+    Entries before it are skipped, they're already in the tree.
+    Runs of adds and accesses are handed to add_tasks and access_tasks in one go.
+    A last line that was cut off by a crash is ignored.
+    @param tree: the tree to apply the entries to
+    @param path: where the journal is
+    @param position: position of the first entry that isn't in the tree yet
+    @param chunk_size: the number of entries to pull in at a time
+    @return the position after the last entry applied, and the length of the journal up to the end of it
+    """
+    # the tree would journal the replay over again
+    journal = tree.journal
+    tree.journal = None
+    try:
+        length = 0
+        with open(path, 'rb') as file:
+            for chunk, chunk_length in _read_chunks(file, chunk_size):
+                length += chunk_length
+                if chunk[0][0] < position:
+                    chunk = [entry for entry in chunk if entry[0] >= position]
+                for action, run in groupby(chunk, key=itemgetter(2)):
+                    run = list(run)
+                    if run[0][0] != position:
+                        raise ValueError(f"Journal entry {run[0][0]} doesn't follow entry {position - 1}.")
+                    if run[0][1] != tree.time:
+                        raise ValueError(f"Journal entry {run[0][0]} was made at time {run[0][1]}, but the tree is at time {tree.time}.")
+                    _apply_run(tree, action, run)
+                    position += len(run)
+    finally:
+        tree.journal = journal
+
+    return position, length
+
+def recover(snapshot_path: str, journal_path: str, task_store_type: type = None, sync_every: int = 1000, lost_talents=None,
+            lost_talent_capacity: int = None, lost_talent_eviction: str = OLDEST) -> TTree:
+    """
+    Gets a tree back after a restart or a crash: loads the last snapshot,
+    replays the journal on top of it, then keeps journaling to the same file.
+    Either file may be missing, a new tree is made if there's no snapshot.
+    @param snapshot_path: where the snapshot is saved, may be None
+    @param journal_path: where the journal is
+    @param task_store_type: task store for a new tree, a snapshot brings its own
+    @param sync_every: number of entries to buffer before they're written and fsynced
+    @param lost_talents: where to put the lost talents, like a LostTalentArchive. The tree's own if not given
+    @param lost_talent_capacity: most lost talents a new tree holds, a snapshot brings its own
+    @param lost_talent_eviction: which lost talent a new tree lets go of past the capacity, a snapshot brings its own
+    @return the recovered tree, with its journal set
+    """
+    if snapshot_path and os.path.exists(snapshot_path):
+        tree = load_snapshot(snapshot_path, lost_talents)
+        position = read_journal_position(snapshot_path)
+    else:
+        tree = TTree(task_store_type, lost_talent_capacity, lost_talent_eviction)
+        if lost_talents is not None:
+            tree.lost_talents = lost_talents
+        position = 0
+
+    if os.path.exists(journal_path):
+        position, length = replay_journal(tree, journal_path, position)
+        # drop a cut off last line, so new entries start on a line of their own
+        if os.path.getsize(journal_path) != length:
+            os.truncate(journal_path, length)
+
+    tree.journal = Journal(journal_path, position, sync_every)
+    return tree
+
+def checkpoint(tree: TTree, snapshot_path: str) -> None:
+    """
+    Saves a snapshot of a tree, then empties its journal.
+    If there's a crash in between, replay skips the entries the snapshot already has.
+    @param tree: the tree to save, with its journal set
+    @param snapshot_path: where to save the snapshot
+    """
+    tree.journal.flush()
+    save_snapshot(tree, snapshot_path)
+    tree.journal.truncate()
+
+def _read_chunks(file, chunk_size: int):
+    """
+    Reads the entries of a journal a chunk at a time, stopping at a last line that was cut off.
+    Each chunk is decoded as a single JSON array, which is a lot quicker than a line at a time.
+    @param file: the journal, opened in binary
+    @param chunk_size: the number of entries in a chunk
+    @return generator of (entries, length of the lines they were read from)
+    """
+    while True:
+        lines = list(islice(file, chunk_size))
+        # only the last line can be missing its newline
+        if lines and not lines[-1].endswith(b'\n'):
+            lines.pop()
+        if not lines:
+            return
+        yield json.loads(b'[' + b','.join(lines) + b']'), sum(map(len, lines))
+
+def _apply_run(tree: TTree, action: str, run: list) -> None:
+    """
+    Applies a run of entries with the same action to a tree.
+    @param tree: the tree to apply them to
+    @param action: ADD, ACCESS or DIE
+    @param run: the entries
+    """
+    if action == ADD:
+        tree.add_tasks([(entry[3], entry[4]) for entry in run])
+    elif action == ACCESS:
+        tree.access_tasks([(entry[3], entry[4]) for entry in run])
+    elif action == DIE:
+        for entry in run:
+            tree.die(tree.talent_map.get(entry[3]) if entry[3] is not None else None)
+    else:
+        raise ValueError(f"Unknown journal action '{action}'")
@@ -0,0 +1,129 @@
+import os
+import struct
+from structs import TalentNode
+from utils.snapshot import dump_talent, load_talent
+
+# each record is its length, where the last talent with the same name was written,
+# then the talent itself from dump_talent
+RECORD = struct.Struct('<IQ')
+# stands in for no earlier talent with the same name
+NO_RECORD = 0xFFFFFFFFFFFFFFFF
+
+class LostTalentArchive:
+    """
+    Keeps lost talents on disk instead of in memory. Set it as a tree's lost_talents
+    and every talent that's lost is written to the archive and let go of.
+    Only a map of each name to where it was last written is kept in memory,
+    every record points back to the one before it with the same name.
+    Talents are read back only when they're asked for, and their tasks only when they're touched.
+    @param path: where to keep the archive, anything already there is replaced
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'w+b')
+        # Map of talent names to the offset of the last one lost
+        self.offsets = {}
+        self.total_talents = 0
+        self.end = 0
+
+    def __len__(self) -> int:
+        return self.total_talents
+
+    def __contains__(self, talent_name: str) -> bool:
+        return talent_name in self.offsets
+
+    def __iter__(self):
+        """
+        Reads every lost talent back, in the order they were lost.
+        """
+        self.file.flush()
+        offset = 0
+        end = self.end
+        while offset < end:
+            length, _ = RECORD.unpack(os.pread(self.file.fileno(), RECORD.size, offset))
+            yield load_talent(os.pread(self.file.fileno(), length, offset + RECORD.size))
+            offset += RECORD.size + length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # Public functions
+    def append(self, talent_node: TalentNode) -> None:
+        """
+        Writes a lost talent and its tasks to the archive.
+        @param talent_node: the talent that was lost
+        """
+        data = dump_talent(talent_node)
+        self.file.seek(self.end)
+        self.file.write(RECORD.pack(len(data), self.offsets.get(talent_node.name, NO_RECORD)))
+        self.file.write(data)
+        self.offsets[talent_node.name] = self.end
+        self.end += RECORD.size + len(data)
+        self.total_talents += 1
+
+    def get(self, talent_name: str) -> TalentNode:
+        """
+        Reads back the last talent lost with a name.
+        @param talent_name: name of the talent
+        @return the talent, None if no talent with this name was lost
+        """
+        offset = self.offsets.get(talent_name)
+        if offset is None:
+            return None
+        return self.__read(offset)[0]
+
+    def get_all(self, talent_name: str) -> list:
+        """
+        Reads back every talent lost with a name, the last one lost first.
+        @param talent_name: name of the talent
+        @return list of talents
+        """
+        talent_nodes = []
+        offset = self.offsets.get(talent_name, NO_RECORD)
+        while offset != NO_RECORD:
+            talent_node, offset = self.__read(offset)
+            talent_nodes.append(talent_node)
+        return talent_nodes
+
+    def names(self):
+        """
+        @return the names of every lost talent
+        """
+        return self.offsets.keys()
+
+    def review(self, show_life: bool = False) -> None:
+        """
+        Forgets every lost talent. Their tasks are on disk, so there's nothing in memory to let go of
+        and nothing is read back to show.
+        @param show_life: not used, the tasks aren't read back
+        """
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        Forgets every lost talent.
+        """
+        self.file.truncate(0)
+        self.offsets.clear()
+        self.total_talents = 0
+        self.end = 0
+
+    def close(self) -> None:
+        """
+        Closes the archive. The file is left where it is.
+        """
+        self.file.close()
+
+    # Private functions
+    def __read(self, offset: int) -> tuple:
+        """
+        Reads a talent back from the archive.
+        @param offset: where its record starts
+        @return the talent, and the offset of the last talent lost before it with the same name
+        """
+        self.file.flush()
+        length, previous_offset = RECORD.unpack(os.pread(self.file.fileno(), RECORD.size, offset))
+        return load_talent(os.pread(self.file.fileno(), length, offset + RECORD.size)), previous_offset
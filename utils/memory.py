@@ -0,0 +1,67 @@
+from sys import getsizeof
+
+def get_tree_memory_size(node) -> int:
+    """
+    Gets the memory size of a Talent Node and everything below it: Talent Nodes,
+    Task Nodes or task stores, and the maps and queues they keep along the way.
+    Walks with a stack, so deep trees and long burnt out spines are fine.
+    Strings are shared with the caller, so they aren't counted.
+    @param node: the node to start from, usually the head of a tree
+    @return the memory size in bytes
+    """
+    size = 0
+    talent_nodes = [node]
+    while talent_nodes:
+        talent_node = talent_nodes.pop()
+        if talent_node is None:
+            continue
+
+        size += get_object_memory_size(talent_node)
+        size += get_task_memory_size(talent_node)
+        talent_nodes.append(talent_node.child_left)
+        talent_nodes.append(talent_node.child_right)
+
+    return size
+
+def get_task_memory_size(talent_node) -> int:
+    """
+    Gets the memory size of the tasks a Talent Node holds.
+    @param talent_node: the node holding the tasks
+    @return the memory size in bytes
+    """
+    size = 0
+    if talent_node.task_store is not None:
+        size += get_object_memory_size(talent_node.task_store)
+
+    task_nodes = [talent_node.task_head]
+    while task_nodes:
+        task_node = task_nodes.pop()
+        if task_node is None:
+            continue
+        size += get_object_memory_size(task_node)
+        task_nodes.append(task_node.child_left)
+        task_nodes.append(task_node.child_right)
+
+    return size
+
+def get_object_memory_size(obj) -> int:
+    """
+    Gets the memory size of an object, its attribute dictionary if it has one,
+    and any containers (dicts, lists, queues, arrays, NumPy arrays) it holds directly.
+    @param obj: the object to measure
+    @return the memory size in bytes
+    """
+    size = getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += getsizeof(obj.__dict__)
+        values = list(obj.__dict__.values())
+    else:
+        values = []
+    for slot in getattr(type(obj), '__slots__', ()):
+        values.append(getattr(obj, slot, None))
+
+    for value in values:
+        # nodes are counted on their own, strings and numbers are shared
+        if isinstance(value, (dict, list)) or type(value).__name__ in ('deque', 'array', 'ndarray'):
+            size += getsizeof(value)
+    return size
@@ -0,0 +1,123 @@
+import math
+import os
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from structs import TTree
+from utils.ingest import ADD, ACCESS, ingest_events
+
+# what each tree's summary row holds, before its rank histogram
+FIELDS = ('seed', 'time', 'talents', 'burnt_out', 'lost')
+# bytes in each number of a row, they're signed 64 bit ints
+ITEM_SIZE = 8
+
+def generate_schedule(seed: int, total_tasks: int = 1000, total_talents: int = 20, tasks_per_talent: int = 10,
+                      access_ratio: float = 0.3, skew: float = 1.0):
+    """
+    Generates a learner's synthetic schedule. The same seed always makes the same schedule.
+    Talents are picked with Zipf-like weights, so a high skew keeps coming back to
+    the same few talents and burns them out.
+    @param seed: the seed of the schedule
+    @param total_tasks: the number of events to make
+    @param total_talents: how many talents the learner has to pick from
+    @param tasks_per_talent: how many tasks each talent has to pick from
+    @param access_ratio: the share of events that access a task instead of adding one
+    @param skew: how much the first talents are favored, 0 for no favorites
+    @return generator of (action, task_name, talent_name) events, like utils.ingest reads
+    """
+    rng = random.Random(seed)
+    talent_weights = [1 / (talent + 1) ** skew for talent in range(total_talents)]
+    talents = rng.choices(range(total_talents), weights=talent_weights, k=total_tasks)
+    for talent in talents:
+        action = ACCESS if rng.random() < access_ratio else ADD
+        yield (action, f"Task {rng.randrange(tasks_per_talent)}", f"Talent{talent}")
+
+def simulate_learner(seed: int, max_rank: int = 15, task_store_type: type = None, **schedule_options) -> list:
+    """
+    Runs a learner's schedule through a tree of its own and boils the tree down to a summary row.
+    @param seed: the seed of the learner's schedule
+    @param max_rank: the highest rank with its own bin, talents above it are counted in its bin
+    @param task_store_type: optional class of task store for every Talent Node, like TaskHeap
+    @param schedule_options: anything else generate_schedule takes
+    @return the row, FIELDS then the number of talents at each rank from 0 to max_rank
+    """
+    tree = TTree(task_store_type)
+    ingest_events(tree, generate_schedule(seed, **schedule_options))
+
+    rank_histogram = [0] * (max_rank + 1)
+    burnt_out = 0
+    for talent_node in tree.talent_map.values():
+        rank_histogram[min(talent_node.rank, max_rank)] += 1
+        burnt_out += talent_node.is_burnout
+    return [seed, tree.time, len(tree.talent_map), burnt_out, len(tree.lost_talents)] + rank_histogram
+
+def simulate_population(seeds, max_workers: int = None, chunk_size: int = None, max_rank: int = 15,
+                        task_store_type: type = None, **schedule_options) -> list:
+    """
+    Simulates a learner for each seed, spread across a pool of processes.
+    Trees never leave their worker. Each worker writes a summary row per tree into
+    a block of shared memory, so only the seeds are sent and nothing is pickled back.
+    @param seeds: the seed of each learner's schedule
+    @param max_workers: the number of processes, the number of CPUs if not given
+    @param chunk_size: how many learners to hand a worker at a time, spread evenly if not given
+    @param max_rank: the highest rank with its own bin, talents above it are counted in its bin
+    @param task_store_type: optional class of task store for every Talent Node, it has to be picklable
+    @param schedule_options: anything else generate_schedule takes
+    @return a summary dict for each seed, in order, see read_summary
+    """
+    seeds = list(seeds)
+    if not seeds:
+        return []
+    max_workers = max_workers or os.cpu_count() or 1
+    # a few chunks per worker, so a slow chunk doesn't hold the rest up
+    chunk_size = chunk_size or math.ceil(len(seeds) / (max_workers * 4))
+    row_size = len(FIELDS) + max_rank + 1
+
+    memory = shared_memory.SharedMemory(create=True, size=len(seeds) * row_size * ITEM_SIZE)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_simulate_rows, memory.name, first_row, seeds[first_row:first_row + chunk_size],
+                                       max_rank, task_store_type, schedule_options)
+                       for first_row in range(0, len(seeds), chunk_size)]
+            # raises the first error a worker ran into
+            for future in futures:
+                future.result()
+
+        with memory.buf.cast('q') as rows:
+            summaries = [read_summary(rows[row * row_size:(row + 1) * row_size].tolist()) for row in range(len(seeds))]
+    finally:
+        memory.close()
+        memory.unlink()
+    return summaries
+
+def read_summary(row) -> dict:
+    """
+    Turns a summary row into a dict.
+    @param row: the row, like simulate_learner returns
+    @return dict of FIELDS and rank_histogram, the number of talents at each rank
+    """
+    summary = dict(zip(FIELDS, row))
+    summary['rank_histogram'] = list(row[len(FIELDS):])
+    return summary
+
+def _simulate_rows(memory_name: str, first_row: int, seeds: list, max_rank: int, task_store_type: type, schedule_options: dict) -> int:
+    """
+    Simulates a chunk of learners in a worker, writing their rows straight into shared memory.
+    @param memory_name: name of the shared memory holding every row
+    @param first_row: the row of the first seed
+    @param seeds: the seeds of the chunk
+    @param max_rank: the highest rank with its own bin
+    @param task_store_type: optional class of task store for every Talent Node
+    @param schedule_options: anything else generate_schedule takes
+    @return the number of rows written
+    """
+    row_size = len(FIELDS) + max_rank + 1
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        with memory.buf.cast('q') as rows:
+            for row, seed in enumerate(seeds, first_row):
+                rows[row * row_size:(row + 1) * row_size] = array('q', simulate_learner(seed, max_rank, task_store_type, **schedule_options))
+    finally:
+        memory.close()
+    return len(seeds)
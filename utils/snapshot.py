@@ -0,0 +1,512 @@
+import gc
+import mmap
+import os
+import struct
+from collections import deque
+from functools import partial
+import structs
+from structs import TTree, TalentNode, TaskNode
+from structs.lost_talents import OLDEST
+from structs.traversal import walk_pre_order
+
+# A snapshot is laid out in sections, one after the other:
+#   header | strings | levels | lost talents | talents | details
+# every name is written once in the string table and referred to by its index.
+# talents have a fixed size record, their recent tasks and tasks are in the details
+# section, which is only read when a talent's tasks are first needed.
+MAGIC = b'TTRE'
+VERSION = 3
+# stands in for a missing index or an empty map that was never made
+NONE = 0xFFFFFFFF
+
+# magic, version, time, total nodes, journal position, task store type name,
+# lost talent capacity (-1 for none), lost talent eviction name,
+# then the offsets of the strings, levels, lost talents, talents and details
+HEADER = struct.Struct('<4sHqqQIqIQQQQQ')
+NO_CAPACITY = -1
+# a single talent on its own: task store type name, then the offsets of the strings, talent and details
+TALENT_DUMP = struct.Struct('<IQQQ')
+COUNT = struct.Struct('<I')
+OFFSET = struct.Struct('<Q')
+# rank, number of talents
+LEVEL = struct.Struct('<qI')
+# talent index, position of the parent in the level above, is left child
+LEVEL_NODE = struct.Struct('<IIB')
+# name, rank, last access, burnout limit, max tasks, flags, details offset
+TALENT = struct.Struct('<IqqIIBQ')
+# time, task name
+RECENT_TASK = struct.Struct('<qI')
+# task name, creation time, last access time, flags
+TASK = struct.Struct('<IqqB')
+# task name, position of the Task Node
+MAPPED_TASK = struct.Struct('<II')
+
+IS_BURNOUT = 1
+IS_MASTERED = 2
+IS_BURNT = 1
+HAS_LEFT = 2
+HAS_RIGHT = 4
+
+NO_TASKS = 0
+TASK_NODES = 1
+TASK_STORE = 2
+
+def save_snapshot(tree: TTree, path: str) -> None:
+    """
+    Saves a tree to a snapshot file. The file is written next to the path
+    and moved into place at the end, so a crash never leaves half a snapshot behind.
+    @param tree: the tree to save
+    @param path: where to save it
+    """
+    writer = _SnapshotWriter()
+    data = writer.write(tree)
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+def load_snapshot(path: str, lost_talents=None) -> TTree:
+    """
+    Loads a tree from a snapshot file. The file is memory mapped and only the talents
+    are built up front, each talent reads its tasks from the file the first time they're needed.
+    @param path: where the snapshot was saved
+    @param lost_talents: where to put the lost talents, like a LostTalentArchive. The tree's own if not given
+    @return the tree, ready to use
+    """
+    with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buffer) < HEADER.size:
+        raise ValueError("This isn't a T Tree snapshot.")
+
+    (magic, version, time, total_nodes, _, store_name, lost_capacity, lost_eviction, strings_offset,
+     levels_offset, lost_offset, talents_offset, details_offset) = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("This isn't a T Tree snapshot.")
+    if version != VERSION:
+        raise ValueError(f"Snapshot version {version} can't be read, expected {VERSION}.")
+
+    reader = _SnapshotReader(buffer, strings_offset, talents_offset, details_offset, store_name)
+    return reader.read(time, total_nodes, levels_offset, lost_offset, lost_talents,
+                       lost_capacity if lost_capacity != NO_CAPACITY else None, lost_eviction)
+
+def dump_talent(talent_node: TalentNode) -> bytes:
+    """
+    Writes a single talent and its tasks on their own, laid out like a snapshot
+    without the tree around it. Its place in the tree isn't kept.
+    @param talent_node: the talent to write
+    @return the bytes of the talent
+    """
+    return _SnapshotWriter().write_talent_dump(talent_node)
+
+def load_talent(data: bytes) -> TalentNode:
+    """
+    Builds a talent from the bytes of dump_talent. Its tasks are only read the first time they're needed.
+    @param data: the bytes of the talent
+    @return the talent
+    """
+    store_name, strings_offset, talents_offset, details_offset = TALENT_DUMP.unpack_from(data, 0)
+    return _SnapshotReader(data, strings_offset, talents_offset, details_offset, store_name).read_talent(0)
+
+def read_journal_position(path: str) -> int:
+    """
+    Reads where the tree's journal was when a snapshot was saved, without loading the tree.
+    Journal entries from this position on aren't in the snapshot.
+    @param path: where the snapshot was saved
+    @return the journal position, 0 if the tree had no journal
+    """
+    with open(path, 'rb') as file:
+        header = file.read(HEADER.size)
+    if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+        raise ValueError("This isn't a T Tree snapshot.")
+    return HEADER.unpack(header)[4]
+
+class _SnapshotWriter:
+    """
+    Lays out a tree as the bytes of a snapshot.
+    """
+    def __init__(self):
+        self.strings = []
+        self.string_indexes = {}
+        self.talents = bytearray()
+        self.details = bytearray()
+        self.total_talents = 0
+
+    def write(self, tree: TTree) -> bytes:
+        """
+        @param tree: the tree to write
+        @return the bytes of the snapshot
+        """
+        store_name = self.__intern(tree.task_store_type.__name__) if tree.task_store_type else NONE
+        # an archive in place of the lost talents has no capacity, it's left out of the snapshot
+        lost_capacity = getattr(tree.lost_talents, 'capacity', None)
+        lost_eviction = self.__intern(getattr(tree.lost_talents, 'eviction', OLDEST))
+
+        # the head is left out, it's the same in every tree
+        levels = bytearray()
+        ranks = sorted((rank for rank in tree.rank_levels if rank != tree.head.rank), reverse=True)
+        levels += COUNT.pack(len(ranks))
+        parent_positions = {id(tree.head): 0}
+        for rank in ranks:
+            level = tree.rank_levels[rank]
+            levels += LEVEL.pack(rank, len(level))
+            positions = {}
+            for position, talent_node in enumerate(level):
+                parent = talent_node.parent
+                if parent is None or id(parent) not in parent_positions:
+                    raise ValueError(f"'{talent_node.name}' isn't under the level above it, the tree can't be saved.")
+                levels += LEVEL_NODE.pack(self.__write_talent(talent_node), parent_positions[id(parent)], parent.child_left is talent_node)
+                positions[id(talent_node)] = position
+            parent_positions = positions
+
+        lost = bytearray(COUNT.pack(len(tree.lost_talents)))
+        for lost_talent in tree.lost_talents:
+            lost += COUNT.pack(self.__write_talent(lost_talent))
+
+        strings = self.__write_strings()
+        talents = COUNT.pack(self.total_talents) + self.talents
+
+        strings_offset = HEADER.size
+        levels_offset = strings_offset + len(strings)
+        lost_offset = levels_offset + len(levels)
+        talents_offset = lost_offset + len(lost)
+        details_offset = talents_offset + len(talents)
+        journal_position = tree.journal.position if tree.journal is not None else 0
+        header = HEADER.pack(MAGIC, VERSION, tree.time, tree.total_nodes, journal_position, store_name,
+                             lost_capacity if lost_capacity is not None else NO_CAPACITY, lost_eviction, strings_offset, levels_offset, lost_offset, talents_offset, details_offset)
+        return b''.join((header, strings, levels, lost, talents, self.details))
+
+    def write_talent_dump(self, talent_node: TalentNode) -> bytes:
+        """
+        @param talent_node: the talent to write
+        @return the bytes of the talent on its own
+        """
+        task_store = talent_node.task_store
+        store_name = self.__intern(type(task_store).__name__) if task_store is not None else NONE
+        self.__write_talent(talent_node)
+
+        strings = self.__write_strings()
+        talents = COUNT.pack(self.total_talents) + self.talents
+        strings_offset = TALENT_DUMP.size
+        talents_offset = strings_offset + len(strings)
+        details_offset = talents_offset + len(talents)
+        header = TALENT_DUMP.pack(store_name, strings_offset, talents_offset, details_offset)
+        return b''.join((header, strings, talents, self.details))
+
+    def __intern(self, string: str) -> int:
+        """
+        Gets the index of a string in the string table, adding it the first time it's seen.
+        @param string: the string to look up
+        @return its index
+        """
+        index = self.string_indexes.get(string)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(string)
+            self.string_indexes[string] = index
+        return index
+
+    def __write_strings(self) -> bytes:
+        """
+        @return the string table: a count, the offset of each string and one past the last, then the strings
+        """
+        encoded = [string.encode('utf-8') for string in self.strings]
+        offsets = [0]
+        for string in encoded:
+            offsets.append(offsets[-1] + len(string))
+        return COUNT.pack(len(encoded)) + struct.pack(f'<{len(offsets)}Q', *offsets) + b''.join(encoded)
+
+    def __write_talent(self, talent_node: TalentNode) -> int:
+        """
+        Writes a talent record and its details.
+        @param talent_node: the talent to write
+        @return the index of the talent record
+        """
+        flags = (IS_BURNOUT if talent_node.is_burnout else 0) | (IS_MASTERED if talent_node.is_mastered else 0)
+        self.talents += TALENT.pack(self.__intern(talent_node.name), talent_node.rank, talent_node.last_access,
+                                    talent_node.burnout_limit, talent_node.max_tasks, flags, len(self.details))
+        self.__write_details(talent_node)
+        self.total_talents += 1
+        return self.total_talents - 1
+
+    def __write_details(self, talent_node: TalentNode) -> None:
+        """
+        Writes the recent tasks of a talent, then either its Task Nodes or its task store.
+        @param talent_node: the talent to write
+        """
+        details = self.details
+        # this loads the tasks if they're still on disk, before the maps are read directly
+        task_store = talent_node.task_store
+        recent_task_map = talent_node._recent_task_map
+        if recent_task_map is None:
+            details += COUNT.pack(NONE)
+        else:
+            details += COUNT.pack(len(recent_task_map))
+            for recent_time, task_name in recent_task_map.items():
+                details += RECENT_TASK.pack(recent_time, self.__intern(task_name))
+
+        if task_store is not None:
+            tasks = task_store.dump_tasks()
+            details.append(TASK_STORE)
+            details += COUNT.pack(len(tasks))
+            for task_name, creation_time, access_time, is_burnt in tasks:
+                details += TASK.pack(self.__intern(task_name), creation_time, access_time, IS_BURNT if is_burnt else 0)
+            return
+
+        if talent_node.task_head is None:
+            details.append(NO_TASKS)
+            return
+
+        # parents come before their children, left before right
+        task_nodes = list(walk_pre_order(talent_node.task_head))
+        positions = {id(task_node): position for position, task_node in enumerate(task_nodes)}
+        details.append(TASK_NODES)
+        details += COUNT.pack(len(task_nodes))
+        for task_node in task_nodes:
+            flags = ((IS_BURNT if task_node.is_burnt else 0) | (HAS_LEFT if task_node.child_left else 0)
+                     | (HAS_RIGHT if task_node.child_right else 0))
+            details += TASK.pack(self.__intern(task_node.task_name), task_node.creation_time, task_node.last_access_time, flags)
+
+        details += COUNT.pack(positions[id(talent_node.task_tail)] if talent_node.task_tail else NONE)
+        if talent_node.task_frontier is None:
+            details += COUNT.pack(NONE)
+        else:
+            details += COUNT.pack(len(talent_node.task_frontier))
+            for task_node in talent_node.task_frontier:
+                details += COUNT.pack(positions[id(task_node)])
+
+        task_node_map = talent_node._task_node_map
+        if task_node_map is None:
+            details += COUNT.pack(NONE)
+        else:
+            details += COUNT.pack(len(task_node_map))
+            for task_name, task_node in task_node_map.items():
+                details += MAPPED_TASK.pack(self.__intern(task_name), positions[id(task_node)])
+
+class _SnapshotReader:
+    """
+    Builds a tree from the bytes of a snapshot, leaving the tasks where they are until they're needed.
+    Every talent that still has its tasks on disk keeps this reader, and the file, alive.
+    """
+    def __init__(self, buffer, strings_offset: int, talents_offset: int, details_offset: int, store_name: int):
+        self.buffer = buffer
+        self.details_offset = details_offset
+
+        total_strings, = COUNT.unpack_from(buffer, strings_offset)
+        offsets_start = strings_offset + COUNT.size
+        self.string_start = offsets_start + OFFSET.size * (total_strings + 1)
+        self.string_offsets = memoryview(buffer)[offsets_start:self.string_start].cast('Q')
+        self.string_cache = {}
+        self.task_store_type = getattr(structs, self.__get_string(store_name)) if store_name != NONE else None
+
+        total_records, = COUNT.unpack_from(buffer, talents_offset)
+        records_offset = talents_offset + COUNT.size
+        self.talent_records = list(TALENT.iter_unpack(buffer[records_offset:records_offset + total_records * TALENT.size]))
+
+    def read(self, time: int, total_nodes: int, levels_offset: int, lost_offset: int, lost_talents=None,
+             lost_talent_capacity: int = None, lost_talent_eviction: int = NONE) -> TTree:
+        """
+        @param time: time of the tree
+        @param total_nodes: total nodes in the tree
+        @param levels_offset: where the levels start
+        @param lost_offset: where the lost talents start
+        @param lost_talents: where to put the lost talents, the tree's own if not given
+        @param lost_talent_capacity: most lost talents the tree's own should hold, None for all of them
+        @param lost_talent_eviction: index of the name of the eviction the tree's own uses past the capacity
+        @return the tree in the snapshot
+        """
+        # every Talent Node made here lives as long as the tree, so there's nothing
+        # for the garbage collector to find while they're made. it'd only slow things down
+        is_collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return self.__read_tree(time, total_nodes, levels_offset, lost_offset, lost_talents, lost_talent_capacity, lost_talent_eviction)
+        finally:
+            if is_collecting:
+                gc.enable()
+
+    def read_talent(self, talent_index: int) -> TalentNode:
+        """
+        Builds a talent from its record, with a loader in place of its tasks.
+        @param talent_index: index of the talent record
+        @return the talent
+        """
+        name, rank, last_access, burnout_limit, max_tasks, flags, details = self.talent_records[talent_index]
+        talent_node = TalentNode(self.__get_string(name), burnout_limit, max_tasks, rank)
+        talent_node.last_access = last_access
+        talent_node.is_burnout = bool(flags & IS_BURNOUT)
+        talent_node.is_mastered = bool(flags & IS_MASTERED)
+        talent_node.total_tasks = self.__count_tasks(self.details_offset + details)
+        talent_node._task_loader = partial(self.load_tasks, self.details_offset + details)
+        return talent_node
+
+    def __read_tree(self, time: int, total_nodes: int, levels_offset: int, lost_offset: int, lost_talents,
+                    lost_talent_capacity: int, lost_talent_eviction: int) -> TTree:
+        """
+        @return the tree in the snapshot
+        """
+        buffer = self.buffer
+        read_talent = self.read_talent
+        eviction = self.__get_string(lost_talent_eviction) if lost_talent_eviction != NONE else OLDEST
+        tree = TTree(self.task_store_type, lost_talent_capacity, eviction)
+        tree.time = time
+        tree.total_nodes = total_nodes
+
+        offset = levels_offset
+        total_levels, = COUNT.unpack_from(buffer, offset)
+        offset += COUNT.size
+        parent_level = [tree.head]
+        for _ in range(total_levels):
+            rank, total_talents = LEVEL.unpack_from(buffer, offset)
+            offset += LEVEL.size
+            level = []
+            for _ in range(total_talents):
+                talent_index, parent_position, is_left = LEVEL_NODE.unpack_from(buffer, offset)
+                offset += LEVEL_NODE.size
+                talent_node = read_talent(talent_index)
+                talent_node.events = tree.events
+                parent = parent_level[parent_position]
+                talent_node.parent = parent
+                if is_left:
+                    parent.child_left = talent_node
+                else:
+                    parent.child_right = talent_node
+                tree.talent_map[talent_node.name] = talent_node
+                tree.total_tasks += talent_node.total_tasks
+                tree.total_burnt_out += talent_node.is_burnout
+                level.append(talent_node)
+            tree.rank_levels[rank] = level
+            parent_level = level
+
+        total_lost, = COUNT.unpack_from(buffer, lost_offset)
+        lost_indexes = struct.unpack_from(f'<{total_lost}I', buffer, lost_offset + COUNT.size)
+        if lost_talents is not None:
+            tree.lost_talents = lost_talents
+        append = tree.lost_talents.append
+        for talent_index in lost_indexes:
+            append(read_talent(talent_index))
+        # only needed while the tree is built
+        self.talent_records = None
+
+        return tree
+
+    def load_tasks(self, offset: int, talent_node: TalentNode) -> None:
+        """
+        Reads the recent tasks and tasks of a talent into it. Used as the talent's task loader.
+        @param offset: where the talent's details start
+        @param talent_node: the talent to fill in
+        """
+        buffer = self.buffer
+        get_string = self.__get_string
+        total_recent, = COUNT.unpack_from(buffer, offset)
+        offset += COUNT.size
+        if total_recent != NONE:
+            recent_task_map = {}
+            for _ in range(total_recent):
+                recent_time, task_name = RECENT_TASK.unpack_from(buffer, offset)
+                offset += RECENT_TASK.size
+                recent_task_map[recent_time] = get_string(task_name)
+            talent_node._recent_task_map = recent_task_map
+
+        task_mode = buffer[offset]
+        offset += 1
+        if task_mode == TASK_STORE:
+            self.__load_task_store(offset, talent_node)
+        elif task_mode == TASK_NODES:
+            self.__load_task_nodes(offset, talent_node)
+
+    def __count_tasks(self, offset: int) -> int:
+        """
+        Reads how many tasks a talent has, without reading them in.
+        @param offset: where the talent's details start
+        @return the number of tasks past the recent task map
+        """
+        total_recent, = COUNT.unpack_from(self.buffer, offset)
+        offset += COUNT.size
+        if total_recent != NONE:
+            offset += total_recent * RECENT_TASK.size
+        if self.buffer[offset] == NO_TASKS:
+            return 0
+        total_tasks, = COUNT.unpack_from(self.buffer, offset + 1)
+        return total_tasks
+
+    def __load_task_store(self, offset: int, talent_node: TalentNode) -> None:
+        """
+        Pushes a talent's tasks back into a fresh task store.
+        @param offset: where the tasks start
+        @param talent_node: the talent to fill in
+        """
+        task_store = self.task_store_type()
+        total_tasks, = COUNT.unpack_from(self.buffer, offset)
+        for task_name, creation_time, access_time, flags in TASK.iter_unpack(self.buffer[offset + COUNT.size:offset + COUNT.size + total_tasks * TASK.size]):
+            task_store.push(self.__get_string(task_name), creation_time, bool(flags & IS_BURNT), access_time)
+        talent_node.task_store = task_store
+
+    def __load_task_nodes(self, offset: int, talent_node: TalentNode) -> None:
+        """
+        Rebuilds a talent's Task Node tree, its tail, frontier and map.
+        @param offset: where the Task Nodes start
+        @param talent_node: the talent to fill in
+        """
+        buffer = self.buffer
+        get_string = self.__get_string
+        total_tasks, = COUNT.unpack_from(buffer, offset)
+        offset += COUNT.size
+
+        # the Task Nodes are in pre order, so each one fills the open position
+        # on top of the stack. the right position goes on first, so the left is filled first
+        task_nodes = []
+        open_positions = []
+        for task_name, creation_time, access_time, flags in TASK.iter_unpack(buffer[offset:offset + total_tasks * TASK.size]):
+            task_node = TaskNode(get_string(task_name), creation_time, bool(flags & IS_BURNT))
+            task_node.last_access_time = access_time
+            if open_positions:
+                parent, is_left = open_positions.pop()
+                task_node.parent = parent
+                if is_left:
+                    parent.child_left = task_node
+                else:
+                    parent.child_right = task_node
+            if flags & HAS_RIGHT:
+                open_positions.append((task_node, False))
+            if flags & HAS_LEFT:
+                open_positions.append((task_node, True))
+            task_nodes.append(task_node)
+        offset += total_tasks * TASK.size
+
+        talent_node.task_head = task_nodes[0]
+        tail_position, = COUNT.unpack_from(buffer, offset)
+        offset += COUNT.size
+        talent_node.task_tail = task_nodes[tail_position] if tail_position != NONE else None
+
+        total_frontier, = COUNT.unpack_from(buffer, offset)
+        offset += COUNT.size
+        if total_frontier != NONE:
+            positions = struct.unpack_from(f'<{total_frontier}I', buffer, offset)
+            offset += COUNT.size * total_frontier
+            talent_node.task_frontier = deque(task_nodes[position] for position in positions)
+
+        total_mapped, = COUNT.unpack_from(buffer, offset)
+        offset += COUNT.size
+        if total_mapped != NONE:
+            talent_node._task_node_map = {
+                get_string(task_name): task_nodes[position]
+                for task_name, position in MAPPED_TASK.iter_unpack(buffer[offset:offset + total_mapped * MAPPED_TASK.size])
+            }
+
+    def __get_string(self, index: int) -> str:
+        """
+        Gets a string from the string table. Each one is only decoded once,
+        so every talent and task with the same name shares it.
+        @param index: index of the string
+        @return the string
+        """
+        string = self.string_cache.get(index)
+        if string is None:
+            start = self.string_start + self.string_offsets[index]
+            end = self.string_start + self.string_offsets[index + 1]
+            string = str(self.buffer[start:end], 'utf-8')
+            self.string_cache[index] = string
+        return string